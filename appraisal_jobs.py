@@ -0,0 +1,222 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from metrics import QUEUE_WAIT_SECONDS
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _timestamp(value: Optional[float]) -> Optional[str]:
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+
+
+class QueueFull(Exception):
+    """Raised when the job queue already holds its maximum number of jobs"""
+
+
+class AppraisalJob:
+    """One submitted quote and everything we know about its progress"""
+
+    def __init__(self, request):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False  # set by JobManager.cancel, as opposed to a shutdown
+
+    @property
+    def queue_wait_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return round(self.started_at - self.submitted_at, 3)
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return round(self.finished_at - self.started_at, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "submitted_at": _timestamp(self.submitted_at),
+            "started_at": _timestamp(self.started_at),
+            "finished_at": _timestamp(self.finished_at),
+            "queue_wait_seconds": self.queue_wait_seconds,
+            "run_seconds": self.run_seconds,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Queue of appraisal jobs drained by a fixed set of worker tasks.
+
+    ``executor`` is the coroutine function that produces a quote for one
+    AppraisalRequest (the same one /run-appraisal uses). Finished jobs are
+    kept for ``retention_seconds`` so clients can fetch their results.
+    """
+
+    def __init__(self, executor: Callable[[Any], Awaitable[Dict[str, Any]]],
+                 workers: int = 2, max_queued: int = 100, retention_seconds: float = 3600):
+        self.executor = executor
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention_seconds = retention_seconds
+        self._jobs: "OrderedDict[str, AppraisalJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+        self._busy = 0
+        self._queued = 0  # jobs still waiting; cancelled ones stay in _queue until a worker skips them
+        self._submitted = 0
+        self._counts = {SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._started_jobs = 0
+
+    @classmethod
+    def from_env(cls, executor, default_workers: int = 2) -> "JobManager":
+        return cls(
+            executor,
+            workers=int(os.environ.get("NADLAN_JOB_WORKERS", str(default_workers))),
+            max_queued=int(os.environ.get("NADLAN_JOB_QUEUE_SIZE", "100")),
+            retention_seconds=float(os.environ.get("NADLAN_JOB_RETENTION", "3600")),
+        )
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, request) -> AppraisalJob:
+        """Queue a quote and return its job record immediately"""
+        self._prune()
+        if self._queued >= self.max_queued:
+            raise QueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+        job = AppraisalJob(request)
+        self._jobs[job.id] = job
+        self._submitted += 1
+        self._queued += 1
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AppraisalJob]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[AppraisalJob]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+
+        if job.status == RUNNING and job.task is not None:
+            job.cancel_requested = True
+            job.task.cancel()
+        else:
+            self._queued -= 1
+            self._finish(job, CANCELLED)
+        return job
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status != QUEUED:
+                    continue  # cancelled while waiting
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AppraisalJob):
+        self._queued -= 1
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._busy += 1
+        self._started_jobs += 1
+        wait = job.started_at - job.submitted_at
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        QUEUE_WAIT_SECONDS.observe(wait, queue="jobs")
+
+        job.task = asyncio.create_task(self.executor(job.request))
+        try:
+            job.result = await job.task
+            if isinstance(job.result, dict) and "error" in job.result:
+                job.error = str(job.result["error"])
+                self._finish(job, FAILED)
+            else:
+                self._finish(job, SUCCEEDED)
+        except asyncio.CancelledError:
+            if not job.cancel_requested or asyncio.current_task().cancelling():
+                # The worker itself is being shut down: stop the quote and let stop() finish
+                job.task.cancel()
+                job.error = "Server shutting down"
+                self._finish(job, CANCELLED)
+                raise
+            self._finish(job, CANCELLED)
+        except HTTPException as e:
+            job.error = str(e.detail)
+            self._finish(job, FAILED)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, FAILED)
+        finally:
+            job.task = None
+            self._busy -= 1
+
+    def _finish(self, job: AppraisalJob, status: str):
+        job.status = status
+        job.finished_at = time.time()
+        self._counts[status] += 1
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            if job.status in FINISHED_STATES and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, worker utilisation and queue wait metrics"""
+        return {
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "queue_depth": self._queued,
+            "max_queued": self.max_queued,
+            "submitted": self._submitted,
+            "succeeded": self._counts[SUCCEEDED],
+            "failed": self._counts[FAILED],
+            "cancelled": self._counts[CANCELLED],
+            "avg_queue_wait_seconds": round(self._wait_total / self._started_jobs, 3) if self._started_jobs else 0.0,
+            "max_queue_wait_seconds": round(self._wait_max, 3),
+        }
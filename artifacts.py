@@ -0,0 +1,195 @@
+"""
+Screenshot artifacts.
+
+Screenshots are opt-in per request (``"screenshot": "none" | "element" |
+"full_page"``, default NADLAN_SCREENSHOT). The engine grabs the raw image
+once the fee is known; that capture is still on the request path and shows
+up as the ``screenshot`` stage in the job's timings. Compressing and writing
+it happens on a background executor so the quote is not also held up by
+image encoding or disk I/O.
+
+Files are content addressed under one directory per job::
+
+    artifacts/<job id>/<kind>-<sha256>.<ext>
+
+and served by ``GET /artifacts/<job id>-<kind>``.
+"""
+
+import asyncio
+import glob
+import hashlib
+import io
+import os
+import re
+import shutil
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # WebP needs Pillow; JPEG comes straight from Playwright
+    Image = None
+
+NONE = "none"
+ELEMENT = "element"
+FULL_PAGE = "full_page"
+SCREENSHOT_POLICIES = (NONE, ELEMENT, FULL_PAGE)
+
+MEDIA_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+EXTENSIONS = {"jpeg": "jpg", "webp": "webp", "png": "png"}
+
+_ARTIFACT_ID = re.compile(r"^([0-9a-f]{32})-(element|full_page)$")
+
+
+def screenshot_policy(variables: Dict[str, Any]) -> str:
+    """Screenshot policy a job asked for, falling back to NADLAN_SCREENSHOT"""
+    policy = variables.get("screenshot") or os.environ.get("NADLAN_SCREENSHOT", NONE)
+    if policy not in SCREENSHOT_POLICIES:
+        raise ValueError(f"Unknown screenshot policy '{policy}', expected one of {list(SCREENSHOT_POLICIES)}")
+    return policy
+
+
+class ArtifactStore:
+    """Encodes and writes screenshots off the request path and finds them again"""
+
+    def __init__(self, root: str = "artifacts", image_format: str = "jpeg", quality: int = 70,
+                 workers: int = 2, retention_seconds: float = 86400):
+        if image_format not in ("jpeg", "webp"):
+            raise ValueError(f"Unsupported screenshot format '{image_format}', expected jpeg or webp")
+        if image_format == "webp" and Image is None:
+            print("⚠️ Pillow is not installed, writing JPEG screenshots instead of WebP")
+            image_format = "jpeg"
+        self.root = root
+        self.image_format = image_format
+        self.quality = quality
+        self.retention_seconds = retention_seconds
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None  # created on first write, again after shutdown()
+        self._pending: Dict[str, Future] = {}
+        self.written = 0
+        self.bytes_written = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "ArtifactStore":
+        return cls(
+            root=os.environ.get("NADLAN_ARTIFACT_DIR", "artifacts"),
+            image_format=os.environ.get("NADLAN_SCREENSHOT_FORMAT", "jpeg"),
+            quality=int(os.environ.get("NADLAN_SCREENSHOT_QUALITY", "70")),
+            workers=int(os.environ.get("NADLAN_ARTIFACT_WORKERS", "2")),
+            retention_seconds=float(os.environ.get("NADLAN_ARTIFACT_RETENTION", "86400")),
+        )
+
+    @property
+    def capture_type(self) -> str:
+        """Image type to ask Playwright for: JPEG directly, PNG when Pillow re-encodes to WebP"""
+        return "jpeg" if self.image_format == "jpeg" else "png"
+
+    def capture_options(self) -> Dict[str, Any]:
+        if self.capture_type == "jpeg":
+            return {"type": "jpeg", "quality": self.quality}
+        return {"type": "png"}
+
+    async def capture(self, page, policy: str, selector: str) -> Optional[bytes]:
+        """Grab the raw screenshot bytes; encoding happens later in save()"""
+        if policy == ELEMENT:
+            return await page.locator(selector).first.screenshot(**self.capture_options())
+        if policy == FULL_PAGE:
+            return await page.screenshot(full_page=True, **self.capture_options())
+        return None
+
+    def save(self, job_id: str, kind: str, raw: bytes) -> Dict[str, Any]:
+        """Queue ``raw`` for encoding and writing; returns the artifact reference immediately"""
+        artifact_id = f"{job_id}-{kind}"
+        # Finished writes are found on disk; only track the in-flight ones
+        self._pending = {key: future for key, future in self._pending.items() if not future.done()}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="artifacts")
+        self._pending[artifact_id] = self._executor.submit(self._write, job_id, kind, raw)
+        return {
+            "artifact_id": artifact_id,
+            "url": f"/artifacts/{artifact_id}",
+            "format": self.image_format,
+        }
+
+    def _write(self, job_id: str, kind: str, raw: bytes) -> str:
+        try:
+            data = raw
+            if self.image_format != self.capture_type:
+                image = Image.open(io.BytesIO(raw))
+                buffer = io.BytesIO()
+                image.save(buffer, format=self.image_format.upper(), quality=self.quality)
+                data = buffer.getvalue()
+
+            digest = hashlib.sha256(data).hexdigest()
+            job_dir = os.path.join(self.root, job_id)
+            os.makedirs(job_dir, exist_ok=True)
+            path = os.path.join(job_dir, f"{kind}-{digest}.{EXTENSIONS[self.image_format]}")
+            if not os.path.exists(path):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            self.written += 1
+            self.bytes_written += len(data)
+            self._prune()
+            return path
+        except Exception:
+            self.failed += 1
+            raise
+
+    def _prune(self):
+        """Drop job directories older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        for job_dir in glob.glob(os.path.join(self.root, "*")):
+            try:
+                if os.path.getmtime(job_dir) < cutoff:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+            except OSError:
+                continue
+
+    async def find(self, artifact_id: str, timeout: float = 30) -> Optional[Tuple[str, str]]:
+        """(path, media type) of an artifact, waiting for it if it is still being written"""
+        match = _ARTIFACT_ID.match(artifact_id)
+        if not match:
+            return None
+        job_id, kind = match.groups()
+
+        pending = self._pending.get(artifact_id)
+        if pending is not None:
+            try:
+                path = await asyncio.wait_for(asyncio.wrap_future(pending), timeout=timeout)
+                self._pending.pop(artifact_id, None)
+            except Exception:
+                return None
+        else:
+            # Written by another process (subprocess mode) or an earlier run
+            candidates = sorted(glob.glob(os.path.join(self.root, job_id, f"{kind}-*.*")), key=os.path.getmtime)
+            candidates = [path for path in candidates if not path.endswith(".tmp")]
+            if not candidates:
+                return None
+            path = candidates[-1]
+
+        extension = path.rsplit(".", 1)[-1]
+        media_type = next((MEDIA_TYPES[fmt] for fmt, ext in EXTENSIONS.items() if ext == extension), "application/octet-stream")
+        return path, media_type
+
+    def shutdown(self, wait: bool = True):
+        """Finish pending writes; a later save() starts a fresh executor (e.g. the app restarting)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "format": self.image_format,
+            "quality": self.quality,
+            "pending": sum(1 for future in self._pending.values() if not future.done()),
+            "written": self.written,
+            "bytes_written": self.bytes_written,
+            "failed": self.failed,
+        }
+
+
+shared_artifacts = ArtifactStore.from_env()
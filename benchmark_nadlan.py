@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the Nadlan engines and speed profiles.
+
+Runs each target (engine:profile, e.g. ``http`` or ``browser:ultra_fast``)
+N times against mock_nadlan_server with a configurable upstream latency and
+records wall time, per-stage timings, success rate and whether the fee
+matches what the mock priced. Results go to a JSON file plus a comparison
+table, and a later run can be diffed against a saved one.
+
+    python benchmark_nadlan.py --runs 20 --latency typical --jitter 0.05
+    python benchmark_nadlan.py --targets http,browser:ultra_fast --baseline benchmark_baseline.json
+
+The former nadlan_playwright_*.py variants are the browser engine's
+profiles (nadlan_engine.PROFILES), so ``browser:*`` benchmarks all of them.
+Browser targets are skipped when Firefox is not installed.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from mock_nadlan_server import MockNadlanServer, expected_fee
+from nadlan_engine import PROFILES
+from nadlan_http import ENGINES
+
+DEFAULT_TARGETS = "http,browser:*"
+
+
+@dataclass(frozen=True)
+class Target:
+    engine: str
+    profile: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.engine}:{self.profile}"
+
+
+def parse_targets(spec: str) -> List[Target]:
+    """'http,browser:fast,browser:*' -> targets; a bare engine uses the simple_working profile"""
+    targets = []
+    for part in spec.split(","):
+        engine, _, profile = part.strip().partition(":")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {sorted(ENGINES)}")
+        profiles = sorted(PROFILES) if profile == "*" else [profile or "simple_working"]
+        for name in profiles:
+            if name not in PROFILES:
+                raise ValueError(f"Unknown speed profile '{name}', expected one of {sorted(PROFILES)}")
+            target = Target(engine, name)
+            if target not in targets:
+                targets.append(target)
+    return targets
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile (pct in 0..100); None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 1)
+
+
+async def run_once(target: Target, server: MockNadlanServer, variables: Dict[str, Any], pool=None) -> Dict[str, Any]:
+    """One quote on ``target``; the result trimmed to what the benchmark keeps"""
+    engine = ENGINES[target.engine](server.variables(profile=target.profile, **variables))
+    expected = expected_fee({spec.control: value for spec, _, value in engine.steps})
+    started = time.perf_counter()
+    try:
+        if pool is None:
+            result = await engine.run()
+        else:
+            async with pool.context() as context:
+                result = await engine.run(context=context)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    wall_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    stages: Dict[str, float] = {}
+    for step in engine.timings:
+        stages[step["stage"]] = round(stages.get(step["stage"], 0) + step["ms"], 1)
+    fee = result.get("appraisal_fee_amount")
+    return {
+        "target": target.name,
+        "ok": fee is not None,
+        "correct": fee is not None and fee == expected,
+        "fee": fee,
+        "expected_fee": expected,
+        "wall_ms": wall_ms,
+        "stages": stages,
+        "error": result.get("error") or (None if fee is not None else result.get("message", "no fee")),
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """p50/p95 of wall time and of every stage, success and correctness rates, error counts"""
+    walls = [run["wall_ms"] for run in runs if run["ok"]]
+    stage_names = []
+    for run in runs:
+        stage_names.extend(name for name in run["stages"] if name not in stage_names)
+    stages = {}
+    for name in stage_names:
+        values = [run["stages"][name] for run in runs if run["ok"] and name in run["stages"]]
+        stages[name] = {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+    return {
+        "runs": len(runs),
+        "success_rate": round(sum(run["ok"] for run in runs) / len(runs), 3) if runs else 0,
+        "correct_rate": round(sum(run["correct"] for run in runs) / len(runs), 3) if runs else 0,
+        "p50_ms": percentile(walls, 50),
+        "p95_ms": percentile(walls, 95),
+        "mean_ms": round(statistics.mean(walls), 1) if walls else None,
+        "max_ms": max(walls) if walls else None,
+        "stages": stages,
+        "errors": dict(Counter(run["error"] for run in runs if run["error"])),
+    }
+
+
+async def browsers_available() -> bool:
+    from browser_provisioning import BrowserProvisioning
+    return await BrowserProvisioning(["firefox"]).check()
+
+
+async def run_benchmark(targets: List[Target], runs: int = 10, warmup: int = 1, concurrency: int = 1,
+                        server_options: Optional[Dict[str, Any]] = None, variables: Optional[Dict[str, Any]] = None,
+                        verbose: bool = False) -> Dict[str, Any]:
+    """Benchmark every target against one mock server; returns the results document"""
+    variables = variables or {}
+    if any(t.engine == "browser" for t in targets) and not await browsers_available():
+        print("⚠️ Firefox is not installed; skipping browser targets")
+        targets = [t for t in targets if t.engine != "browser"]
+
+    pool = None
+    if any(t.engine == "browser" for t in targets):
+        from browser_pool import BrowserPool
+        pool = BrowserPool(size=concurrency, headless=True)
+        await pool.start()
+
+    all_runs: List[Dict[str, Any]] = []
+    summary: Dict[str, Dict[str, Any]] = {}
+    with MockNadlanServer(**(server_options or {})) as server:
+        try:
+            for target in targets:
+                target_pool = pool if target.engine == "browser" else None
+                slots = asyncio.Semaphore(concurrency)
+
+                async def limited():
+                    async with slots:
+                        return await run_once(target, server, variables, target_pool)
+
+                # Engines log every step; keep the benchmark's own output readable
+                output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+                with output:
+                    for _ in range(warmup):
+                        await run_once(target, server, variables, target_pool)
+                    results = await asyncio.gather(*(limited() for _ in range(runs)))
+                for number, result in enumerate(results):
+                    result["run"] = number
+                all_runs.extend(results)
+                summary[target.name] = summarize(results)
+                print(f"⏱️ {target.name}: p50 {summary[target.name]['p50_ms']} ms, "
+                      f"success {summary[target.name]['success_rate']:.0%}")
+        finally:
+            if pool is not None:
+                await pool.stop()
+        mock_stats = server.stats()
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "settings": {
+            "runs": runs,
+            "warmup": warmup,
+            "concurrency": concurrency,
+            "latency": mock_stats["latency"],
+            "jitter": mock_stats["jitter"],
+            "seed": (server_options or {}).get("seed", 0),
+            "variables": variables,
+        },
+        "mock": mock_stats,
+        "summary": summary,
+        "runs": all_runs,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 10) -> List[Dict[str, Any]]:
+    """
+    Per target present in both documents: p50/p95 change and success rate
+    change. A target regressed when p50 or p95 grew by more than
+    ``threshold`` percent or its success rate dropped.
+    """
+    rows = []
+    for name, now in current["summary"].items():
+        before = baseline.get("summary", {}).get(name)
+        if before is None:
+            continue
+        row = {"target": name, "regressed": now["success_rate"] < before["success_rate"]}
+        for key in ("p50_ms", "p95_ms"):
+            old, new = before.get(key), now.get(key)
+            change = round((new - old) / old * 100, 1) if old and new is not None else None
+            row[key] = {"before": old, "after": new, "change_pct": change}
+            if change is not None and change > threshold:
+                row["regressed"] = True
+        row["success_rate"] = {"before": before["success_rate"], "after": now["success_rate"]}
+        rows.append(row)
+    return rows
+
+
+def format_table(results: Dict[str, Any]) -> str:
+    header = f"{'target':<26} {'runs':>5} {'ok':>6} {'correct':>8} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}"
+    lines = [header, "-" * len(header)]
+    for name, s in sorted(results["summary"].items(), key=lambda item: item[1]["p50_ms"] or float("inf")):
+        lines.append(f"{name:<26} {s['runs']:>5} {s['success_rate']:>6.0%} {s['correct_rate']:>8.0%} "
+                     f"{_ms(s['p50_ms']):>9} {_ms(s['p95_ms']):>9} {_ms(s['mean_ms']):>9}")
+    return "\n".join(lines)
+
+
+def format_diff(rows: List[Dict[str, Any]]) -> str:
+    header = f"{'target':<26} {'p50 before':>11} {'p50 after':>10} {'change':>8} {'p95 change':>11} {'ok':>12}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        flag = "  ❌ regressed" if row["regressed"] else ""
+        success = f"{row['success_rate']['before']:.0%}->{row['success_rate']['after']:.0%}"
+        lines.append(f"{row['target']:<26} {_ms(row['p50_ms']['before']):>11} {_ms(row['p50_ms']['after']):>10} "
+                     f"{_pct(row['p50_ms']['change_pct']):>8} {_pct(row['p95_ms']['change_pct']):>11} {success:>12}{flag}")
+    return "\n".join(lines)
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def _pct(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:+.1f}%"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Nadlan engines against the local mock site")
+    parser.add_argument("--targets", default=DEFAULT_TARGETS, help="engine[:profile|:*],... (default: %(default)s)")
+    parser.add_argument("--runs", type=int, default=10, help="measured runs per target")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs per target first")
+    parser.add_argument("--concurrency", type=int, default=1, help="runs in flight at once per target")
+    parser.add_argument("--latency", help="mock latency: profile (none, typical, slow), seconds, or endpoint=seconds,...")
+    parser.add_argument("--jitter", type=float, default=0, help="+/- seconds of seeded jitter on the mock")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--full-postbacks", action="store_true", help="mock without UpdatePanel partial postbacks")
+    parser.add_argument("--variables", default="{}", help="JSON overrides for the mock quote request")
+    parser.add_argument("--out", default="benchmark_results.json", help="where to write the results")
+    parser.add_argument("--baseline", help="earlier results file to diff against")
+    parser.add_argument("--threshold", type=float, default=10, help="percent slowdown that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 when a target regressed")
+    parser.add_argument("--verbose", action="store_true", help="show the engines' own output")
+    args = parser.parse_args(argv)
+
+    server_options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "seed": args.seed,
+        "partial_postbacks": not args.full_postbacks,
+    }
+    results = asyncio.run(run_benchmark(parse_targets(args.targets), runs=args.runs, warmup=args.warmup,
+                                        concurrency=args.concurrency, server_options=server_options,
+                                        variables=json.loads(args.variables), verbose=args.verbose))
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print()
+    print(format_table(results))
+    print(f"\n💾 Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(results, json.load(f), args.threshold)
+        print(f"\n📊 Compared with {args.baseline}:")
+        print(format_diff(rows))
+        if args.fail_on_regression and any(row["regressed"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
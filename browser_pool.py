@@ -0,0 +1,147 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import async_playwright
+
+
+class _PooledBrowser:
+    """A launched Firefox instance plus its bookkeeping"""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.active = 0
+        self.jobs = 0
+
+
+class BrowserPool:
+    """
+    Long-lived Firefox instances shared by appraisal jobs.
+
+    Each job gets its own isolated BrowserContext (separate cookies and
+    storage), so jobs never see each other's sessions. A browser that has
+    served ``max_jobs_per_browser`` jobs is drained and replaced with a
+    fresh launch to keep memory growth in check.
+    """
+
+    def __init__(self, size: int = 2, contexts_per_browser: int = 1,
+                 max_jobs_per_browser: int = 50, headless: bool = True):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.max_jobs_per_browser = max_jobs_per_browser
+        self.headless = headless
+        self.launches = 0
+        self.jobs_completed = 0
+        self._playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._draining: List[_PooledBrowser] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls) -> "BrowserPool":
+        """Build a pool from NADLAN_POOL_* environment variables"""
+        return cls(
+            size=int(os.environ.get("NADLAN_POOL_SIZE", "2")),
+            contexts_per_browser=int(os.environ.get("NADLAN_POOL_CONTEXTS_PER_BROWSER", "1")),
+            max_jobs_per_browser=int(os.environ.get("NADLAN_POOL_MAX_JOBS", "50")),
+            headless=os.environ.get("NADLAN_HEADLESS", "true").lower() != "false",
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.size * self.contexts_per_browser
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self):
+        """Start Playwright and launch the pooled browsers"""
+        if self.started:
+            return
+        self._playwright = await async_playwright().start()
+        self._slots = asyncio.Semaphore(self.capacity)
+        for _ in range(self.size):
+            self._browsers.append(await self._launch())
+        print(f"🚀 Browser pool started with {self.size} Firefox instance(s)")
+
+    async def stop(self):
+        """Close every browser and stop Playwright"""
+        for pooled in self._browsers + self._draining:
+            await self._close(pooled)
+        self._browsers = []
+        self._draining = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        print("🛑 Browser pool stopped")
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self._playwright.firefox.launch(headless=self.headless)
+        self.launches += 1
+        return _PooledBrowser(browser)
+
+    async def _close(self, pooled: _PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            print(f"⚠️ Error closing pooled browser: {e}")
+
+    async def _checkout(self) -> _PooledBrowser:
+        async with self._lock:
+            # Replace browsers that crashed while idle
+            for index, pooled in enumerate(self._browsers):
+                if not pooled.browser.is_connected():
+                    print("⚠️ Pooled browser disconnected, relaunching")
+                    self._browsers[index] = await self._launch()
+
+            pooled = min(self._browsers, key=lambda b: b.active)
+            pooled.active += 1
+            pooled.jobs += 1
+
+            # Retire the browser once it has handed out its last job
+            if pooled.jobs >= self.max_jobs_per_browser:
+                self._browsers[self._browsers.index(pooled)] = await self._launch()
+                self._draining.append(pooled)
+            return pooled
+
+    async def _checkin(self, pooled: _PooledBrowser):
+        async with self._lock:
+            pooled.active -= 1
+            self.jobs_completed += 1
+            if pooled in self._draining and pooled.active == 0:
+                self._draining.remove(pooled)
+                await self._close(pooled)
+                print("♻️ Recycled pooled browser")
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """Yield a fresh BrowserContext on one of the pooled browsers"""
+        if not self.started:
+            raise RuntimeError("Browser pool has not been started")
+
+        async with self._slots:
+            pooled = await self._checkout()
+            try:
+                browser_context = await pooled.browser.new_context(**context_options)
+                try:
+                    yield browser_context
+                finally:
+                    await browser_context.close()
+            finally:
+                await self._checkin(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation snapshot"""
+        active = sum(b.active for b in self._browsers + self._draining)
+        return {
+            "started": self.started,
+            "size": self.size,
+            "capacity": self.capacity,
+            "active_contexts": active,
+            "draining_browsers": len(self._draining),
+            "browser_launches": self.launches,
+            "jobs_completed": self.jobs_completed,
+        }
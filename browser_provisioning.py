@@ -0,0 +1,144 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from job_scheduler import run_command
+
+
+class BrowsersNotReady(Exception):
+    """Raised when a request needs a browser that is not installed (yet)"""
+
+    def __init__(self, missing: List[str], retry_after: int):
+        super().__init__(f"Browsers not ready: {', '.join(missing) or 'check pending'}")
+        self.missing = missing
+        self.retry_after = retry_after
+
+
+class BrowserProvisioning:
+    """
+    Checks once, at startup, that the Playwright browsers we launch are installed.
+
+    The result is cached: requests only look at ``ready`` instead of running
+    ``playwright install`` each time. While browsers are missing the check is
+    repeated every ``recheck_seconds`` (someone may be installing them) and,
+    if ``auto_install`` is set, ``playwright install`` runs once at startup.
+    """
+
+    def __init__(self, browsers: Optional[List[str]] = None, auto_install: bool = False,
+                 verify_launch: bool = False, recheck_seconds: float = 30):
+        self.browsers = browsers or ["firefox"]
+        self.auto_install = auto_install
+        self.verify_launch = verify_launch
+        self.recheck_seconds = recheck_seconds
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[float] = None
+        self.checks = 0
+        self.install_attempted = False
+        self._ready_event: Optional[asyncio.Event] = None
+        self._watch: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "BrowserProvisioning":
+        browsers = [b.strip() for b in os.environ.get("NADLAN_BROWSERS", "firefox").split(",") if b.strip()]
+        return cls(
+            browsers=browsers,
+            auto_install=os.environ.get("NADLAN_BROWSER_AUTO_INSTALL", "false").lower() == "true",
+            verify_launch=os.environ.get("NADLAN_BROWSER_VERIFY_LAUNCH", "false").lower() == "true",
+            recheck_seconds=float(os.environ.get("NADLAN_BROWSER_RECHECK_SECONDS", "30")),
+        )
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.results) and all(r["installed"] for r in self.results.values())
+
+    @property
+    def missing(self) -> List[str]:
+        return [name for name in self.browsers if not self.results.get(name, {}).get("installed")]
+
+    async def check(self) -> bool:
+        """Look for each browser's executable (and optionally launch it); caches the result"""
+        from playwright.async_api import async_playwright
+
+        results = {}
+        try:
+            async with async_playwright() as p:
+                for name in self.browsers:
+                    browser_type = getattr(p, name)
+                    path = browser_type.executable_path
+                    result = {"executable": path, "installed": os.path.exists(path), "error": None}
+                    if result["installed"] and self.verify_launch:
+                        try:
+                            browser = await browser_type.launch(headless=True)
+                            result["version"] = browser.version
+                            await browser.close()
+                        except Exception as e:
+                            result.update(installed=False, error=str(e).splitlines()[0])
+                    results[name] = result
+        except Exception as e:
+            results = {name: {"executable": None, "installed": False, "error": str(e)} for name in self.browsers}
+
+        self.results = results
+        self.checked_at = time.time()
+        self.checks += 1
+        if self.ready:
+            self._event().set()
+        return self.ready
+
+    async def install(self) -> bool:
+        """Run ``playwright install`` for the missing browsers, once"""
+        self.install_attempted = True
+        missing = self.missing
+        print(f"📦 Installing Playwright browsers: {', '.join(missing)}")
+        result = await run_command([sys.executable, "-m", "playwright", "install", *missing], timeout=900)
+        if result.returncode != 0:
+            print(f"❌ Playwright browser install failed with exit code {result.returncode}")
+        return await self.check()
+
+    async def start(self) -> bool:
+        """Startup check; keeps re-checking in the background while browsers are missing"""
+        if await self.check():
+            print(f"✅ Browsers ready: {', '.join(self.browsers)}")
+            return True
+        if self.auto_install and not self.install_attempted and await self.install():
+            return True
+        print(f"⚠️ Browsers not installed: {', '.join(self.missing)}; refusing browser jobs until they are")
+        self._watch = asyncio.create_task(self._recheck())
+        return False
+
+    async def _recheck(self):
+        while not self.ready:
+            await asyncio.sleep(self.recheck_seconds)
+            if await self.check():
+                print(f"✅ Browsers ready: {', '.join(self.browsers)}")
+
+    def _event(self) -> asyncio.Event:
+        if self._ready_event is None:
+            self._ready_event = asyncio.Event()
+        return self._ready_event
+
+    async def wait_ready(self):
+        """Wait until a check finds every browser"""
+        if not self.ready:
+            await self._event().wait()
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.cancel()
+            self._watch = None
+
+    def require(self):
+        """Raise BrowsersNotReady unless every browser was found"""
+        if not self.ready:
+            raise BrowsersNotReady(self.missing, int(self.recheck_seconds))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "browsers": self.results,
+            "missing": self.missing,
+            "checked_at": self.checked_at,
+            "checks": self.checks,
+            "auto_install": self.auto_install,
+        }
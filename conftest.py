@@ -0,0 +1,32 @@
+"""
+Shared pytest fixtures.
+
+``mock_nadlan`` is a running mock_nadlan_server for the test; set
+NADLAN_MOCK_LATENCY (a profile such as "typical", or endpoint=seconds,...)
+plus NADLAN_MOCK_JITTER / NADLAN_MOCK_SEED to rerun the suite against a
+slow upstream. ``mock_nadlan_factory`` starts extra servers with their own
+settings.
+"""
+
+import pytest
+
+from mock_nadlan_server import MockNadlanServer
+
+
+@pytest.fixture
+def mock_nadlan_factory():
+    servers = []
+
+    def start(**kwargs) -> MockNadlanServer:
+        server = MockNadlanServer.from_env(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def mock_nadlan(mock_nadlan_factory) -> MockNadlanServer:
+    return mock_nadlan_factory()
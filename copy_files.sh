@@ -3,11 +3,8 @@
 echo "=== Copying files to droplet ==="
 echo "You will be prompted for the password for each file."
 
-# Copy the working script
-scp nadlan_playwright_simple_working.py ubuntu@167.172.17.131:/home/ubuntu/appraisal_price_api/
-
-# Copy the server
-scp droplet_server.py ubuntu@167.172.17.131:/home/ubuntu/appraisal_price_api/
+# Copy the server and the modules it imports
+scp *.py ubuntu@167.172.17.131:/home/ubuntu/appraisal_price_api/
 
 # Copy requirements
 scp requirements.txt ubuntu@167.172.17.131:/home/ubuntu/appraisal_price_api/
@@ -33,9 +33,7 @@ fi
 # Copy files to droplet
 echo "Copying files to droplet..."
 scp -i "$SSH_KEY_PATH" \
-    main.py \
-    nadlan_playwright_simple_working.py \
-    droplet_server.py \
+    *.py \
     requirements.txt \
     README.md \
     "$DROPLET_USER@$DROPLET_IP:$REMOTE_DIR/"
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Front door for several droplet_server.py nodes.
+
+Keeps a registry of droplets, polls their /health for readiness, capacity
+and queue depth, and sends each /run-appraisal to the least-loaded healthy
+node. A node that is unreachable, times out or pushes back (429/502/503/504)
+is skipped and the quote retried on the next best one. Aggregate throughput is
+published on /health and /metrics.
+
+    NADLAN_NODES=http://10.0.0.2:8000,http://10.0.0.3:8000 python dispatcher.py
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+import metrics
+
+# Node answers that mean "try somewhere else"; anything else (500 included:
+# that is the app failing this quote) is the quote's answer
+RETRYABLE_STATUS = {429, 502, 503, 504}
+# Of those, the ones that also take the node out of rotation until its next good /health
+NODE_DOWN_STATUS = {502, 503, 504}
+
+DISPATCHES = metrics.REGISTRY.counter(
+    "nadlan_dispatch_requests_total",
+    "Quotes forwarded by the dispatcher, by node and outcome",
+    ("node", "outcome"),
+)
+
+
+class Node:
+    """One droplet_server.py and what we last heard from it"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = False
+        self.capacity = 1
+        self.reported_in_flight = 0
+        self.reported_queue_depth = 0
+        self.in_flight = 0  # quotes this dispatcher has outstanding on the node
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def load(self) -> float:
+        """Busy plus queued work per slot; our own in-flight count covers the time between polls"""
+        busy = max(self.reported_in_flight, self.in_flight)
+        return (busy + self.reported_queue_depth) / max(self.capacity, 1)
+
+    def update(self, health: Dict[str, Any]):
+        self.healthy = bool(health.get("ready", True))
+        self.capacity = max(int(health.get("capacity") or 1), 1)
+        self.reported_in_flight = int(health.get("in_flight") or 0)
+        self.reported_queue_depth = int(health.get("queue_depth") or 0)
+        self.last_error = None if self.healthy else health.get("status")
+        self.consecutive_failures = 0
+
+    def mark_down(self, error: str):
+        self.healthy = False
+        self.last_error = error
+        self.consecutive_failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "reported_in_flight": self.reported_in_flight,
+            "queue_depth": self.reported_queue_depth,
+            "load": round(self.load, 3),
+            "completed": self.completed,
+            "failed": self.failed,
+            "last_error": self.last_error,
+            "seconds_since_check": round(time.time() - self.last_checked, 1) if self.last_checked else None,
+        }
+
+
+class NoHealthyNodes(Exception):
+    """Raised when no node can take a quote"""
+
+
+class Dispatcher:
+    """Node registry, health polling and least-loaded routing"""
+
+    def __init__(self, nodes: List[str], poll_seconds: float = 2, health_timeout: float = 5,
+                 request_timeout: float = 330, max_attempts: int = 3, client: Optional[httpx.AsyncClient] = None):
+        self.nodes: Dict[str, Node] = {}
+        for url in nodes:
+            self.register(url)
+        self.poll_seconds = poll_seconds
+        self.health_timeout = health_timeout
+        self.request_timeout = request_timeout
+        self.max_attempts = max_attempts
+        self.client = client or httpx.AsyncClient(
+            timeout=request_timeout,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+        self.completed = 0
+        self.retries = 0
+        self._finished = deque()  # completion times for the throughput window
+        self._poller: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "Dispatcher":
+        nodes = [url.strip() for url in os.environ.get("NADLAN_NODES", "").split(",") if url.strip()]
+        return cls(
+            nodes,
+            poll_seconds=float(os.environ.get("NADLAN_NODE_POLL_SECONDS", "2")),
+            health_timeout=float(os.environ.get("NADLAN_NODE_HEALTH_TIMEOUT", "5")),
+            request_timeout=float(os.environ.get("NADLAN_DISPATCH_TIMEOUT", "330")),
+            max_attempts=int(os.environ.get("NADLAN_DISPATCH_ATTEMPTS", "3")),
+        )
+
+    def register(self, url: str) -> Node:
+        node = self.nodes.get(url.rstrip("/"))
+        if node is None:
+            node = Node(url)
+            self.nodes[node.url] = node
+        return node
+
+    def unregister(self, url: str) -> bool:
+        return self.nodes.pop(url.rstrip("/"), None) is not None
+
+    async def check(self, node: Node):
+        """Poll one node's /health"""
+        try:
+            response = await self.client.get(f"{node.url}/health", timeout=self.health_timeout)
+            health = response.json()
+            node.update(health)
+            if response.status_code != 200:
+                node.healthy = False
+        except Exception as e:
+            node.mark_down(f"{type(e).__name__}: {e}")
+        node.last_checked = time.time()
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check(node) for node in list(self.nodes.values())))
+
+    async def poll_forever(self):
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.poll_seconds)
+
+    async def start(self):
+        await self.check_all()
+        self._poller = asyncio.create_task(self.poll_forever())
+        healthy = sum(1 for node in self.nodes.values() if node.healthy)
+        print(f"🚦 Dispatcher started with {healthy}/{len(self.nodes)} healthy node(s)")
+
+    async def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        await self.client.aclose()
+
+    def pick(self, exclude: List[Node]) -> Node:
+        """Least-loaded healthy node; ties go to a random one so no node sits idle"""
+        candidates = [node for node in self.nodes.values() if node.healthy and node not in exclude]
+        if not candidates:
+            raise NoHealthyNodes("No healthy nodes available")
+        lowest = min(node.load for node in candidates)
+        return random.choice([node for node in candidates if node.load == lowest])
+
+    async def dispatch(self, path: str, body: Dict[str, Any]) -> httpx.Response:
+        """Forward a request to the best node, retrying elsewhere on node failures"""
+        tried: List[Node] = []
+        last_error = "No healthy nodes available"
+        for attempt in range(self.max_attempts):
+            try:
+                node = self.pick(tried)
+            except NoHealthyNodes:
+                break
+            tried.append(node)
+            if attempt:
+                self.retries += 1
+            node.in_flight += 1
+            try:
+                response = await self.client.post(f"{node.url}{path}", json=body)
+            except httpx.HTTPError as e:
+                # Unreachable or timed out: out of rotation until its next good /health
+                node.mark_down(f"{type(e).__name__}: {e}")
+                node.failed += 1
+                DISPATCHES.inc(node=node.url, outcome="unreachable")
+                last_error = f"{node.url}: {type(e).__name__}"
+                continue
+            finally:
+                node.in_flight -= 1
+
+            if response.status_code in RETRYABLE_STATUS:
+                node.failed += 1
+                DISPATCHES.inc(node=node.url, outcome=str(response.status_code))
+                if response.status_code in NODE_DOWN_STATUS:
+                    node.healthy = False  # the poller puts it back once /health is fine
+                last_error = f"{node.url}: HTTP {response.status_code}"
+                continue
+
+            node.completed += 1
+            self.completed += 1
+            self._finished.append(time.monotonic())
+            DISPATCHES.inc(node=node.url, outcome="ok" if response.status_code < 400 else str(response.status_code))
+            return response
+        if not tried:
+            raise NoHealthyNodes(last_error)
+        raise NoHealthyNodes(f"Quote failed on every node tried: {last_error}")
+
+    def throughput(self, window: float = 60) -> float:
+        """Completed quotes per minute over the last ``window`` seconds"""
+        cutoff = time.monotonic() - window
+        while self._finished and self._finished[0] < cutoff:
+            self._finished.popleft()
+        return len(self._finished) * 60 / window
+
+    def stats(self) -> Dict[str, Any]:
+        nodes = list(self.nodes.values())
+        healthy = [node for node in nodes if node.healthy]
+        return {
+            "nodes": len(nodes),
+            "healthy_nodes": len(healthy),
+            "capacity": sum(node.capacity for node in healthy),
+            "in_flight": sum(node.in_flight for node in nodes),
+            "completed": self.completed,
+            "retries": self.retries,
+            "throughput_per_minute": round(self.throughput(), 2),
+            "node_stats": [node.stats() for node in nodes],
+        }
+
+
+dispatcher = Dispatcher.from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await dispatcher.start()
+    try:
+        yield
+    finally:
+        await dispatcher.stop()
+
+
+app = FastAPI(title="Nadlan Dispatcher", description="Routes appraisal quotes across droplets", lifespan=lifespan)
+metrics.install(app)
+metrics.REGISTRY.callback("nadlan_dispatch_healthy_nodes", "Nodes currently taking quotes",
+                          lambda: dispatcher.stats()["healthy_nodes"])
+metrics.REGISTRY.callback("nadlan_dispatch_capacity", "Quote slots across healthy nodes",
+                          lambda: dispatcher.stats()["capacity"])
+metrics.REGISTRY.callback("nadlan_dispatch_throughput_per_minute", "Quotes completed per minute (last 60s)",
+                          lambda: dispatcher.throughput())
+metrics.REGISTRY.callback("nadlan_dispatch_node_load", "Busy plus queued work per slot, by node",
+                          lambda: {(node.url,): node.load for node in dispatcher.nodes.values()}, ("node",))
+
+
+class NodeRegistration(BaseModel):
+    url: str
+
+
+def relay(response: httpx.Response) -> JSONResponse:
+    try:
+        content = response.json()
+    except ValueError:
+        content = {"detail": response.text}
+    headers = {k: v for k, v in response.headers.items() if k.lower() == "retry-after"}
+    return JSONResponse(content, status_code=response.status_code, headers=headers)
+
+
+@app.post("/run-appraisal")
+async def run_appraisal(request: Request):
+    """Quote on the least-loaded healthy droplet"""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be JSON")
+    try:
+        response = await dispatcher.dispatch("/run-appraisal", body)
+    except NoHealthyNodes as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(dispatcher.poll_seconds) + 1)})
+    return relay(response)
+
+
+@app.get("/nodes")
+async def list_nodes():
+    return dispatcher.stats()["node_stats"]
+
+
+@app.post("/nodes", status_code=201)
+async def register_node(registration: NodeRegistration):
+    """Add a droplet; it takes traffic once its /health answers"""
+    node = dispatcher.register(registration.url)
+    await dispatcher.check(node)
+    return node.stats()
+
+
+@app.delete("/nodes")
+async def unregister_node(url: str):
+    if not dispatcher.unregister(url):
+        raise HTTPException(status_code=404, detail="Node not found")
+    return {"removed": url}
+
+
+@app.get("/health")
+async def health_check():
+    stats = dispatcher.stats()
+    return JSONResponse({"status": "healthy" if stats["healthy_nodes"] else "no_healthy_nodes", **stats},
+                        status_code=200 if stats["healthy_nodes"] else 503)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("NADLAN_DISPATCHER_PORT", "8080")))
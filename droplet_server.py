@@ -1,16 +1,100 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import json
 import asyncio
-import subprocess
 import sys
 import os
-from typing import Dict, Any
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
 
-app = FastAPI(title="Nadlan Appraisal API", description="API for running Nadlan appraisal automation")
+from browser_pool import BrowserPool
+from browser_provisioning import BrowserProvisioning
+from nadlan_engine import DEFAULT_PROFILE, NadlanEngine
+from nadlan_http import DEFAULT_ENGINE, ENGINES, NadlanHttpEngine
+from session_cache import SessionCache
+from quote_cache import QuoteCache, make_quote_key
+from single_flight import SingleFlight
+from job_scheduler import JobScheduler, Reservation, SchedulerFull
+from result_channel import run_with_result_channel
+from worker_manager import WorkerCrashed, WorkerManager
+from appraisal_jobs import JobManager, QueueFull, FINISHED_STATES
+from option_catalog import shared_catalog
+from artifacts import NONE, screenshot_policy, shared_artifacts
+import metrics
+
+# "pool" runs the Nadlan flow in-process on pooled browsers,
+# "workers" on pre-forked worker processes that each keep a warm browser,
+# "subprocess" keeps the old one-interpreter-per-quote behaviour
+EXECUTION_MODE = os.environ.get("NADLAN_EXECUTION_MODE", "pool")
+
+browser_pool = BrowserPool.from_env()
+browsers = BrowserProvisioning.from_env()
+worker_manager = WorkerManager.from_env()
+CAPACITY = worker_manager.capacity if EXECUTION_MODE == "workers" else browser_pool.capacity
+session_cache = SessionCache.from_env()
+quote_cache = QuoteCache.from_env()
+single_flight = SingleFlight.from_env()
+scheduler = JobScheduler.from_env(default_in_flight=CAPACITY)
+MAX_BATCH_PARALLELISM = int(os.environ.get("NADLAN_BATCH_PARALLELISM", str(CAPACITY)))
+CATALOG_USERNAME = os.environ.get("NADLAN_CATALOG_USERNAME")
+CATALOG_PASSWORD = os.environ.get("NADLAN_CATALOG_PASSWORD")
+CATALOG_REFRESH_SECONDS = float(os.environ.get("NADLAN_CATALOG_REFRESH_SECONDS", "86400"))
+LOG_LINES = int(os.environ.get("NADLAN_LOG_LINES", "200"))
+
+async def start_browser_backend():
+    """Launch the pooled browsers or warm workers once the browsers are installed"""
+    await browsers.wait_ready()
+    if EXECUTION_MODE == "pool":
+        await browser_pool.start()
+    elif EXECUTION_MODE == "workers":
+        await worker_manager.start()
+
+def browsers_ready() -> bool:
+    """True once browser quotes can run: browsers installed and pool/workers up"""
+    if not browsers.ready:
+        return False
+    if EXECUTION_MODE == "pool":
+        return browser_pool.started
+    if EXECUTION_MODE == "workers":
+        return worker_manager.started
+    return True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Verify the browsers once; without them browser quotes get 503 until they appear
+    backend_start = None
+    if await browsers.start():
+        await start_browser_backend()
+    else:
+        backend_start = asyncio.create_task(start_browser_backend())
+    await job_manager.start()
+    catalog_refresh = None
+    if CATALOG_USERNAME and CATALOG_PASSWORD and CATALOG_REFRESH_SECONDS > 0:
+        catalog_refresh = asyncio.create_task(
+            shared_catalog.refresh_forever(CATALOG_USERNAME, CATALOG_PASSWORD, CATALOG_REFRESH_SECONDS)
+        )
+    try:
+        yield
+    finally:
+        if catalog_refresh is not None:
+            catalog_refresh.cancel()
+        if backend_start is not None:
+            backend_start.cancel()
+        browsers.stop()
+        await job_manager.stop()
+        shared_artifacts.shutdown(wait=True)
+        if EXECUTION_MODE == "pool":
+            await browser_pool.stop()
+        elif EXECUTION_MODE == "workers":
+            await worker_manager.stop()
+
+app = FastAPI(title="Nadlan Appraisal API", description="API for running Nadlan appraisal automation", lifespan=lifespan)
+metrics.install(app)
 
 class AppraisalRequest(BaseModel):
-    wait_time: int = 3000
+    wait_time: int = 0  # extra fixed delay in ms after loading the form; was 3000 before condition-based waits
     screenshot_path: str = "appraisal_fee_test.png"
     headless: bool = True
     username: str
@@ -30,6 +114,16 @@ class AppraisalRequest(BaseModel):
     agent_name: str
     product: int  # This MUST be an integer, not a string
     date_appraisal_needed: str
+    use_cache: bool = True  # False forces a fresh quote from Nadlan
+    profile: Optional[str] = None  # speed profile from nadlan_engine.PROFILES, defaults to NADLAN_PROFILE
+    resource_policy: Optional[str] = None  # "off", "block" or "cache", defaults to NADLAN_RESOURCE_POLICY
+    engine: Optional[str] = None  # "browser" or "http", defaults to NADLAN_ENGINE
+    screenshot: Optional[str] = None  # "none", "element" or "full_page", defaults to NADLAN_SCREENSHOT
+    include_logs: bool = False  # subprocess mode: return the script's last log lines and progress events
+
+class BatchAppraisalRequest(BaseModel):
+    items: List[AppraisalRequest]
+    parallelism: Optional[int] = None  # capped at NADLAN_BATCH_PARALLELISM
 
 @app.get("/")
 async def root():
@@ -40,61 +134,343 @@ async def run_appraisal(request: AppraisalRequest):
     """
     Run the Nadlan appraisal script with the provided variables
     """
+    cached = cached_quote(request)
+    if cached is not None:
+        return cached
+
+    key = flight_key(request)
+    try:
+        # Identical quotes already running share that run instead of taking a slot
+        reservation = None if single_flight.running(key) else scheduler.reserve()
+    except SchedulerFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    try:
+        result = await scheduled_quote(request, key, reservation)
+    finally:
+        if reservation is not None:
+            reservation.release()  # the flight's job was cancelled before it started
+
+    return store_quote(request, result)
+
+@app.post("/run-appraisal/batch")
+async def run_appraisal_batch(batch: BatchAppraisalRequest):
+    """
+    Quote many properties concurrently and stream each result as one NDJSON
+    line the moment it finishes (so lines arrive out of order; use "index")
+    """
+    parallelism = min(batch.parallelism or MAX_BATCH_PARALLELISM, MAX_BATCH_PARALLELISM)
+    slots = asyncio.Semaphore(max(parallelism, 1))
+
+    async def quote_item(index: int, item: AppraisalRequest) -> Dict[str, Any]:
+        async with slots:
+            started = time.monotonic()
+            try:
+                result = await quote_appraisal(item)
+                status = "error" if isinstance(result, dict) and "error" in result else "success"
+                line = {"index": index, "status": status, "result": result}
+            except HTTPException as e:
+                line = {"index": index, "status": "error", "error": e.detail}
+            except Exception as e:
+                line = {"index": index, "status": "error", "error": str(e)}
+            line["elapsed_seconds"] = round(time.monotonic() - started, 3)
+            return line
+
+    async def stream_results():
+        tasks = [asyncio.create_task(quote_item(i, item)) for i, item in enumerate(batch.items)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            # Client went away: don't keep driving browsers for nobody
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+def cached_quote(request: AppraisalRequest) -> Optional[Dict[str, Any]]:
+    """Cached result for this quote, if caching is allowed and one exists"""
+    if not request.use_cache:
+        return None
+    try:
+        if screenshot_policy(request.dict()) != NONE:
+            return None  # a screenshot needs a live page
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return quote_cache.get(request.dict())
+
+def flight_key(request: AppraisalRequest) -> Optional[tuple]:
+    """Key under which concurrent identical quotes share one run; None when the caller needs its own run"""
+    try:
+        if request.include_logs or screenshot_policy(request.dict()) != NONE:
+            return None  # logs and screenshots belong to one particular run
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return (make_quote_key(request.dict()), request.engine or DEFAULT_ENGINE, request.profile or DEFAULT_PROFILE)
+
+def store_quote(request: AppraisalRequest, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Cache a fresh result and mark it as not cached"""
+    quote_cache.store(request.dict(), result)
+    if isinstance(result, dict) and "appraisal_fee" in result:
+        result = {**result, "cached": False}
+    return result
+
+async def quote_appraisal(request: AppraisalRequest) -> Dict[str, Any]:
+    """Cache-aware quote used by background jobs and batches; waits for a scheduler slot instead of failing"""
+    cached = cached_quote(request)
+    if cached is not None:
+        return cached
+    return store_quote(request, await scheduled_quote(request, flight_key(request)))
+
+async def scheduled_quote(request: AppraisalRequest, key: Optional[tuple],
+                          reservation: Optional[Reservation] = None) -> Dict[str, Any]:
+    """
+    Run a quote on a scheduler slot, sharing the run with identical quotes.
+
+    Every caller puts the same job behind the flight, so whoever joins gets
+    a quote rather than the starter's SchedulerFull; /run-appraisal reserves
+    its queue place itself before starting a flight.
+    """
+    job = lambda: scheduler.run(lambda: execute_appraisal(request), wait=True, reservation=reservation)
+    return await single_flight.run(key, job)
+
+async def execute_appraisal(request: AppraisalRequest) -> Dict[str, Any]:
+    """Run one quote with the requested engine and execution mode, bypassing caches"""
+    engine = request.engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise HTTPException(status_code=422, detail=f"Unknown engine '{engine}', expected one of {sorted(ENGINES)}")
+    if engine == "http":
+        return await run_appraisal_http(request)
+    if not browsers_ready():
+        raise HTTPException(status_code=503, detail="Browsers are not ready yet",
+                            headers={"Retry-After": str(int(browsers.recheck_seconds))})
+    if EXECUTION_MODE == "pool":
+        return await run_appraisal_in_pool(request)
+    if EXECUTION_MODE == "workers":
+        return await run_appraisal_in_worker(request)
+    return await run_appraisal_subprocess(request)
+
+async def run_appraisal_in_pool(request: AppraisalRequest) -> Dict[str, Any]:
+    """Run the Nadlan flow in-process on a pooled browser context"""
+    try:
+        nadlan = NadlanEngine(request.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        storage_state = session_cache.get(request.username, request.password)
+        async with browser_pool.context(storage_state=storage_state) as context:
+            result = await asyncio.wait_for(nadlan.run(context=context), timeout=300)
+            # Keep the authenticated cookies so the next quote skips login.aspx
+            if nadlan.logged_in:
+                session_cache.store(request.username, request.password, await context.storage_state())
+            elif storage_state and result and "error" in result:
+                session_cache.invalidate(request.username, request.password)
+            return result
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=408, detail="Script execution timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to execute script: {str(e)}")
+
+async def run_appraisal_in_worker(request: AppraisalRequest) -> Dict[str, Any]:
+    """Run the Nadlan flow on a warm worker process"""
+    try:
+        NadlanEngine(request.dict())  # reject unknown options or profiles before dispatching
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    storage_state = session_cache.get(request.username, request.password)
+    try:
+        reply = await worker_manager.run(request.dict(), storage_state=storage_state, timeout=300)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=408, detail="Script execution timed out")
+    except WorkerCrashed as e:
+        raise HTTPException(status_code=500, detail=f"Failed to execute script: {str(e)}")
+    result = reply.get("result")
+    if reply.get("logged_in") and reply.get("storage_state"):
+        session_cache.store(request.username, request.password, reply["storage_state"])
+    elif storage_state and result and "error" in result:
+        session_cache.invalidate(request.username, request.password)
+    # The worker's own metrics stay in the worker; record its timings here
+    if isinstance(result, dict) and isinstance(result.get("timings"), dict):
+        metrics.record_timings(result["timings"], metrics.result_outcome(result))
+    return result
+
+async def run_appraisal_http(request: AppraisalRequest) -> Dict[str, Any]:
+    """Replay the Nadlan form over HTTP, without a browser"""
+    storage_state = session_cache.get(request.username, request.password)
+    try:
+        nadlan = NadlanHttpEngine(request.dict(), storage_state=storage_state)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        result = await asyncio.wait_for(nadlan.run(), timeout=300)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=408, detail="Script execution timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to execute script: {str(e)}")
+    # Same cookie format as the browser engine, so either can reuse the session
+    if nadlan.logged_in:
+        session_cache.store(request.username, request.password, nadlan.export_storage_state())
+    elif storage_state and result and "error" in result:
+        session_cache.invalidate(request.username, request.password)
+    return result
+
+async def run_appraisal_subprocess(request: AppraisalRequest) -> Dict[str, Any]:
+    """Run the Nadlan script in a fresh Python subprocess"""
+    try:
+        NadlanEngine(request.dict())  # reject unknown options or profiles before spawning
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     try:
         # Convert the request to JSON string - pass the entire request object
         variables_json = json.dumps(request.dict())
         
-        # Run the script using subprocess
-        result = subprocess.run(
+        # The script sends its result over the result channel; stdout is only logs
+        run = await run_with_result_channel(
             [sys.executable, "nadlan_playwright_simple_working.py", variables_json],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
+            timeout=300,  # 5 minute timeout
+            log_lines=LOG_LINES
         )
         
-        # Parse the JSON output from the script
-        try:
-            # Find the JSON output in the stdout
-            output_lines = result.stdout.strip().split('\n')
-            json_output = None
-            
-            for line in output_lines:
-                if line.startswith('{') and line.endswith('}'):
-                    try:
-                        json_output = json.loads(line)
-                        break
-                    except json.JSONDecodeError:
-                        continue
-            
-            if json_output:
-                return json_output
-            else:
-                return {
-                    "status": "partial_success",
-                    "message": "Script ran but no JSON output found",
-                    "stdout": result.stdout,
-                    "stderr": result.stderr,
-                    "return_code": result.returncode
-                }
-                
-        except Exception as e:
-            return {
-                "status": "error",
-                "message": f"Failed to parse script output: {str(e)}",
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "return_code": result.returncode
+        result = run.result
+        if isinstance(result, dict):
+            # The child's own metrics die with it; record its timings here
+            if isinstance(result.get("timings"), dict):
+                metrics.record_timings(result["timings"], metrics.result_outcome(result))
+        else:
+            result = {
+                "status": "partial_success",
+                "message": "Script exited without sending a result",
+                "return_code": run.returncode
             }
+        if request.include_logs:
+            result = {**result, "logs": run.logs.lines(), "logs_dropped": run.logs.dropped, "events": run.events}
+        return result
             
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=408, detail="Script execution timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to execute script: {str(e)}")
 
+job_manager = JobManager.from_env(quote_appraisal, default_workers=CAPACITY)
+
+@app.post("/appraisal-jobs", status_code=202)
+async def submit_appraisal_job(request: AppraisalRequest):
+    """
+    Queue an appraisal quote and return its job id immediately
+    """
+    try:
+        job = job_manager.submit(request)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/appraisal-jobs/{job.id}"
+    }
+
+@app.get("/appraisal-jobs/{job_id}")
+async def get_appraisal_job(job_id: str):
+    """Status, timings and (once finished) the result of a job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.delete("/appraisal-jobs/{job_id}")
+async def cancel_appraisal_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    job_manager.cancel(job_id)
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/artifacts/{artifact_id}")
+async def get_artifact(artifact_id: str):
+    """Screenshot taken for a quote, as referenced by its "screenshot" field"""
+    found = await shared_artifacts.find(artifact_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    path, media_type = found
+    return FileResponse(path, media_type=media_type)
+
+def register_metrics():
+    """Expose pool, cache, scheduler and job stats on /metrics, read at scrape time"""
+    registry = metrics.REGISTRY
+    pool = browser_pool.stats
+    registry.callback("nadlan_pool_capacity", "Concurrent jobs the browser pool can run", lambda: pool()["capacity"])
+    registry.callback("nadlan_pool_active_contexts", "Browser contexts currently running a job",
+                      lambda: pool()["active_contexts"])
+    registry.callback("nadlan_pool_utilization", "Share of browser pool capacity in use",
+                      lambda: pool()["active_contexts"] / pool()["capacity"] if pool()["capacity"] else 0)
+    registry.callback("nadlan_browser_launches_total", "Firefox instances launched by the pool",
+                      lambda: pool()["browser_launches"], kind="counter")
+    registry.callback("nadlan_workers_alive", "Warm worker processes running",
+                      lambda: worker_manager.stats()["alive"] if worker_manager.started else None)
+    registry.callback("nadlan_workers_busy", "Warm worker processes running a job",
+                      lambda: worker_manager.stats()["busy"] if worker_manager.started else None)
+    registry.callback("nadlan_worker_restarts_total", "Worker processes replaced, by reason",
+                      lambda: {(reason,): worker_manager.stats()[key] for reason, key in
+                               (("crash", "crashes"), ("timeout", "timeouts"), ("recycle", "recycled"))}
+                      if worker_manager.started else None,
+                      ("reason",), kind="counter")
+    registry.callback("nadlan_cache_hits_total", "Cache hits",
+                      lambda: {("quote",): quote_cache.stats()["hits"], ("session",): session_cache.stats()["hits"]},
+                      ("cache",), kind="counter")
+    registry.callback("nadlan_cache_misses_total", "Cache misses",
+                      lambda: {("quote",): quote_cache.stats()["misses"], ("session",): session_cache.stats()["misses"]},
+                      ("cache",), kind="counter")
+    registry.callback("nadlan_single_flight_coalesced_total", "Quotes that joined an identical quote already running",
+                      lambda: single_flight.stats()["coalesced"], kind="counter")
+    registry.callback("nadlan_single_flight_started_total", "Quotes that ran because no identical quote was running",
+                      lambda: single_flight.stats()["started"], kind="counter")
+    registry.callback("nadlan_single_flight_in_flight", "Distinct quotes running that others can join",
+                      lambda: single_flight.stats()["in_flight"])
+    registry.callback("nadlan_scheduler_in_flight", "Quotes running under the scheduler",
+                      lambda: scheduler.stats()["in_flight"])
+    registry.callback("nadlan_scheduler_queued", "Quotes waiting for a scheduler slot",
+                      lambda: scheduler.stats()["queued"])
+    registry.callback("nadlan_scheduler_rejected_total", "Quotes rejected with 429",
+                      lambda: scheduler.stats()["rejected"], kind="counter")
+    registry.callback("nadlan_jobs_queue_depth", "Appraisal jobs waiting for a worker",
+                      lambda: job_manager.stats()["queue_depth"])
+    registry.callback("nadlan_jobs_busy_workers", "Appraisal job workers running a job",
+                      lambda: job_manager.stats()["busy_workers"])
+
+register_metrics()
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "message": "Nadlan API is running"}
+    """Health check endpoint; 503 while the default engine cannot take quotes"""
+    ready = browsers_ready() or DEFAULT_ENGINE == "http"
+    scheduler_stats = scheduler.stats()
+    job_stats = job_manager.stats()
+    return JSONResponse({
+        "status": "healthy" if ready else "browsers_not_ready",
+        "message": "Nadlan API is running",
+        "ready": ready,
+        # Load summary polled by dispatcher.py
+        "capacity": CAPACITY,
+        "in_flight": scheduler_stats["in_flight"],  # jobs and batch items run under the scheduler too
+        "queue_depth": scheduler_stats["queued"] + job_stats["queue_depth"],
+        "execution_mode": EXECUTION_MODE,
+        "default_engine": DEFAULT_ENGINE,
+        "browsers": browsers.stats(),
+        "browser_pool": browser_pool.stats(),
+        "workers": worker_manager.stats(),
+        "session_cache": session_cache.stats(),
+        "quote_cache": quote_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "option_catalog": shared_catalog.stats(),
+        "artifacts": shared_artifacts.stats(),
+        "scheduler": scheduler_stats,
+        "jobs": job_stats
+    }, status_code=200 if ready else 503)
 
 if __name__ == "__main__":
     import uvicorn
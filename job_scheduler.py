@@ -0,0 +1,162 @@
+import asyncio
+import math
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from metrics import QUEUE_WAIT_SECONDS
+
+
+class SchedulerFull(Exception):
+    """Raised when a job is submitted while every slot and queue place is taken"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many jobs in flight, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Reservation:
+    """A queue place claimed by JobScheduler.reserve, handed to run() or released"""
+
+    def __init__(self, scheduler: "JobScheduler"):
+        self.scheduler = scheduler
+        self.held = True
+
+    def release(self):
+        """Give the place back if run() never took it over; safe to call twice"""
+        if self.held:
+            self.held = False
+            self.scheduler.queued -= 1
+
+
+class JobScheduler:
+    """
+    Bounded-concurrency runner for quote jobs.
+
+    At most ``max_in_flight`` jobs run at once and at most ``max_queued``
+    wait for a slot; anything beyond that is rejected with SchedulerFull so
+    the endpoint can answer 429 instead of piling work onto the event loop.
+    """
+
+    def __init__(self, max_in_flight: int = 2, max_queued: int = 8, name: str = "scheduler"):
+        self.name = name  # queue label on nadlan_queue_wait_seconds
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self._avg_duration = 30.0
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    @classmethod
+    def from_env(cls, default_in_flight: int = 2, prefix: str = "NADLAN", name: str = "scheduler") -> "JobScheduler":
+        return cls(
+            max_in_flight=int(os.environ.get(f"{prefix}_MAX_IN_FLIGHT", str(default_in_flight))),
+            max_queued=int(os.environ.get(f"{prefix}_MAX_QUEUED", "8")),
+            name=name,
+        )
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, for the Retry-After header"""
+        waves = (self.queued + 1) / max(self.max_in_flight, 1)
+        return max(1, math.ceil(self._avg_duration * waves))
+
+    def check(self):
+        """Raise SchedulerFull if every slot and queue place is taken"""
+        if self.in_flight + self.queued >= self.max_in_flight + self.max_queued:
+            self.rejected += 1
+            raise SchedulerFull(self.retry_after())
+
+    def reserve(self) -> Reservation:
+        """
+        Claim a queue place now or raise SchedulerFull.
+
+        Checking and counting happen in one step, so a burst of callers
+        cannot all pass the check before any of them is queued. Hand the
+        reservation to run(), and release() it if the job may never start.
+        """
+        self.check()
+        self.queued += 1
+        return Reservation(self)
+
+    async def run(self, job: Callable[[], Awaitable[Any]], wait: bool = False,
+                  reservation: Optional[Reservation] = None) -> Any:
+        """
+        Run ``job()`` once a slot is free; raises SchedulerFull if saturated.
+
+        With ``wait`` the job queues for a slot however long the queue is,
+        for callers that have their own backlog (background jobs, batches).
+        A held ``reservation`` is used as the job's queue place.
+        """
+        if reservation is not None and reservation.held:
+            reservation.held = False  # its queue place is now ours
+        else:
+            if not wait:
+                self.check()
+            self.queued += 1
+
+        queued_at = time.monotonic()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        started = time.monotonic()
+        QUEUE_WAIT_SECONDS.observe(started - queued_at, queue=self.name)
+        try:
+            return await job()
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            # Exponential moving average of job duration
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.monotonic() - started)
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_job_seconds": round(self._avg_duration, 2),
+        }
+
+
+class CommandResult:
+    """Outcome of run_command, shaped like subprocess.CompletedProcess"""
+
+    def __init__(self, args: List[str], returncode: int, stdout: str, stderr: str):
+        self.args = args
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+async def run_command(args: List[str], timeout: Optional[float] = None) -> CommandResult:
+    """
+    Run a command without blocking the event loop.
+
+    On timeout the child is killed and asyncio.TimeoutError is raised.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        process.kill()
+        await process.wait()
+        raise
+
+    return CommandResult(
+        args,
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
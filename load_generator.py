@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Load generator for the appraisal APIs.
+
+Replays recorded request bodies (one JSON object per line) against
+/run-appraisal or /run-nadlan-script, either closed loop (a fixed number of
+clients, each sending its next request when the last one answers) or open
+loop (requests arrive at a fixed rate whether or not earlier ones finished).
+Reports throughput, latency percentiles and error classes per interval and
+per stage, and samples the server's /health (and optionally /metrics) queue
+numbers alongside. Several levels can be run back to back to find the knee
+of the throughput curve:
+
+    python load_generator.py bodies.jsonl --url http://droplet:8000 --concurrency 1,2,4,8,16 --duration 60
+    python load_generator.py bodies.jsonl --url http://localhost:8000 --endpoint /run-nadlan-script --rate 0.5,1,2
+
+A /run-nadlan-script body is a PlaywrightRequest ({"url": ..., "variables": {...}}).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmark_nadlan import percentile
+
+# Throughput gains below this (fraction) between successive levels mark the knee
+KNEE_GAIN = 0.1
+
+
+def load_bodies(path: str, overrides: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Request bodies from a JSONL file (blank lines and # comments skipped)"""
+    bodies = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                body = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: not JSON: {e}")
+            bodies.append({**body, **(overrides or {})})
+    if not bodies:
+        raise ValueError(f"{path} has no request bodies")
+    return bodies
+
+
+def app_error(payload: Any) -> Optional[str]:
+    """The error a 200 response carries in its body, if any (both APIs report quote failures that way)"""
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("error"):
+        return str(payload["error"])
+    parsed = (payload.get("result") or {}).get("parsed_result") if isinstance(payload.get("result"), dict) else None
+    if isinstance(parsed, dict) and parsed.get("error"):
+        return str(parsed["error"])
+    return None
+
+
+def parse_prometheus(text: str, names: List[str]) -> Dict[str, float]:
+    """Sum of every sample of each named metric in a /metrics page"""
+    totals = {name: 0.0 for name in names}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        sample, _, value = line.rpartition(" ")
+        name = sample.split("{", 1)[0]
+        if name in totals:
+            try:
+                totals[name] += float(value)
+            except ValueError:
+                pass
+    return totals
+
+
+def summarize(records: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """Throughput, latency percentiles and error classes for a set of completed requests"""
+    latencies = [r["latency_ms"] for r in records if r["outcome"] == "ok"]
+    return {
+        "requests": len(records),
+        "ok": len(latencies),
+        "errors": dict(Counter(r["outcome"] for r in records if r["outcome"] != "ok")),
+        "cached": sum(1 for r in records if r.get("cached")),
+        "throughput_per_second": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies) if latencies else None,
+    }
+
+
+def find_knee(stages: List[Dict[str, Any]], min_gain: float = KNEE_GAIN) -> Optional[Dict[str, Any]]:
+    """
+    Last level worth running at: the stage before throughput stopped growing
+    by at least ``min_gain`` (or before the error rate went up). None when
+    every step still paid off.
+    """
+    def error_rate(stage):
+        summary = stage["summary"]
+        return sum(summary["errors"].values()) / summary["requests"] if summary["requests"] else 0
+
+    for previous, stage in zip(stages, stages[1:]):
+        before = previous["summary"]["throughput_per_second"]
+        after = stage["summary"]["throughput_per_second"]
+        more_errors = error_rate(stage) > error_rate(previous) + 0.01
+        if more_errors or before <= 0 or (after - before) / before < min_gain:
+            return {"mode": previous["mode"], "level": previous["level"], "throughput_per_second": before,
+                    "p95_ms": previous["summary"]["p95_ms"]}
+    return None
+
+
+class LoadGenerator:
+    """Sends bodies to one endpoint and records what came back"""
+
+    def __init__(self, base_url: str, endpoint: str, bodies: List[Dict[str, Any]], timeout: float = 330,
+                 interval: float = 5, metrics: Optional[List[str]] = None, health_path: str = "/health",
+                 seed: int = 0, client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url.rstrip("/")
+        self.endpoint = endpoint
+        self.bodies = bodies
+        self.timeout = timeout
+        self.interval = interval
+        self.metrics = metrics or []
+        self.health_path = health_path
+        self.client = client or httpx.AsyncClient(
+            timeout=timeout, limits=httpx.Limits(max_connections=None, max_keepalive_connections=100))
+        self._random = random.Random(seed)
+        self._next_body = 0
+        self.in_flight = 0
+
+    def next_body(self) -> Dict[str, Any]:
+        body = self.bodies[self._next_body % len(self.bodies)]
+        self._next_body += 1
+        return body
+
+    async def send(self, started_at: float) -> Dict[str, Any]:
+        """One request; ``started_at`` is the stage's start on the monotonic clock"""
+        body = self.next_body()
+        sent = time.monotonic()
+        record: Dict[str, Any] = {"sent_s": round(sent - started_at, 3)}
+        self.in_flight += 1
+        try:
+            response = await self.client.post(f"{self.base_url}{self.endpoint}", json=body, timeout=self.timeout)
+        except httpx.TimeoutException:
+            record["outcome"] = "timeout"
+        except httpx.HTTPError as e:
+            record["outcome"] = type(e).__name__
+        else:
+            if response.status_code >= 400:
+                record["outcome"] = f"http_{response.status_code}"
+                record["error"] = response.text[:200]
+            else:
+                try:
+                    payload = response.json()
+                except ValueError:
+                    payload = None
+                error = app_error(payload)
+                record["outcome"] = "app_error" if error else "ok"
+                if error:
+                    record["error"] = error[:200]
+                record["cached"] = isinstance(payload, dict) and bool(payload.get("cached"))
+        finally:
+            self.in_flight -= 1
+        record["latency_ms"] = round((time.monotonic() - sent) * 1000, 1)
+        record["done_s"] = round(time.monotonic() - started_at, 3)
+        return record
+
+    async def sample_server(self) -> Dict[str, Any]:
+        """Queue numbers from /health (droplet_server or main.py) and any requested /metrics series"""
+        sample: Dict[str, Any] = {}
+        try:
+            response = await self.client.get(f"{self.base_url}{self.health_path}", timeout=10)
+            health = response.json()
+            scheduler = health.get("scheduler") or {}
+            sample["health_status"] = response.status_code
+            sample["in_flight"] = health.get("in_flight", scheduler.get("in_flight"))
+            sample["queue_depth"] = health.get("queue_depth", scheduler.get("queued"))
+            sample["rejected"] = scheduler.get("rejected")
+        except Exception as e:
+            sample["health_error"] = f"{type(e).__name__}: {e}"
+        if self.metrics:
+            try:
+                response = await self.client.get(f"{self.base_url}/metrics", timeout=10)
+                sample.update(parse_prometheus(response.text, self.metrics))
+            except Exception as e:
+                sample["metrics_error"] = f"{type(e).__name__}: {e}"
+        return sample
+
+    async def _closed_loop(self, concurrency: int, deadline: float, limit: Optional[int], started_at: float,
+                           records: List[Dict[str, Any]]):
+        issued = 0
+
+        async def client():
+            nonlocal issued
+            while time.monotonic() < deadline and (limit is None or issued < limit):
+                issued += 1
+                records.append(await self.send(started_at))
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    async def _open_loop(self, rate: float, deadline: float, limit: Optional[int], started_at: float,
+                         records: List[Dict[str, Any]], poisson: bool):
+        tasks = []
+        next_at = time.monotonic()
+        while next_at < deadline and (limit is None or len(tasks) < limit):
+            await asyncio.sleep(max(next_at - time.monotonic(), 0))
+            tasks.append(asyncio.create_task(self.send(started_at)))
+            next_at += self._random.expovariate(rate) if poisson else 1 / rate
+        records.extend(await asyncio.gather(*tasks))
+
+    async def run_stage(self, mode: str, level: float, duration: Optional[float] = None,
+                        requests: Optional[int] = None, poisson: bool = True) -> Dict[str, Any]:
+        """
+        One level: ``mode`` "closed" with ``level`` clients or "open" at
+        ``level`` requests/second, for ``duration`` seconds or ``requests``
+        requests (whichever ends first). Requests still in flight at the
+        deadline are waited for.
+        """
+        if not duration and not requests:
+            raise ValueError("A stage needs a duration or a request count")
+        records: List[Dict[str, Any]] = []
+        timeline: List[Dict[str, Any]] = []
+        started_at = time.monotonic()
+        deadline = started_at + duration if duration else float("inf")
+        label = f"{int(level)} clients" if mode == "closed" else f"{level:g} req/s"
+        print(f"🚀 {label} for {f'{duration:g}s' if duration else f'{requests} requests'}")
+
+        if mode == "closed":
+            load = asyncio.create_task(self._closed_loop(int(level), deadline, requests, started_at, records))
+        else:
+            load = asyncio.create_task(self._open_loop(level, deadline, requests, started_at, records, poisson))
+
+        reported, last = 0, 0.0
+        while not load.done():
+            await asyncio.wait([load], timeout=self.interval)
+            now = time.monotonic() - started_at
+            window = records[reported:]
+            reported = len(records)
+            point = {
+                "t_s": round(now, 1),
+                "client_in_flight": self.in_flight,
+                **summarize(window, now - last),
+                "server": await self.sample_server(),
+            }
+            timeline.append(point)
+            last = now
+            server = point["server"]
+            print(f"  t={point['t_s']:>6}s  ok={point['ok']:<4} errors={sum(point['errors'].values()):<4} "
+                  f"thr={point['throughput_per_second']:<7} p95={point['p95_ms']} ms  "
+                  f"server in_flight={server.get('in_flight')} queue={server.get('queue_depth')}")
+        await load
+
+        elapsed = max(r["done_s"] for r in records) if records else time.monotonic() - started_at
+        summary = summarize(records, elapsed)
+        print(f"📊 {label}: {summary['throughput_per_second']} req/s, p50 {summary['p50_ms']} ms, "
+              f"p95 {summary['p95_ms']} ms, errors {summary['errors'] or 'none'}")
+        return {"mode": mode, "level": level, "elapsed_s": round(elapsed, 3), "summary": summary,
+                "timeline": timeline, "records": records}
+
+    async def run(self, mode: str, levels: List[float], duration: Optional[float] = None,
+                  requests: Optional[int] = None, poisson: bool = True, pause: float = 0) -> Dict[str, Any]:
+        """Every level in turn; the results document"""
+        stages = []
+        try:
+            for number, level in enumerate(levels):
+                if number and pause:
+                    await asyncio.sleep(pause)  # let the server drain between levels
+                stages.append(await self.run_stage(mode, level, duration, requests, poisson))
+        finally:
+            await self.client.aclose()
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": f"{self.base_url}{self.endpoint}",
+            "mode": mode,
+            "bodies": len(self.bodies),
+            "stages": stages,
+            "knee": find_knee(stages),
+        }
+
+
+def format_table(results: Dict[str, Any]) -> str:
+    header = (f"{'level':>10} {'requests':>9} {'ok':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+              f"{'p99 ms':>9}  errors")
+    lines = [header, "-" * (len(header) + 10)]
+    for stage in results["stages"]:
+        s = stage["summary"]
+        level = f"{int(stage['level'])}c" if stage["mode"] == "closed" else f"{stage['level']:g}/s"
+        errors = ", ".join(f"{name}={count}" for name, count in s["errors"].items()) or "-"
+        lines.append(f"{level:>10} {s['requests']:>9} {s['ok']:>6} {s['throughput_per_second']:>8} "
+                     f"{_ms(s['p50_ms']):>9} {_ms(s['p95_ms']):>9} {_ms(s['p99_ms']):>9}  {errors}")
+    return "\n".join(lines)
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def _levels(spec: str) -> List[float]:
+    return [float(level) for level in spec.split(",") if level.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay request bodies against the appraisal API under load")
+    parser.add_argument("bodies", help="JSONL file, one request body per line")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--endpoint", default="/run-appraisal", help="/run-appraisal or /run-nadlan-script")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", help="closed loop: clients, or a list of levels, e.g. 1,2,4,8")
+    load.add_argument("--rate", help="open loop: requests/second, or a list of levels, e.g. 0.5,1,2")
+    parser.add_argument("--duration", type=float, help="seconds per level (default: 60 unless --requests)")
+    parser.add_argument("--requests", type=int, help="requests per level")
+    parser.add_argument("--uniform", action="store_true", help="open loop: evenly spaced arrivals, not Poisson")
+    parser.add_argument("--pause", type=float, default=5, help="seconds between levels")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between progress reports and /health samples")
+    parser.add_argument("--timeout", type=float, default=330, help="per-request timeout")
+    parser.add_argument("--metric", action="append", default=[], help="also sample this /metrics series (repeatable)")
+    parser.add_argument("--no-cache", action="store_true", help="send use_cache=false so every quote is fresh")
+    parser.add_argument("--override", default="{}", help="JSON merged into every body")
+    parser.add_argument("--seed", type=int, default=0, help="seed for Poisson arrivals")
+    parser.add_argument("--out", default="load_results.json", help="where to write the results")
+    args = parser.parse_args(argv)
+
+    overrides = json.loads(args.override)
+    if args.no_cache:
+        overrides["use_cache"] = False
+    generator = LoadGenerator(args.url, args.endpoint, load_bodies(args.bodies, overrides), timeout=args.timeout,
+                              interval=args.interval, metrics=args.metric, seed=args.seed)
+    mode, levels = ("open", _levels(args.rate)) if args.rate else ("closed", _levels(args.concurrency or "1"))
+    duration = args.duration if args.duration or args.requests else 60
+    results = asyncio.run(generator.run(mode, levels, duration=duration, requests=args.requests,
+                                        poisson=not args.uniform, pause=args.pause))
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print()
+    print(format_table(results))
+    knee = results["knee"]
+    if knee:
+        unit = "clients" if knee["mode"] == "closed" else "req/s"
+        print(f"\n📈 Knee: {knee['level']:g} {unit} ({knee['throughput_per_second']} req/s, p95 {knee['p95_ms']} ms)")
+    print(f"💾 Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Minimal Prometheus metrics.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format by ``REGISTRY.render()`` for the ``/metrics`` endpoints.
+Values that already live elsewhere (pool size, cache hit counts) are read
+through callbacks at scrape time instead of being mirrored.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-100ms HTTP postbacks up to multi-minute browser runs
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> List[str]:
+        return []
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in items]
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose value(s) come from ``callback()`` at scrape time"""
+
+    def __init__(self, name: str, documentation: str, callback: Callable, labelnames: Tuple[str, ...] = (),
+                 kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        lines = []
+        for key, sample in value.items():
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(sample)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts + [sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_number(count)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_number(series[-1])}")
+        return lines
+
+
+class Registry:
+    """Holds every metric and renders them for /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if isinstance(metric, CallbackMetric):
+                    self._metrics[metric.name] = metric  # the latest owner wins
+                    return metric
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Optional[Tuple[float, ...]] = None) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def callback(self, name: str, documentation: str, callback: Callable, labelnames: Tuple[str, ...] = (),
+                 kind: str = "gauge") -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, callback, labelnames, kind))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Shared by the engines, schedulers and both FastAPI apps
+STAGE_SECONDS = REGISTRY.histogram(
+    "nadlan_stage_duration_seconds",
+    "Duration of each stage of the Nadlan flow (goto, login, one per field, fee, ...)",
+    ("stage", "engine", "profile", "outcome"),
+)
+QUOTE_SECONDS = REGISTRY.histogram(
+    "nadlan_quote_duration_seconds",
+    "End-to-end duration of a Nadlan quote run",
+    ("engine", "profile", "outcome"),
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "nadlan_queue_wait_seconds",
+    "Time a job waited for a free slot before it started",
+    ("queue",),
+)
+REQUESTS = REGISTRY.counter(
+    "nadlan_http_requests_total",
+    "API requests by endpoint and status code",
+    ("endpoint", "status"),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "nadlan_http_request_duration_seconds",
+    "API request latency by endpoint",
+    ("endpoint",),
+)
+
+
+def result_outcome(result) -> str:
+    """success (fee returned), no_fee or error"""
+    if not isinstance(result, dict) or "error" in result:
+        return "error"
+    return "success" if result.get("appraisal_fee") else "no_fee"
+
+
+def record_timings(report, outcome: str):
+    """Feed an engine timing report (result["timings"]) into the stage and quote histograms"""
+    labels = {"engine": report.get("engine", "browser"), "profile": report.get("profile", "unknown"), "outcome": outcome}
+    for step in report.get("steps", []):
+        STAGE_SECONDS.observe(step["ms"] / 1000, stage=step["stage"], **labels)
+    QUOTE_SECONDS.observe(report.get("total_ms", 0) / 1000, **labels)
+
+
+def install(app):
+    """Add request instrumentation and a GET /metrics endpoint to a FastAPI app"""
+    import time
+
+    from fastapi import Response
+
+    @app.middleware("http")
+    async def record_request(request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            if endpoint != "/metrics":
+                REQUESTS.inc(endpoint=endpoint, status=str(status))
+                REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
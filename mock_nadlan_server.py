@@ -0,0 +1,705 @@
+"""
+Local stand-in for nadlanvaluation.spurams.com.
+
+Serves login.aspx and AddAppraisal.aspx with the same ctl00_cphBody_* ids,
+dropdown values and postback behaviour as the real site, so engines can be
+exercised without network access or real credentials:
+
+- forms carry their state in __VIEWSTATE, signed per session via
+  __EVENTVALIDATION; tampered or foreign values are rejected
+- the appraisal form lives in an UpdatePanel and answers both full
+  __doPostBack posts and MS Ajax partial postbacks (delta responses)
+- the product dropdown is only populated after the zip postback, and the
+  fee label is rendered once product, state and zip are known
+- a small MS Ajax stand-in is served from ScriptResource.axd, so a real
+  browser runs the same UpdatePanel partial postbacks as the HTTP engine
+- every endpoint can be slowed down by a fixed latency plus seeded jitter,
+  so timings are reproducible from run to run
+
+Usage::
+
+    with MockNadlanServer(latency="typical", jitter=0.05) as server:
+        variables = server.variables(product=60)
+
+The ``mock_nadlan`` pytest fixture (conftest.py) does the same, or run
+``python mock_nadlan_server.py [port] [--latency typical]`` to browse it.
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import html
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+from option_catalog import BUILTIN_OPTIONS
+
+MOCK_USERS = {"mockuser": "mockpass"}
+
+# A complete quote request for the mock; it costs $525.00 (450 + NJ 50 + non-owner 25)
+MOCK_VARIABLES = {
+    "username": "mockuser",
+    "password": "mockpass",
+    "transaction_type": "Purchase",
+    "loan_type": "Conventional",
+    "loan_number": "000000",
+    "borrower": "Test Borrower",
+    "property_type": "Single Family Residential",
+    "property_address": "15 Burr Avenue",
+    "property_city": "Marlboro Township",
+    "property_state": "New Jersey",
+    "property_zip": "07751",
+    "occupancy_type": "Non-Owner Occupied",
+    "contact_person": "Agent",
+    "other_access_instructions": "Lockbox",
+    "agent_name": "Test Agent",
+    "product": 59,
+    "date_appraisal_needed": "12/31/2026",
+}
+
+PRODUCTS = {
+    '59': '1004 Single Family',
+    '60': '1073 Condo',
+    '61': '1025 2-4 Family',
+    '62': '2055 Exterior Only',
+    '63': '1004D Completion Report',
+}
+
+PRODUCT_FEES = {'59': 450, '60': 425, '61': 600, '62': 300, '63': 150}
+STATE_SURCHARGES = {'CA': 75, 'NY': 75, 'NJ': 50}
+
+PREFIX = "ctl00$cphBody$"
+SCRIPT_MANAGER = "ctl00$ScriptManager1"
+UPDATE_PANEL = "ctl00$cphBody$upAppraisal"
+UPDATE_PANEL_ID = "ctl00_cphBody_upAppraisal"
+
+# Dropdowns on AddAppraisal.aspx: control -> {label: value}. drpAppraisalType
+# is filled in by the zip postback.
+SELECTS = {
+    **BUILTIN_OPTIONS,
+    'drpProject': {'Standard': '1', 'Rush': '2'},
+}
+
+TEXT_INPUTS = (
+    'txtLoanNumber', 'txtBorrowerName', 'txtPropertyAddress', 'txtPropertyCity',
+    'txtPropertyZip', 'txtAgentName', 'txtAccessInformation', 'txtDateNeeded',
+)
+
+AUTO_POSTBACK = {
+    'drpTransactionType', 'drpLoanType', 'drpPropertyType', 'drpPropertyState',
+    'txtPropertyZip', 'drpOccupiedBy', 'drpAppointmentContact', 'drpAppraisalType',
+}
+
+# Endpoints that can be given a latency (seconds). "postback:<control>"
+# overrides "postback" for one field's postback, "*" covers the rest.
+ENDPOINTS = {
+    "login_page": "GET login.aspx",
+    "login": "POST login.aspx",
+    "form": "GET AddAppraisal.aspx",
+    "postback": "POST AddAppraisal.aspx (full or partial postback)",
+    "script": "GET ScriptResource.axd",
+}
+
+# Rough shape of the live site: logging in and the zip/product postbacks
+# (which look up products and price the order) are the slow steps
+LATENCY_PROFILES = {
+    "none": {},
+    "typical": {
+        "login_page": 0.3, "login": 0.6, "form": 0.5, "script": 0.05,
+        "postback": 0.2, "postback:txtPropertyZip": 0.6, "postback:drpAppraisalType": 0.5,
+    },
+    "slow": {
+        "login_page": 1.0, "login": 2.0, "form": 1.5, "script": 0.2,
+        "postback": 0.6, "postback:txtPropertyZip": 2.0, "postback:drpAppraisalType": 1.5,
+    },
+}
+
+# Minimal stand-in for MicrosoftAjax.js: just enough of Sys.WebForms.PageRequestManager
+# for UpdatePanel partial postbacks (delta responses) and the begin/endRequest
+# events that nadlan_waits hooks
+MS_AJAX_SCRIPT = r"""
+var Sys = window.Sys || {};
+Sys.WebForms = Sys.WebForms || {};
+Sys.WebForms.PageRequestManager = (function () {
+    var instance = null;
+
+    function PageRequestManager() {
+        this._form = null;
+        this._scriptManagerID = null;
+        this._panels = [];  // [uniqueID, clientID]
+        this._handlers = {beginRequest: [], endRequest: [], pageLoaded: []};
+        this._request = null;
+        this._timeout = 90;
+    }
+
+    PageRequestManager.getInstance = function () {
+        if (!instance) instance = new PageRequestManager();
+        return instance;
+    };
+
+    PageRequestManager._initialize = function (scriptManagerID, formID, updatePanelIDs, asyncPostBackControlIDs,
+                                               postBackControlIDs, timeout, masterPageID) {
+        var prm = PageRequestManager.getInstance();
+        prm._scriptManagerID = scriptManagerID;
+        prm._form = document.getElementById(formID);
+        prm._timeout = timeout || 90;
+        prm._panels = [];
+        for (var i = 0; i + 1 < updatePanelIDs.length; i += 2) {
+            prm._panels.push([updatePanelIDs[i].substr(1), updatePanelIDs[i + 1]]);
+        }
+        var original = window.__doPostBack;
+        window.__doPostBack = function (eventTarget, eventArgument) {
+            if (!prm._doPostBack(eventTarget, eventArgument)) original(eventTarget, eventArgument);
+        };
+    };
+
+    PageRequestManager._parseDelta = function (text) {
+        var entries = [], i = 0;
+        while (i < text.length) {
+            var lengthEnd = text.indexOf('|', i);
+            var typeEnd = text.indexOf('|', lengthEnd + 1);
+            var idEnd = text.indexOf('|', typeEnd + 1);
+            var length = parseInt(text.substring(i, lengthEnd), 10);
+            entries.push({
+                type: text.substring(lengthEnd + 1, typeEnd),
+                id: text.substring(typeEnd + 1, idEnd),
+                content: text.substr(idEnd + 1, length)
+            });
+            i = idEnd + 1 + length + 1;
+        }
+        return entries;
+    };
+
+    var proto = PageRequestManager.prototype;
+
+    ['beginRequest', 'endRequest', 'pageLoaded'].forEach(function (name) {
+        proto['add_' + name] = function (handler) { this._handlers[name].push(handler); };
+        proto['remove_' + name] = function (handler) {
+            this._handlers[name] = this._handlers[name].filter(function (h) { return h !== handler; });
+        };
+    });
+
+    proto._raise = function (name, args) {
+        var self = this;
+        this._handlers[name].forEach(function (handler) { handler(self, args); });
+    };
+
+    proto.get_isInAsyncPostBack = function () { return this._request !== null; };
+
+    proto.abortPostBack = function () {
+        if (this._request) this._request.abort();
+    };
+
+    proto._panelFor = function (eventTarget) {
+        var element = document.getElementsByName(eventTarget)[0];
+        for (var i = 0; element && i < this._panels.length; i++) {
+            var panel = document.getElementById(this._panels[i][1]);
+            if (panel && panel.contains(element)) return this._panels[i];
+        }
+        return null;
+    };
+
+    proto._body = function (eventTarget, panel) {
+        var form = this._form, parts = [];
+        function add(name, value) { parts.push(encodeURIComponent(name) + '=' + encodeURIComponent(value)); }
+        add(this._scriptManagerID, panel[0] + '|' + eventTarget);
+        for (var i = 0; i < form.elements.length; i++) {
+            var element = form.elements[i], type = (element.type || '').toLowerCase();
+            if (!element.name || element.disabled || type === 'submit' || type === 'button' || type === 'image') continue;
+            if ((type === 'checkbox' || type === 'radio') && !element.checked) continue;
+            add(element.name, element.value);
+        }
+        add('__ASYNCPOST', 'true');
+        return parts.join('&');
+    };
+
+    proto._doPostBack = function (eventTarget, eventArgument) {
+        var panel = this._panelFor(eventTarget);
+        if (!this._form || !panel) return false;
+        // Like MS Ajax, a new postback cancels the one in flight
+        this.abortPostBack();
+        this._form.__EVENTTARGET.value = eventTarget;
+        this._form.__EVENTARGUMENT.value = eventArgument || '';
+        var self = this, controller = new AbortController(), error = null;
+        var timer = setTimeout(function () { controller.abort(); }, this._timeout * 1000);
+        this._request = controller;
+        this._raise('beginRequest', {get_postBackElement: function () { return document.getElementsByName(eventTarget)[0]; }});
+        fetch(this._form.action, {
+            method: 'POST',
+            credentials: 'same-origin',
+            signal: controller.signal,
+            headers: {
+                'X-MicrosoftAjax': 'Delta=true',
+                'Content-Type': 'application/x-www-form-urlencoded; charset=utf-8',
+                'Cache-Control': 'no-cache'
+            },
+            body: this._body(eventTarget, panel)
+        }).then(function (response) {
+            return response.text();
+        }).then(function (text) {
+            if (controller.signal.aborted) return;
+            PageRequestManager._parseDelta(text).forEach(function (entry) {
+                if (entry.type === 'updatePanel') {
+                    document.getElementById(entry.id).innerHTML = entry.content;
+                } else if (entry.type === 'hiddenField') {
+                    var field = document.getElementById(entry.id);
+                    if (field) field.value = entry.content;
+                } else if (entry.type === 'pageTitle') {
+                    document.title = entry.content;
+                } else if (entry.type === 'pageRedirect') {
+                    window.location.href = entry.content;
+                } else if (entry.type === 'error') {
+                    error = new Error(entry.content);
+                }
+            });
+        }).catch(function (e) {
+            if (!controller.signal.aborted || self._request === controller) error = e;
+        }).then(function () {
+            clearTimeout(timer);
+            if (self._request !== controller) return;  // superseded by a newer postback
+            self._request = null;
+            self._raise('endRequest', {get_error: function () { return error; }, set_errorHandled: function () {}});
+            self._raise('pageLoaded', {});
+        });
+        return true;
+    };
+
+    return PageRequestManager;
+})();
+"""
+
+
+def expected_fee(fields: Dict[str, str]) -> Optional[int]:
+    """Fee the mock quotes for a set of form values (keyed by control name)"""
+    product = fields.get('drpAppraisalType')
+    zip_code = fields.get('txtPropertyZip', '')
+    state = fields.get('drpPropertyState')
+    if product not in PRODUCT_FEES or not state or len(zip_code) < 5:
+        return None
+    fee = PRODUCT_FEES[product] + STATE_SURCHARGES.get(state, 0)
+    if fields.get('drpOccupiedBy') == 'Non-Owner':
+        fee += 25
+    return fee
+
+
+def _page(title: str, form_action: str, body: str, viewstate: str, validation: str) -> str:
+    return f"""<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body>
+<form name="aspnetForm" method="post" action="{form_action}" id="aspnetForm">
+<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="" />
+<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="" />
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{viewstate}" />
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{validation}" />
+<script type="text/javascript">
+var theForm = document.forms['aspnetForm'];
+function __doPostBack(eventTarget, eventArgument) {{
+    if (!theForm.onsubmit || (theForm.onsubmit() != false)) {{
+        theForm.__EVENTTARGET.value = eventTarget;
+        theForm.__EVENTARGUMENT.value = eventArgument;
+        theForm.submit();
+    }}
+}}
+</script>
+{body}
+</form>
+</body></html>"""
+
+
+class MockSession:
+    """One logged-in user; its secret signs the viewstate of every form it is served"""
+
+    def __init__(self, username: str):
+        self.username = username
+        self.secret = secrets.token_bytes(16)
+
+    def sign(self, viewstate: str) -> str:
+        return hmac.new(self.secret, viewstate.encode(), hashlib.sha256).hexdigest()[:24]
+
+    def form(self, fields: Optional[Dict[str, str]] = None) -> "MockForm":
+        return MockForm(self, fields)
+
+    def load_form(self, viewstate: str, validation: str) -> Optional["MockForm"]:
+        """The form a postback came from; None when its viewstate is not one this session issued"""
+        if not hmac.compare_digest(self.sign(viewstate), validation):
+            return None
+        return MockForm(self, json.loads(base64.b64decode(viewstate))["fields"])
+
+
+class MockForm:
+    """
+    State of one AddAppraisal.aspx page. Like real WebForms it travels in the
+    page's own __VIEWSTATE, so a user can have several forms open at once.
+    """
+
+    def __init__(self, session: MockSession, fields: Optional[Dict[str, str]] = None):
+        self.fields: Dict[str, str] = dict(fields or {})
+        self.viewstate = base64.b64encode(json.dumps({"fields": self.fields}, sort_keys=True).encode()).decode()
+        self.validation = session.sign(self.viewstate)
+
+
+class MockNadlanHandler(BaseHTTPRequestHandler):
+    server_version = "Microsoft-IIS/10.0"
+
+    @property
+    def mock(self) -> "MockNadlanServer":
+        return self.server.mock
+
+    def log_message(self, format, *args):
+        if self.mock.verbose:
+            super().log_message(format, *args)
+
+    # --- plumbing -------------------------------------------------------
+
+    def _cookies(self) -> Dict[str, str]:
+        cookies = {}
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            if "=" in part:
+                name, value = part.strip().split("=", 1)
+                cookies[name] = value
+        return cookies
+
+    def _session(self) -> Optional[MockSession]:
+        return self.mock.sessions.get(self._cookies().get(".ASPXAUTH", ""))
+
+    def _form(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode()
+        return {name: values[-1] for name, values in parse_qs(body, keep_blank_values=True).items()}
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8",
+              headers: Optional[Dict[str, str]] = None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        headers = {"Cache-Control": "private", **(headers or {})}
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _route(self) -> str:
+        return urlparse(self.path).path.lower()
+
+    # --- requests -------------------------------------------------------
+
+    def do_GET(self):
+        self.mock.count(self._route())
+        route = self._route()
+        if route == "/login.aspx":
+            self.mock.delay("login_page")
+            self._send(200, self._login_page())
+        elif route == "/addappraisal.aspx":
+            self.mock.delay("form")
+            session = self._session()
+            if session is None:
+                self._redirect("/login.aspx?ReturnUrl=%2fAddAppraisal.aspx")
+                return
+            self._send(200, self._appraisal_page(session.form()))
+        elif route == "/scriptresource.axd":
+            self.mock.delay("script")
+            self._send(200, MS_AJAX_SCRIPT, content_type="application/x-javascript",
+                       headers={"Cache-Control": "public, max-age=31536000"})
+        else:
+            self._send(404, "<h1>404 - File or directory not found.</h1>")
+
+    def do_POST(self):
+        self.mock.count(self._route())
+        route = self._route()
+        if route == "/login.aspx":
+            form = self._form()
+            self.mock.delay("login")
+            self._post_login(form)
+        elif route == "/addappraisal.aspx":
+            form = self._form()
+            self.mock.delay("postback", form.get("__EVENTTARGET", "")[len(PREFIX):])
+            self._post_appraisal(form)
+        else:
+            self._send(404, "<h1>404 - File or directory not found.</h1>")
+
+    def _post_login(self, form: Dict[str, str]):
+        username = form.get(PREFIX + "Login1$UserName", "")
+        password = form.get(PREFIX + "Login1$Password", "")
+        if self.mock.users.get(username) != password:
+            self._send(200, self._login_page(error="Your login attempt was not successful. Please try again."))
+            return
+        token = secrets.token_hex(16)
+        self.mock.sessions[token] = MockSession(username)
+        self._redirect("/AddAppraisal.aspx", headers={
+            "Set-Cookie": f".ASPXAUTH={token}; path=/; HttpOnly",
+        })
+
+    def _post_appraisal(self, form: Dict[str, str]):
+        session = self._session()
+        is_async = self.headers.get("X-MicrosoftAjax") == "Delta=true" or form.get("__ASYNCPOST") == "true"
+        if session is None:
+            if is_async:
+                self._send(200, self._delta([("pageRedirect", "", "/login.aspx?ReturnUrl=%2fAddAppraisal.aspx")]),
+                           content_type="text/plain; charset=utf-8")
+            else:
+                self._redirect("/login.aspx?ReturnUrl=%2fAddAppraisal.aspx")
+            return
+
+        state = session.load_form(form.get("__VIEWSTATE", ""), form.get("__EVENTVALIDATION", ""))
+        if state is None:
+            self.mock.rejected_postbacks += 1
+            message = "Validation of viewstate MAC failed."
+            if is_async:
+                self._send(200, self._delta([("error", "500", message)]), content_type="text/plain; charset=utf-8")
+            else:
+                self._send(500, f"<h1>Server Error in '/' Application.</h1><p>{message}</p>")
+            return
+
+        fields = dict(state.fields)
+        for name, value in form.items():
+            if name.startswith(PREFIX):
+                fields[name[len(PREFIX):]] = value
+        if fields.get('drpAppraisalType') not in self._products(fields):
+            fields.pop('drpAppraisalType', None)
+        with self.mock._lock:
+            self.mock.postbacks += 1
+        state = session.form(fields)
+
+        if is_async:
+            self._send(200, self._delta([
+                ("updatePanel", UPDATE_PANEL_ID, self._appraisal_panel(state)),
+                ("hiddenField", "__EVENTTARGET", ""),
+                ("hiddenField", "__EVENTARGUMENT", ""),
+                ("hiddenField", "__VIEWSTATE", state.viewstate),
+                ("hiddenField", "__EVENTVALIDATION", state.validation),
+                ("asyncPostBackControlIDs", "", ""),
+                ("pageTitle", "", "Add Appraisal"),
+            ]), content_type="text/plain; charset=utf-8")
+        else:
+            self._send(200, self._appraisal_page(state))
+
+    # --- rendering ------------------------------------------------------
+
+    @staticmethod
+    def _delta(entries) -> str:
+        return "".join(f"{len(content)}|{kind}|{ident}|{content}|" for kind, ident, content in entries)
+
+    def _login_page(self, error: str = "") -> str:
+        body = f"""
+<div id="ctl00_cphBody_Login1">
+  <span id="ctl00_cphBody_Login1_FailureText" style="color:Red;">{html.escape(error)}</span>
+  <input name="ctl00$cphBody$Login1$UserName" type="text" id="ctl00_cphBody_Login1_UserName" />
+  <input name="ctl00$cphBody$Login1$Password" type="password" id="ctl00_cphBody_Login1_Password" />
+  <input type="submit" name="ctl00$cphBody$Login1$LoginButton" value="Log In" id="ctl00_cphBody_Login1_LoginButton" />
+</div>"""
+        return _page("Login", "./login.aspx?ReturnUrl=%2fAddAppraisal.aspx", body,
+                     base64.b64encode(b"login").decode(), "login")
+
+    def _products(self, fields: Dict[str, str]) -> Dict[str, str]:
+        zip_code = fields.get('txtPropertyZip', '')
+        if len(zip_code) < 5 or not zip_code[:5].isdigit():
+            return {}
+        return {value: label for value, label in PRODUCTS.items()}
+
+    def _select(self, state: MockForm, control: str, options: Dict[str, str]) -> str:
+        selected = state.fields.get(control)
+        rendered = ['<option value="">-- Select --</option>']
+        for label, value in options.items():
+            flag = ' selected="selected"' if value == selected else ''
+            rendered.append(f'<option{flag} value="{html.escape(value)}">{html.escape(label)}</option>')
+        return self._control_tag(control, "select", "".join(rendered))
+
+    def _control_tag(self, control: str, tag: str, inner: str = "", value: str = "") -> str:
+        postback = ""
+        if control in AUTO_POSTBACK:
+            postback = f""" onchange="javascript:setTimeout('__doPostBack(\\'{PREFIX}{control}\\',\\'\\')', 0)\""""
+        if tag == "select":
+            return f'<select name="{PREFIX}{control}" id="ctl00_cphBody_{control}"{postback}>{inner}</select>'
+        return (f'<input name="{PREFIX}{control}" type="text" value="{html.escape(value)}" '
+                f'id="ctl00_cphBody_{control}"{postback} />')
+
+    def _appraisal_panel(self, state: MockForm) -> str:
+        rows = []
+        for control, options in SELECTS.items():
+            rows.append(f"<div>{self._select(state, control, options)}</div>")
+        for control in TEXT_INPUTS:
+            rows.append(f"<div>{self._control_tag(control, 'input', value=state.fields.get(control, ''))}</div>")
+        products = {label: value for value, label in self._products(state.fields).items()}
+        rows.append(f"<div>{self._select(state, 'drpAppraisalType', products)}</div>")
+
+        fee = expected_fee(state.fields)
+        fee_text = f"${fee:,.2f}" if fee is not None else ""
+        rows.append(f'<div>Appraisal Fee: <span id="ctl00_cphBody_lblLenderAppraisalFee">{fee_text}</span></div>')
+        return "\n".join(rows)
+
+    def _appraisal_page(self, state: MockForm) -> str:
+        prm = ""
+        if self.mock.partial_postbacks:
+            prm = f"""
+<script src="/ScriptResource.axd?d=MicrosoftAjax.js" type="text/javascript"></script>
+<script type="text/javascript">
+//<![CDATA[
+Sys.WebForms.PageRequestManager._initialize('{SCRIPT_MANAGER}', 'aspnetForm', ['t{UPDATE_PANEL}','{UPDATE_PANEL_ID}'], [], [], 90, 'ctl00');
+//]]>
+</script>"""
+        body = f"""{prm}
+<div id="{UPDATE_PANEL_ID}">
+{self._appraisal_panel(state)}
+</div>
+<input type="submit" name="ctl00$cphBody$btnSubmit" value="Create Order" id="ctl00_cphBody_btnSubmit" />"""
+        return _page("Add Appraisal", "./AddAppraisal.aspx", body, state.viewstate, state.validation)
+
+
+class MockNadlanServer:
+    """Threaded mock Nadlan site on localhost; use as a context manager"""
+
+    def __init__(self, port: int = 0, users: Optional[Dict[str, str]] = None, partial_postbacks: bool = True,
+                 latency: Union[str, float, Dict[str, float], None] = None, jitter: float = 0, seed: int = 0,
+                 verbose: bool = False):
+        self.users = dict(users or MOCK_USERS)
+        self.partial_postbacks = partial_postbacks  # False: no UpdatePanel, every postback reloads the page
+        self.latency = parse_latency(latency)
+        self.jitter = jitter  # +/- seconds added to every non-zero latency
+        self.verbose = verbose
+        self.sessions: Dict[str, MockSession] = {}
+        self.requests: Dict[str, int] = {}
+        self.postbacks = 0
+        self.rejected_postbacks = 0
+        self.delayed_seconds = 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), MockNadlanHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "MockNadlanServer":
+        """Latency settings from NADLAN_MOCK_LATENCY / _JITTER / _SEED, e.g. to rerun the tests under "typical" """
+        kwargs.setdefault("latency", os.environ.get("NADLAN_MOCK_LATENCY"))
+        kwargs.setdefault("jitter", float(os.environ.get("NADLAN_MOCK_JITTER", "0")))
+        kwargs.setdefault("seed", int(os.environ.get("NADLAN_MOCK_SEED", "0")))
+        return cls(**kwargs)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def variables(self, **overrides) -> Dict[str, Any]:
+        """MOCK_VARIABLES pointed at this server, with ``overrides`` applied"""
+        return {**MOCK_VARIABLES, "base_url": self.url, **overrides}
+
+    def latency_for(self, endpoint: str, control: Optional[str] = None) -> float:
+        """Seconds to hold a response to ``endpoint``: its latency plus seeded jitter"""
+        base = self.latency.get(f"{endpoint}:{control}") if control else None
+        if base is None:
+            base = self.latency.get(endpoint, self.latency.get("*", 0.0))
+        if base <= 0:
+            return 0.0
+        if self.jitter:
+            with self._lock:
+                base += self._random.uniform(-self.jitter, self.jitter)
+        return max(base, 0.0)
+
+    def delay(self, endpoint: str, control: Optional[str] = None):
+        seconds = self.latency_for(endpoint, control)
+        if seconds:
+            with self._lock:
+                self.delayed_seconds += seconds
+            time.sleep(seconds)
+
+    def count(self, route: str):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def start(self) -> "MockNadlanServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:  # shutdown() waits for a serve_forever() that never ran otherwise
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockNadlanServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "sessions": len(self.sessions),
+            "postbacks": self.postbacks,
+            "rejected_postbacks": self.rejected_postbacks,
+            "latency": dict(self.latency),
+            "jitter": self.jitter,
+            "delayed_seconds": round(self.delayed_seconds, 3),
+        }
+
+
+def parse_latency(latency: Union[str, float, Dict[str, float], None]) -> Dict[str, float]:
+    """
+    Latency settings as {endpoint: seconds}. Accepts a LATENCY_PROFILES name,
+    one number for every endpoint, a dict, or a spec such as
+    "form=0.5,postback=0.2,postback:txtPropertyZip=0.8".
+    """
+    if not latency:
+        return {}
+    if isinstance(latency, (int, float)):
+        return {"*": float(latency)}
+    if isinstance(latency, dict):
+        parsed = {endpoint: float(seconds) for endpoint, seconds in latency.items()}
+    elif latency in LATENCY_PROFILES:
+        return dict(LATENCY_PROFILES[latency])
+    else:
+        try:
+            return {"*": float(latency)}
+        except ValueError:
+            pass
+        parsed = {}
+        for part in latency.split(","):
+            endpoint, sep, seconds = part.strip().partition("=")
+            if not sep:
+                raise ValueError(f"Bad latency '{part}', expected endpoint=seconds or one of {sorted(LATENCY_PROFILES)}")
+            parsed[endpoint.strip()] = float(seconds)
+    for endpoint in parsed:
+        if endpoint != "*" and endpoint.split(":")[0] not in ENDPOINTS:
+            raise ValueError(f"Unknown mock endpoint '{endpoint}', expected one of {sorted(ENDPOINTS)}")
+    return parsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Nadlan site")
+    parser.add_argument("port", nargs="?", type=int, default=8800)
+    parser.add_argument("--latency", help=f"profile ({', '.join(LATENCY_PROFILES)}), seconds, or endpoint=seconds,...")
+    parser.add_argument("--jitter", type=float, default=0, help="+/- seconds of seeded jitter")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--full-postbacks", action="store_true", help="no UpdatePanel; every postback reloads")
+    args = parser.parse_args()
+
+    server = MockNadlanServer(port=args.port, partial_postbacks=not args.full_postbacks, latency=args.latency,
+                              jitter=args.jitter, seed=args.seed, verbose=True)
+    print(f"🧪 Mock Nadlan site on {server.url} (login: mockuser / mockpass)")
+    if server.latency:
+        print(f"🐢 Latency: {server.latency} (jitter ±{server.jitter}s)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
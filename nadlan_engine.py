@@ -0,0 +1,467 @@
+"""
+Single Nadlan appraisal form engine.
+
+The form is described once as a table of FieldSpec entries and driven by
+NadlanEngine; how aggressively it runs (timeouts, extra settle time, load
+state) is a SpeedProfile. The old hand-tuned script variants are now just
+profiles of this engine.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import async_playwright
+
+from artifacts import NONE, screenshot_policy, shared_artifacts
+from metrics import record_timings, result_outcome
+from nadlan_waits import AllOf, NoWait, OptionsRepopulated, PostbackIdle, WaitCondition, perform
+from option_catalog import OptionCatalog, shared_catalog
+from resource_policy import ResourcePolicy
+from result_channel import ResultChannel
+
+DEFAULT_BASE_URL = "https://nadlanvaluation.spurams.com"
+
+FEE_SELECTOR = '#ctl00_cphBody_lblLenderAppraisalFee'
+
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP'}
+_FEE_PATTERN = re.compile(r'(?:([A-Z]{3})\s*)?([$€£])?\s*(\d[\d,]*(?:\.\d+)?)')
+
+# Resolves with the fee label's trimmed text once it contains a number, so
+# only that string crosses from the page to Python
+_FEE_READY = """
+(selector) => {
+    const el = document.querySelector(selector);
+    if (!el) return null;
+    const text = (el.textContent || '').trim();
+    return /\\d/.test(text) ? text : null;
+}
+"""
+
+# Sets many inputs in one round trip. Uses the native value setter and fires
+# input + change so any client-side validators see the new value. Returns
+# the selectors it could not find so the caller can fall back for those.
+_BULK_FILL = """
+(entries) => {
+    const missing = [];
+    for (const [selector, value] of entries) {
+        const el = document.querySelector(selector);
+        if (!el) { missing.push(selector); continue; }
+        const descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value');
+        if (descriptor && descriptor.set) {
+            descriptor.set.call(el, value);
+        } else {
+            el.value = value;
+        }
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    return missing;
+}
+"""
+
+
+@dataclass
+class FieldSpec:
+    """One input on AddAppraisal.aspx and how to set it from a request variable"""
+
+    name: str                       # key in the request variables
+    selector: str
+    kind: str = "fill"              # "fill" or "select"
+    catalog: bool = False           # labels are looked up in the OptionCatalog
+    postback: bool = False          # changing it posts the form back to the server
+    wait: Optional[WaitCondition] = None
+
+    def __post_init__(self):
+        if self.wait is None:
+            self.wait = PostbackIdle() if self.postback else NoWait()
+
+    @property
+    def control(self) -> str:
+        """Control id without the ctl00_cphBody_ prefix, e.g. drpLoanType"""
+        return self.selector.rsplit('_', 1)[-1]
+
+    def resolve(self, label: Any, catalog: OptionCatalog) -> str:
+        """Form value for a request label; raises UnknownOption for catalog fields"""
+        if self.catalog:
+            return catalog.lookup(self.control, label, field=self.name)
+        return str(label)
+
+
+# In the order the form is filled; dependent fields come after the fields
+# whose postbacks rebuild them.
+NADLAN_FIELDS: List[FieldSpec] = [
+    FieldSpec('transaction_type', '#ctl00_cphBody_drpTransactionType', 'select', catalog=True, postback=True),
+    FieldSpec('loan_type', '#ctl00_cphBody_drpLoanType', 'select', catalog=True, postback=True),
+    FieldSpec('loan_number', '#ctl00_cphBody_txtLoanNumber'),
+    FieldSpec('borrower', '#ctl00_cphBody_txtBorrowerName'),
+    FieldSpec('property_type', '#ctl00_cphBody_drpPropertyType', 'select', catalog=True, postback=True),
+    FieldSpec('property_address', '#ctl00_cphBody_txtPropertyAddress'),
+    FieldSpec('property_city', '#ctl00_cphBody_txtPropertyCity'),
+    FieldSpec('property_state', '#ctl00_cphBody_drpPropertyState', 'select', catalog=True, postback=True),
+    # The zip postback rebuilds the product dropdown; wait for its new options too
+    FieldSpec('property_zip', '#ctl00_cphBody_txtPropertyZip', postback=True,
+              wait=AllOf(PostbackIdle(), OptionsRepopulated('#ctl00_cphBody_drpAppraisalType'))),
+    FieldSpec('occupancy_type', '#ctl00_cphBody_drpOccupiedBy', 'select', catalog=True, postback=True),
+    FieldSpec('agent_name', '#ctl00_cphBody_txtAgentName'),
+    FieldSpec('contact_person', '#ctl00_cphBody_drpAppointmentContact', 'select', catalog=True, postback=True),
+    FieldSpec('other_access_instructions', '#ctl00_cphBody_txtAccessInformation'),
+    FieldSpec('date_appraisal_needed', '#ctl00_cphBody_txtDateNeeded'),
+    FieldSpec('product', '#ctl00_cphBody_drpAppraisalType', 'select', postback=True),
+]
+
+
+@dataclass
+class SpeedProfile:
+    """How hard the engine pushes the site"""
+
+    name: str
+    settle_ms: int = 0                  # extra fixed delay after every step
+    selector_timeout_ms: int = 5000     # waiting for form elements to appear
+    postback_timeout_ms: int = 15000    # waiting for a step's condition
+    load_state: str = "domcontentloaded"
+    bulk_fill: bool = False             # set plain text inputs in one page.evaluate
+
+
+# The former script variants, expressed as configuration. Their hand-tuned
+# sleeps survive as settle_ms so they can still be benchmarked side by side.
+PROFILES: Dict[str, SpeedProfile] = {
+    profile.name: profile for profile in [
+        SpeedProfile("simple_working", bulk_fill=True),
+        SpeedProfile("ultra_fast", settle_ms=200, selector_timeout_ms=3000, bulk_fill=True),
+        SpeedProfile("working", settle_ms=500, selector_timeout_ms=3000),
+        SpeedProfile("fast", settle_ms=500, selector_timeout_ms=10000, load_state="networkidle"),
+        SpeedProfile("smart", settle_ms=500, selector_timeout_ms=10000, load_state="networkidle"),
+        SpeedProfile("simple", settle_ms=2000, selector_timeout_ms=10000, load_state="networkidle"),
+        SpeedProfile("original", settle_ms=2000, selector_timeout_ms=10000, load_state="networkidle"),
+    ]
+}
+
+DEFAULT_PROFILE = os.environ.get("NADLAN_PROFILE", "simple_working")
+
+
+class NadlanEngine:
+    """Logs in to Nadlan, fills AddAppraisal.aspx from NADLAN_FIELDS and reads the fee"""
+
+    default_profile = DEFAULT_PROFILE
+    engine_name = "browser"
+    fields = NADLAN_FIELDS
+
+    def __init__(self, variables, profile: Optional[str] = None, catalog: Optional[OptionCatalog] = None):
+        self.variables = variables
+        self.headless = variables.get('headless', False)
+        self.base_url = (variables.get('base_url') or os.environ.get("NADLAN_BASE_URL", DEFAULT_BASE_URL)).rstrip('/')
+        profile_name = profile or variables.get('profile') or self.default_profile
+        if profile_name not in PROFILES:
+            raise ValueError(f"Unknown speed profile '{profile_name}', expected one of {sorted(PROFILES)}")
+        self.profile = PROFILES[profile_name]
+        self.logged_in = False
+        self.timings: List[Dict[str, Any]] = []
+        self.on_stage = None  # optional callback, called with each timing entry as it is recorded
+        self.last_field_changed: Optional[float] = None  # perf_counter of the last field set
+        self.resource_policy = ResourcePolicy.from_variables(variables, self.base_url)
+        self.catalog = catalog or shared_catalog
+        self.job_id = uuid.uuid4().hex
+        self.screenshot = screenshot_policy(variables)
+        self.artifacts = shared_artifacts
+        # Resolve labels up front so an unknown option fails before any browsing
+        self.steps = self.resolve_steps()
+
+    def is_valid_value(self, value):
+        """Check if a value is valid (not None, empty string, or just whitespace)"""
+        if value is None:
+            return False
+        if isinstance(value, str) and value.strip() == "":
+            return False
+        return True
+
+    def resolve_steps(self):
+        """(spec, label, form value) for every field the request fills, in form order"""
+        steps = []
+        for spec in self.fields:
+            label = self.variables.get(spec.name)
+            if self.is_valid_value(label):
+                steps.append((spec, label, spec.resolve(label, self.catalog)))
+        return steps
+
+    async def run(self, context=None):
+        """
+        Run the appraisal flow.
+
+        When a BrowserContext is given (e.g. from BrowserPool) the flow runs
+        in a new page on that context; otherwise a private Firefox is launched.
+        """
+        if context is not None:
+            page = await context.new_page()
+            try:
+                await self.prepare_page(page)
+                return await self.run_on_page(page)
+            finally:
+                await page.close()
+
+        async with async_playwright() as p:
+            browser = await p.firefox.launch(headless=self.headless)
+            page = await browser.new_page()
+            try:
+                await self.prepare_page(page)
+                return await self.run_on_page(page)
+            finally:
+                await browser.close()
+
+    async def prepare_page(self, page):
+        """Per-page setup before the first navigation"""
+        if self.resource_policy is not None:
+            await self.resource_policy.install(page)
+
+    async def timed(self, stage: str, action, wait: str = "none"):
+        """Await ``action`` and record how long the stage took"""
+        started = time.perf_counter()
+        try:
+            return await action
+        finally:
+            step = {
+                "stage": stage,
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+                "wait": wait,
+            }
+            self.timings.append(step)
+            if self.on_stage is not None:
+                self.on_stage(step)
+
+    def timing_report(self) -> Dict[str, Any]:
+        return {
+            "engine": self.engine_name,
+            "profile": self.profile.name,
+            "total_ms": round(sum(step["ms"] for step in self.timings), 1),
+            "steps": self.timings,
+        }
+
+    def needs_login(self, page):
+        """True when Nadlan bounced us to the login page"""
+        return 'login.aspx' in page.url.lower()
+
+    async def run_on_page(self, page):
+        """Drive the Nadlan login and appraisal form on an open page"""
+        try:
+            # Navigate directly to AddAppraisal.aspx (will redirect to login if needed)
+            print("🚀 Navigating directly to AddAppraisal.aspx...")
+            await self.timed("goto", page.goto(f"{self.base_url}/AddAppraisal.aspx", wait_until=self.profile.load_state))
+
+            wait_time = self.variables.get('wait_time', 0)
+            if wait_time > 0:
+                await page.wait_for_timeout(wait_time)
+
+            if self.needs_login(page):
+                login_error = await self.timed("login", self.login(page))
+                if login_error:
+                    return self.with_timings(login_error)
+            else:
+                print("🔑 Reusing existing Nadlan session, skipping login")
+
+            result = await self.fill_form(page)
+            await self.attach_screenshot(page, result)
+            return self.with_timings(result)
+
+        except Exception as e:
+            print(f"Error during navigation: {e}")
+            return self.with_timings({"error": f"Navigation failed: {str(e)}"})
+
+    def with_timings(self, result):
+        """Attach timings to the final result and record them as metrics"""
+        report = self.timing_report()
+        record_timings(report, result_outcome(result))
+        if isinstance(result, dict):
+            result["timings"] = report
+            if self.resource_policy is not None:
+                result["resources"] = self.resource_policy.stats()
+        return result
+
+    async def attach_screenshot(self, page, result):
+        """Grab the requested screenshot; encoding and writing happen in the background"""
+        if self.screenshot == NONE or not isinstance(result, dict):
+            return
+        try:
+            raw = await self.timed("screenshot", self.artifacts.capture(page, self.screenshot, FEE_SELECTOR))
+        except Exception as e:
+            print(f"⚠️ Could not take {self.screenshot} screenshot: {e}")
+            return
+        result["screenshot"] = self.artifacts.save(self.job_id, self.screenshot, raw)
+
+    async def login(self, page):
+        """Log in from login.aspx; returns an error dict on failure"""
+        username = self.variables.get('username')
+        password = self.variables.get('password')
+        if not (self.is_valid_value(username) and self.is_valid_value(password)):
+            return {"error": "Login required but username or password is missing"}
+
+        timeout = self.profile.selector_timeout_ms
+        try:
+            await page.wait_for_selector('#ctl00_cphBody_Login1_UserName', timeout=timeout)
+            await page.fill('#ctl00_cphBody_Login1_UserName', username)
+            await page.fill('#ctl00_cphBody_Login1_Password', password)
+            print(f"Filled login form for: {username}")
+
+            # The login button posts back and redirects to AddAppraisal.aspx
+            async with page.expect_navigation(wait_until=self.profile.load_state, timeout=self.profile.postback_timeout_ms):
+                await page.click('#ctl00_cphBody_Login1_LoginButton')
+            print("Clicked login button")
+        except Exception as e:
+            print(f"Error during login: {e}")
+            return {"error": f"Login failed: {str(e)}"}
+
+        if self.needs_login(page):
+            return {"error": "Login failed: still on login page after submitting credentials"}
+
+        print("✅ Login completed")
+        self.logged_in = True
+        return None
+
+    async def fill_field(self, page, spec: FieldSpec, value: str):
+        """Set one field and wait on whatever its spec declares"""
+        self.last_field_changed = time.perf_counter()
+        if spec.kind == "select":
+            action = lambda: page.select_option(spec.selector, value)
+        elif spec.postback:
+            action = lambda: self.fill_and_commit(page, spec.selector, value)
+        else:
+            action = lambda: page.fill(spec.selector, value)
+
+        await perform(page, action, spec.wait, timeout_ms=self.profile.postback_timeout_ms)
+        if self.profile.settle_ms:
+            await page.wait_for_timeout(self.profile.settle_ms)
+
+    def can_bulk_fill(self, spec: FieldSpec) -> bool:
+        """Plain text inputs that never post back can be set together"""
+        return spec.kind == "fill" and not spec.postback
+
+    async def bulk_fill(self, page, steps) -> List[str]:
+        """Set several inputs in a single page.evaluate; returns missing selectors"""
+        entries = [[spec.selector, value] for spec, _, value in steps]
+        self.last_field_changed = time.perf_counter()
+        return await page.evaluate(_BULK_FILL, entries)
+
+    async def fill_and_commit(self, page, selector, value):
+        """Fill a text box and fire its change event (what blurring it would do)"""
+        await page.fill(selector, value)
+        await page.dispatch_event(selector, 'change')
+
+    async def fill_form(self, page):
+        """Fill the AddAppraisal.aspx form and extract the appraisal fee"""
+        try:
+            await page.wait_for_selector('#ctl00_cphBody_drpTransactionType', timeout=self.profile.selector_timeout_ms)
+            print("✅ Appraisal form loaded successfully")
+        except Exception as e:
+            print(f"Error loading appraisal form: {e}")
+            return {"error": f"Failed to load appraisal form: {str(e)}"}
+
+        steps = self.steps
+        filled = []
+        if self.profile.bulk_fill:
+            bulk = [step for step in steps if self.can_bulk_fill(step[0])]
+            if bulk:
+                missing = await self.timed("bulk_fill", self.bulk_fill(page, bulk))
+                for spec, label, value in bulk:
+                    if spec.selector not in missing:
+                        print(f"✅ Set {spec.name}: {label} (value: {value})")
+                        filled.append(spec.name)
+            # Postback fields, plus anything the bulk fill could not find,
+            # still go through the careful one-step-at-a-time path
+            steps = [step for step in steps if step[0].name not in filled]
+
+        for spec, label, value in steps:
+            try:
+                await self.timed(spec.name, self.fill_field(page, spec, value), wait=spec.wait.name)
+            except Exception as e:
+                print(f"Error filling {spec.name}: {e}")
+                return {"error": f"Failed to fill {spec.name}: {str(e)}", "filled_fields": filled}
+            print(f"✅ Set {spec.name}: {label} (value: {value})")
+            filled.append(spec.name)
+
+        print("✅ All available fields filled successfully!")
+        return await self.timed("fee", self.extract_fee(page, filled))
+
+    async def extract_fee(self, page, filled):
+        """Wait for the fee label to hold a number and read just that label"""
+        try:
+            handle = await page.wait_for_function(_FEE_READY, arg=FEE_SELECTOR,
+                                                  timeout=self.profile.selector_timeout_ms)
+            text = await handle.json_value()
+        except Exception as e:
+            print(f"⚠️ Appraisal fee did not appear: {e}")
+            text = None
+        return self.fee_result(text, filled)
+
+    def fee_result(self, text: Optional[str], filled):
+        """Result dict for the fee label text (None when it never appeared)"""
+        fee_wait_ms = None
+        if self.last_field_changed is not None:
+            fee_wait_ms = round((time.perf_counter() - self.last_field_changed) * 1000, 1)
+
+        fee = parse_fee(text)
+        if fee is None:
+            print("❌ Appraisal fee not available")
+            return {
+                "status": "success",
+                "message": "Form filled successfully but appraisal fee not available",
+                "filled_fields": filled,
+                "fee_wait_ms": fee_wait_ms,
+            }
+
+        amount, currency = fee
+        print(f"✅ Extracted appraisal fee: {text} ({fee_wait_ms} ms after the last field)")
+        return {
+            "appraisal_fee": f"${text}" if text[0].isdigit() else text,
+            "appraisal_fee_amount": amount,
+            "currency": currency,
+            "fee_wait_ms": fee_wait_ms,
+        }
+
+
+def parse_fee(text: Optional[str]):
+    """'$1,250.00' -> (1250.0, 'USD'); None when the text holds no amount"""
+    match = _FEE_PATTERN.search(text or '')
+    if not match:
+        return None
+    code, symbol, number = match.groups()
+    currency = code or CURRENCY_SYMBOLS.get(symbol, 'USD')
+    return float(number.replace(',', '')), currency
+
+
+async def run_cli(engine_class=NadlanEngine):
+    """Command-line entry point shared by the nadlan_playwright_*.py scripts"""
+    script = os.path.basename(sys.argv[0])
+    if len(sys.argv) != 2:
+        print(f"Usage: python {script} '<json_variables>'")
+        sys.exit(1)
+
+    # Result and per-stage progress go to the parent over the result channel;
+    # run by hand, the result is printed as JSON instead
+    channel = ResultChannel.from_env()
+    try:
+        variables = json.loads(sys.argv[1])
+        nadlan = engine_class(variables)
+        nadlan.on_stage = lambda step: channel.progress(**step)
+        result = await nadlan.run()
+
+        if result:
+            channel.send_result(result)
+        shared_artifacts.shutdown(wait=True)
+
+    except json.JSONDecodeError as e:
+        print(f"Error parsing JSON: {e}")
+        channel.send_result({"error": f"Error parsing JSON: {e}"})
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
+        channel.send_result({"error": str(e)})
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    import asyncio
+    asyncio.run(run_cli())
@@ -0,0 +1,485 @@
+"""
+Browserless Nadlan engine.
+
+Replays the ASP.NET WebForms traffic of login.aspx and AddAppraisal.aspx
+with httpx instead of driving Firefox: form state (__VIEWSTATE,
+__EVENTVALIDATION, every control's value) is parsed from the HTML, fields
+are set in that state, and each AutoPostBack field is posted the way the
+browser would — as an MS Ajax partial postback when the page has an
+UpdatePanel, otherwise as a full __doPostBack. The fee is read from the
+#ctl00_cphBody_lblLenderAppraisalFee label of the last response.
+
+Select with ``"engine": "http"`` on a request or NADLAN_ENGINE=http.
+"""
+
+import asyncio
+import os
+import re
+import time
+import weakref
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+from nadlan_engine import FEE_SELECTOR, NadlanEngine
+
+FEE_ID = FEE_SELECTOR.lstrip('#')
+LOGIN_USERNAME_ID = 'ctl00_cphBody_Login1_UserName'
+LOGIN_PASSWORD_ID = 'ctl00_cphBody_Login1_Password'
+LOGIN_BUTTON_ID = 'ctl00_cphBody_Login1_LoginButton'
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0"
+
+# Sys.WebForms.PageRequestManager._initialize('ctl00$ScriptManager1', 'aspnetForm',
+#     ['tctl00$cphBody$upX','ctl00_cphBody_upX', ...], ...)
+_PRM_INITIALIZE = re.compile(
+    r"PageRequestManager\._initialize\(\s*'([^']+)'\s*,\s*'[^']*'\s*,\s*\[([^\]]*)\]"
+)
+
+_INPUT_SKIP_TYPES = {"submit", "button", "image", "reset", "file"}
+
+_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = weakref.WeakKeyDictionary()
+
+
+def shared_transport() -> httpx.AsyncHTTPTransport:
+    """
+    Connection pool shared by every job on the running event loop.
+
+    Each job gets its own AsyncClient (and so its own cookie jar) on top of
+    this transport, so keep-alive connections to Nadlan are reused across
+    quotes without sessions leaking between users.
+    """
+    loop = asyncio.get_running_loop()
+    transport = _transports.get(loop)
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(
+            max_connections=int(os.environ.get("NADLAN_HTTP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.environ.get("NADLAN_HTTP_MAX_KEEPALIVE", "10")),
+        ))
+        _transports[loop] = transport
+    return transport
+
+
+class _BorrowedTransport(httpx.AsyncBaseTransport):
+    """A job client's handle on the shared transport; closing the client leaves the pool open"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+
+class NadlanHttpError(Exception):
+    """The site answered a postback with an error or an unexpected page"""
+
+
+class FormState:
+    """Successful controls of an ASP.NET form plus the bits of page we read"""
+
+    def __init__(self):
+        self.action: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+        self.buttons: Dict[str, str] = {}           # submit buttons: name -> value
+        self.names_by_id: Dict[str, str] = {}
+        self.options: Dict[str, List[Tuple[str, str]]] = {}  # select name -> (value, label)
+        self.panel_of: Dict[str, str] = {}          # control name -> UpdatePanel client id
+        self.texts: Dict[str, str] = {}             # captured element text by id
+
+    def name_for(self, selector: str) -> Optional[str]:
+        return self.names_by_id.get(selector.lstrip('#'))
+
+    def merge_panel(self, panel_id: str, fragment: "FormState"):
+        """Replace the controls of one UpdatePanel with a re-rendered fragment"""
+        for name in [name for name, panel in self.panel_of.items() if panel == panel_id]:
+            self.fields.pop(name, None)
+            self.options.pop(name, None)
+            del self.panel_of[name]
+        self.fields.update(fragment.fields)
+        self.buttons.update(fragment.buttons)
+        self.names_by_id.update(fragment.names_by_id)
+        self.options.update(fragment.options)
+        self.texts.update(fragment.texts)
+        for name in fragment.fields:
+            self.panel_of[name] = panel_id
+
+
+class _FormParser(HTMLParser):
+    """Collects form controls the way a browser would submit them"""
+
+    def __init__(self, state: FormState, capture_ids, panel_ids, panel: Optional[str] = None):
+        super().__init__(convert_charrefs=True)
+        self.state = state
+        self.capture_ids = set(capture_ids)
+        self.panel_ids = set(panel_ids)
+        self._divs: List[Optional[str]] = [panel]
+        self._select: Optional[str] = None
+        self._select_first: Optional[str] = None
+        self._select_chosen = False
+        self._option: Optional[Dict[str, str]] = None
+        self._option_text: List[str] = []
+        self._textarea: Optional[str] = None
+        self._capture: Optional[Tuple[str, str, int]] = None  # (id, tag, depth)
+        self._text: List[str] = []
+
+    def _panel(self) -> Optional[str]:
+        for panel in reversed(self._divs):
+            if panel:
+                return panel
+        return None
+
+    def _control(self, attrs: Dict[str, str], value: Optional[str]):
+        name = attrs.get("name")
+        if not name:
+            return
+        if attrs.get("id"):
+            self.state.names_by_id[attrs["id"]] = name
+        if value is not None:
+            self.state.fields[name] = value
+        panel = self._panel()
+        if panel:
+            self.state.panel_of[name] = panel
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {key: (value or "") for key, value in attrs}
+        element_id = attrs.get("id")
+
+        if self._capture and tag == self._capture[1]:
+            self._capture = (self._capture[0], tag, self._capture[2] + 1)
+        elif element_id in self.capture_ids and self._capture is None:
+            self._capture = (element_id, tag, 1)
+            self._text = []
+
+        if tag == "div":
+            self._divs.append(element_id if element_id in self.panel_ids else None)
+        elif tag == "form" and self.state.action is None:
+            self.state.action = attrs.get("action")
+        elif tag == "input":
+            input_type = attrs.get("type", "text").lower()
+            if input_type in _INPUT_SKIP_TYPES:
+                if input_type == "submit" and attrs.get("name"):
+                    self.state.buttons[attrs["name"]] = attrs.get("value", "")
+                    if element_id:
+                        self.state.names_by_id[element_id] = attrs["name"]
+                return
+            if input_type in ("checkbox", "radio"):
+                self._control(attrs, attrs.get("value", "on") if "checked" in attrs else None)
+            else:
+                self._control(attrs, attrs.get("value", ""))
+        elif tag == "select":
+            self._select = attrs.get("name")
+            self._select_first = None
+            self._select_chosen = False
+            self._control(attrs, None)
+            if self._select:
+                self.state.options[self._select] = []
+        elif tag == "option" and self._select:
+            self._option = attrs
+            self._option_text = []
+        elif tag == "textarea":
+            self._textarea = attrs.get("name")
+            self._control(attrs, "")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == "div":
+            self._divs.pop()
+
+    def handle_data(self, data):
+        if self._capture:
+            self._text.append(data)
+        if self._option is not None:
+            self._option_text.append(data)
+        if self._textarea:
+            self.state.fields[self._textarea] += data
+
+    def handle_endtag(self, tag):
+        if self._capture and tag == self._capture[1]:
+            element_id, _, depth = self._capture
+            if depth == 1:
+                self.state.texts[element_id] = "".join(self._text).strip()
+                self._capture = None
+            else:
+                self._capture = (element_id, tag, depth - 1)
+
+        if tag == "div" and len(self._divs) > 1:
+            self._divs.pop()
+        elif tag == "option" and self._option is not None:
+            self._end_option()
+        elif tag == "select" and self._select:
+            if self._option is not None:
+                self._end_option()
+            if not self._select_chosen and self._select_first is not None:
+                self.state.fields[self._select] = self._select_first
+            self._select = None
+        elif tag == "textarea":
+            self._textarea = None
+
+    def _end_option(self):
+        attrs = self._option
+        label = re.sub(r"\s+", " ", "".join(self._option_text)).strip()
+        value = attrs["value"] if "value" in attrs else label
+        self.state.options[self._select].append((value, label))
+        if self._select_first is None:
+            self._select_first = value
+        if "selected" in attrs:
+            self.state.fields[self._select] = value
+            self._select_chosen = True
+        self._option = None
+
+
+def parse_form(html: str, capture_ids=(FEE_ID,), panel_ids=(), panel: Optional[str] = None) -> FormState:
+    """Parse a page (or an UpdatePanel fragment) into a FormState"""
+    state = FormState()
+    parser = _FormParser(state, capture_ids, panel_ids, panel)
+    parser.feed(html)
+    parser.close()
+    return state
+
+
+def parse_page_request_manager(html: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """ScriptManager unique id and UpdatePanels (client id -> unique id) of a page"""
+    match = _PRM_INITIALIZE.search(html)
+    if not match:
+        return None, {}
+    # ASP.NET 4 lists ('t' + unique id, client id) pairs; 3.5 only the
+    # prefixed unique ids
+    items = re.findall(r"'([^']*)'", match.group(2))
+    panels = {}
+    index = 0
+    while index < len(items):
+        unique_id = items[index][1:]
+        client_id = unique_id.replace('$', '_')
+        following = items[index + 1] if index + 1 < len(items) else None
+        if following is not None and '$' not in following:
+            client_id = following
+            index += 1
+        panels[client_id] = unique_id
+        index += 1
+    return match.group(1), panels
+
+
+def parse_delta(text: str) -> List[Tuple[str, str, str]]:
+    """
+    Split an MS Ajax partial-postback response into (type, id, content).
+
+    The format is a sequence of ``length|type|id|content|`` records where
+    length counts the characters of content (which may itself contain '|').
+    """
+    entries = []
+    pos = 0
+    while pos < len(text):
+        bar = text.index('|', pos)
+        length = int(text[pos:bar])
+        type_end = text.index('|', bar + 1)
+        id_end = text.index('|', type_end + 1)
+        content = text[id_end + 1:id_end + 1 + length]
+        pos = id_end + 1 + length
+        if text[pos:pos + 1] != '|':
+            raise NadlanHttpError("Malformed partial postback response")
+        pos += 1
+        entries.append((text[bar + 1:type_end], text[type_end + 1:id_end], content))
+    return entries
+
+
+class NadlanHttpEngine(NadlanEngine):
+    """NadlanEngine that talks WebForms over HTTP instead of through a browser"""
+
+    engine_name = "http"
+
+    def __init__(self, variables, profile: Optional[str] = None, client: Optional[httpx.AsyncClient] = None,
+                 storage_state: Optional[Dict[str, Any]] = None, catalog=None):
+        super().__init__(variables, profile, catalog)
+        self.resource_policy = None  # nothing but the documents is ever fetched
+        self.client = client
+        self.owns_client = client is None  # a client we create is closed when run() ends
+        self.storage_state = storage_state
+        self.form: Optional[FormState] = None
+        self.url: Optional[str] = None
+        self.script_manager: Optional[str] = None
+        self.update_panels: Dict[str, str] = {}
+
+    def new_client(self) -> httpx.AsyncClient:
+        timeout = self.profile.postback_timeout_ms / 1000
+        client = httpx.AsyncClient(
+            transport=_BorrowedTransport(shared_transport()),
+            follow_redirects=True,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 10)),
+            headers={"User-Agent": USER_AGENT},
+        )
+        for cookie in (self.storage_state or {}).get("cookies", []):
+            client.cookies.set(cookie["name"], cookie["value"],
+                               domain=cookie.get("domain", "").lstrip('.'), path=cookie.get("path", "/"))
+        return client
+
+    def export_storage_state(self) -> Dict[str, Any]:
+        """Cookies in Playwright storage_state form, so SessionCache can share them with the browser engine"""
+        cookies = []
+        for cookie in self.client.cookies.jar:
+            cookies.append({
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path or "/",
+                "expires": cookie.expires if cookie.expires is not None else -1,
+                "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+                "secure": bool(cookie.secure),
+                "sameSite": "Lax",
+            })
+        return {"cookies": cookies, "origins": []}
+
+    def load_page(self, response: httpx.Response):
+        """Make a full page response the current form"""
+        self.url = str(response.url)
+        self.script_manager, self.update_panels = parse_page_request_manager(response.text)
+        self.form = parse_form(response.text, panel_ids=self.update_panels)
+
+    def needs_login(self, page=None):
+        return 'login.aspx' in (self.url or '').lower()
+
+    async def run(self, context=None):
+        """Run the appraisal flow over HTTP; ``context`` is ignored"""
+        try:
+            login_error = await self.open_form()
+            if login_error:
+                return self.with_timings(login_error)
+            return self.with_timings(await self.fill_form())
+
+        except (httpx.HTTPError, NadlanHttpError) as e:
+            print(f"Error during HTTP flow: {e}")
+            return self.with_timings({"error": f"Navigation failed: {str(e)}"})
+        finally:
+            # The shared transport stays open; cookies stay readable for export_storage_state
+            if self.owns_client and self.client is not None:
+                await self.client.aclose()
+
+    async def open_form(self):
+        """Load AddAppraisal.aspx, logging in if needed; returns an error dict on failure"""
+        if self.client is None:
+            self.client = self.new_client()
+        print("🚀 Requesting AddAppraisal.aspx over HTTP...")
+        response = await self.timed("goto", self.client.get(f"{self.base_url}/AddAppraisal.aspx"))
+        response.raise_for_status()
+        self.load_page(response)
+
+        if self.needs_login():
+            return await self.timed("login", self.login())
+        print("🔑 Reusing existing Nadlan session, skipping login")
+        return None
+
+    async def login(self, page=None):
+        """Post the login form; returns an error dict on failure"""
+        username = self.variables.get('username')
+        password = self.variables.get('password')
+        if not (self.is_valid_value(username) and self.is_valid_value(password)):
+            return {"error": "Login required but username or password is missing"}
+
+        user_field = self.form.name_for(LOGIN_USERNAME_ID)
+        password_field = self.form.name_for(LOGIN_PASSWORD_ID)
+        button = self.form.name_for(LOGIN_BUTTON_ID)
+        if not (user_field and password_field and button):
+            return {"error": "Login failed: login form not found"}
+
+        data = dict(self.form.fields)
+        data[user_field] = username
+        data[password_field] = password
+        data[button] = self.form.buttons.get(button, "")
+        response = await self.client.post(urljoin(self.url, self.form.action or ""), data=data)
+        response.raise_for_status()
+        self.load_page(response)
+        print(f"Posted login form for: {username}")
+
+        if self.needs_login():
+            return {"error": "Login failed: still on login page after submitting credentials"}
+
+        print("✅ Login completed")
+        self.logged_in = True
+        return None
+
+    async def postback(self, name: str):
+        """Post the form back with ``name`` as __EVENTTARGET, as AutoPostBack would"""
+        data = dict(self.form.fields)
+        data["__EVENTTARGET"] = name
+        data["__EVENTARGUMENT"] = ""
+        url = urljoin(self.url, self.form.action or "")
+
+        panel_id = self.form.panel_of.get(name)
+        if self.script_manager and panel_id in self.update_panels:
+            data[self.script_manager] = f"{self.update_panels[panel_id]}|{name}"
+            data["__ASYNCPOST"] = "true"
+            response = await self.client.post(url, data=data, headers={
+                "X-MicrosoftAjax": "Delta=true",
+                "X-Requested-With": "XMLHttpRequest",
+            })
+            response.raise_for_status()
+            if re.match(r"\d+\|", response.text):
+                self.apply_delta(response.text)
+                return
+
+        else:
+            response = await self.client.post(url, data=data)
+            response.raise_for_status()
+        self.load_page(response)
+        if self.needs_login():
+            raise NadlanHttpError("Session expired during postback")
+
+    def apply_delta(self, text: str):
+        """Apply a partial-postback response to the current form"""
+        for kind, ident, content in parse_delta(text):
+            if kind == "updatePanel":
+                fragment = parse_form(content, panel_ids=self.update_panels, panel=ident)
+                self.form.merge_panel(ident, fragment)
+            elif kind == "hiddenField":
+                self.form.fields[ident] = content
+            elif kind == "pageRedirect":
+                raise NadlanHttpError(f"Postback redirected to {content}")
+            elif kind == "error":
+                raise NadlanHttpError(f"Postback failed ({ident}): {content}")
+
+    async def fill_form(self, page=None):
+        """Set every field in the form state, posting back where the site would"""
+        if not self.form or not self.form.name_for('#ctl00_cphBody_drpTransactionType'):
+            return {"error": "Failed to load appraisal form: drpTransactionType not found"}
+        print("✅ Appraisal form loaded successfully")
+
+        filled = []
+        for spec, label, value in self.steps:
+            name = self.form.name_for(spec.selector)
+            if name is None:
+                return {"error": f"Failed to fill {spec.name}: {spec.selector} not on form", "filled_fields": filled}
+
+            self.form.fields[name] = value
+            self.last_field_changed = time.perf_counter()
+            if spec.postback:
+                try:
+                    await self.timed(spec.name, self.postback(name), wait="postback")
+                except (httpx.HTTPError, NadlanHttpError) as e:
+                    print(f"Error posting back {spec.name}: {e}")
+                    return {"error": f"Failed to fill {spec.name}: {str(e)}", "filled_fields": filled}
+            print(f"✅ Set {spec.name}: {label} (value: {value})")
+            filled.append(spec.name)
+
+        print("✅ All available fields filled successfully!")
+        return await self.timed("fee", self.extract_fee(None, filled))
+
+    async def extract_fee(self, page, filled):
+        """Read the fee label from the last rendered form"""
+        return self.fee_result(self.form.texts.get(FEE_ID) or None, filled)
+
+
+ENGINES = {
+    "browser": NadlanEngine,
+    "http": NadlanHttpEngine,
+}
+
+DEFAULT_ENGINE = os.environ.get("NADLAN_ENGINE", "browser")
+
+
+if __name__ == "__main__":
+    from nadlan_engine import run_cli
+    asyncio.run(run_cli(NadlanHttpEngine))
@@ -0,0 +1,178 @@
+"""
+Condition-based waits for the Nadlan ASP.NET WebForms pages.
+
+Instead of sleeping a fixed number of milliseconds after each field, a form
+step declares what it is waiting for and the step returns as soon as that
+condition holds (and keeps waiting, up to a timeout, when the site is slow).
+
+Usage::
+
+    await perform(page, lambda: page.select_option(selector, value), PostbackIdle())
+"""
+
+from typing import Any, Awaitable, Callable, Optional
+
+# Hooks the MS Ajax PageRequestManager (UpdatePanel partial postbacks) so we
+# can count postbacks that started and finished since a step was armed.
+# Returns the counters plus the page clock so the grace period is measured
+# in page time.
+_INSTALL_POSTBACK_HOOKS = """
+() => {
+    if (!window.__nadlanWait) {
+        const state = {started: 0, ended: 0};
+        window.__nadlanWait = state;
+        if (window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager) {
+            const prm = Sys.WebForms.PageRequestManager.getInstance();
+            prm.add_beginRequest(() => { state.started += 1; });
+            prm.add_endRequest(() => { state.ended += 1; });
+        }
+    }
+    return {
+        started: window.__nadlanWait.started,
+        ended: window.__nadlanWait.ended,
+        now: Date.now()
+    };
+}
+"""
+
+_POSTBACK_SETTLED = """
+(armed) => {
+    if (document.readyState === 'loading') return false;
+    const state = window.__nadlanWait;
+    // A full (non-Ajax) postback replaced the document: it has loaded
+    if (!state) return true;
+    const prm = (window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager)
+        ? Sys.WebForms.PageRequestManager.getInstance() : null;
+    if (prm && prm.get_isInAsyncPostBack()) return false;
+    if (state.ended > armed.ended) return true;
+    if (state.started > armed.started) return false;
+    // Nothing fired: AutoPostBack uses setTimeout(__doPostBack, 0), so give
+    // it a short grace period before concluding the field has no postback
+    return Date.now() - armed.now >= armed.graceMs;
+}
+"""
+
+_OPTIONS_READY = """
+(selector) => {
+    const el = document.querySelector(selector);
+    return !!el && Array.from(el.options).some(o => o.value !== '');
+}
+"""
+
+
+class WaitCondition:
+    """
+    Something a form step waits for after its action.
+
+    ``arm`` runs before the action (to snapshot state or start listening)
+    and returns a token; ``wait`` runs after the action with that token and
+    returns once the condition holds. Conditions keep no per-job state, so
+    one instance can be shared by every concurrent job.
+    """
+
+    name = "none"
+
+    async def arm(self, page) -> Any:
+        return None
+
+    async def wait(self, page, armed: Any, timeout_ms: float):
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class NoWait(WaitCondition):
+    """The step changes nothing server-side; carry straight on"""
+
+
+class PostbackIdle(WaitCondition):
+    """
+    Wait until the ASP.NET postback the step triggered has completed.
+
+    Covers UpdatePanel partial postbacks (PageRequestManager no longer in
+    async postback and endRequest fired) as well as full __doPostBack
+    reloads. If no postback starts within ``grace_ms`` the step is assumed
+    not to post back.
+    """
+
+    name = "postback"
+
+    def __init__(self, grace_ms: int = 400):
+        self.grace_ms = grace_ms
+
+    async def arm(self, page) -> Any:
+        armed = await page.evaluate(_INSTALL_POSTBACK_HOOKS)
+        armed["graceMs"] = self.grace_ms
+        navigations = []
+
+        def on_navigated(frame):
+            if frame == page.main_frame:
+                navigations.append(frame.url)
+
+        page.on("framenavigated", on_navigated)
+        return armed, navigations, on_navigated
+
+    async def wait(self, page, armed: Any, timeout_ms: float):
+        armed, navigations, on_navigated = armed
+        try:
+            await page.wait_for_function(_POSTBACK_SETTLED, arg=armed, timeout=timeout_ms)
+        except Exception:
+            # A full postback navigates the main frame and takes the
+            # evaluation with it; wait for the new document instead
+            if not navigations:
+                raise
+            await page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+        finally:
+            page.remove_listener("framenavigated", on_navigated)
+
+
+class OptionsRepopulated(WaitCondition):
+    """
+    Wait until a dependent dropdown offers real options (not just the
+    "-- Select --" placeholder).
+
+    Pair it with PostbackIdle, which waits for the postback that rebuilds
+    the list; the rebuilt list may be identical to the old one (another zip
+    in the same county), so it is not compared with what was there before.
+    """
+
+    name = "options"
+
+    def __init__(self, selector: str):
+        self.selector = selector
+
+    async def wait(self, page, armed: Any, timeout_ms: float):
+        await page.wait_for_function(_OPTIONS_READY, arg=self.selector, timeout=timeout_ms)
+
+    def __repr__(self):
+        return f"OptionsRepopulated({self.selector!r})"
+
+
+class AllOf(WaitCondition):
+    """Wait for several conditions, e.g. a postback and a repopulated dropdown"""
+
+    name = "all"
+
+    def __init__(self, *conditions: WaitCondition):
+        self.conditions = conditions
+
+    async def arm(self, page) -> Any:
+        return [await condition.arm(page) for condition in self.conditions]
+
+    async def wait(self, page, armed: Any, timeout_ms: float):
+        for condition, token in zip(self.conditions, armed):
+            await condition.wait(page, token, timeout_ms)
+
+    def __repr__(self):
+        return f"AllOf{self.conditions!r}"
+
+
+async def perform(page, action: Callable[[], Awaitable], condition: Optional[WaitCondition] = None,
+                  timeout_ms: float = 15000):
+    """Arm ``condition``, run ``action`` and wait for the condition to hold"""
+    condition = condition or NoWait()
+    armed = await condition.arm(page)
+    result = await action()
+    await condition.wait(page, armed, timeout_ms)
+    return result
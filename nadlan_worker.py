@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Warm Nadlan worker process, started by worker_manager.WorkerManager.
+
+Imports Playwright and launches Firefox once, then serves quote jobs one
+at a time until its stdin closes. Jobs arrive on stdin and results go back
+on the result channel (NADLAN_RESULT_FD), both as result_channel frames:
+
+    -> {"type": "job", "id": 1, "variables": {...}, "storage_state": {...}}
+    <- {"type": "ready", "pid": 1234}
+    <- {"type": "result", "id": 1, "result": {...}, "logged_in": true, "storage_state": {...}}
+
+stdout is only logs.
+"""
+
+import asyncio
+import os
+import sys
+
+from artifacts import shared_artifacts
+from browser_pool import BrowserPool
+from nadlan_engine import NadlanEngine
+from result_channel import ResultChannel, open_frame_reader, read_frame
+
+
+async def run_job(pool: BrowserPool, message):
+    """Run one quote on the warm browser and build the reply"""
+    reply = {"type": "result", "id": message.get("id"), "logged_in": False, "storage_state": None}
+    try:
+        nadlan = NadlanEngine(message["variables"])
+        async with pool.context(storage_state=message.get("storage_state")) as context:
+            reply["result"] = await nadlan.run(context=context)
+            if nadlan.logged_in:
+                reply["logged_in"] = True
+                reply["storage_state"] = await context.storage_state()
+    except Exception as e:
+        reply["result"] = {"error": str(e)}
+    return reply
+
+
+async def serve():
+    channel = ResultChannel.from_env()
+    if channel.fd is None:
+        print("Usage: started by worker_manager.py with NADLAN_RESULT_FD set")
+        sys.exit(1)
+
+    # One browser per worker; the manager recycles the whole process instead
+    pool = BrowserPool(size=1, max_jobs_per_browser=sys.maxsize,
+                       headless=os.environ.get("NADLAN_HEADLESS", "true").lower() != "false")
+    await pool.start()
+    reader, transport = await open_frame_reader(sys.stdin.fileno())
+    channel.send({"type": "ready", "pid": os.getpid()})
+    try:
+        while True:
+            message = await read_frame(reader)
+            if message is None:
+                break  # manager closed our stdin: retire
+            if message.get("type") == "job":
+                channel.send(await run_job(pool, message))
+    finally:
+        transport.close()
+        await pool.stop()
+        shared_artifacts.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -0,0 +1,273 @@
+"""
+Dropdown option catalog for AddAppraisal.aspx.
+
+Maps request labels ("Purchase", "New Jersey", "Single Family Residential")
+to the option values the Nadlan form posts. The catalog is scraped from the
+live form, persisted as versioned JSON (NADLAN_CATALOG_PATH) and refreshed
+in the background; until a scrape has happened the option lists that used
+to be hardcoded in the scripts are used.
+
+Lookups are O(1) and forgiving about case, spacing and punctuation ("multi
+family" finds "Multi-Family", "nj" finds "NJ"), but a label that matches no
+option raises UnknownOption instead of silently quoting a default.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Dropdowns the catalog scrapes (control ids without the ctl00_cphBody_ prefix)
+CATALOG_CONTROLS = (
+    'drpTransactionType',
+    'drpLoanType',
+    'drpPropertyType',
+    'drpPropertyState',
+    'drpOccupiedBy',
+    'drpAppointmentContact',
+    'drpProject',
+)
+
+# Option lists as of the hand-written scripts; used until the first scrape
+TRANSACTION_TYPES = {
+    'Acquisition': '27', 'Construction': '23', 'FHA': '21', 'HELOC': '34',
+    'Home Equity Line of Credit': '18', 'Investment Property': '9',
+    'List Price Determination': '17', 'Market Value': '15',
+    'Market Value for Lender Purposes': '19', 'Other': '14',
+    'Purchase': '1', 'Refinance': '2', 'Reverse Mortgage': '16',
+    'Second Mortgage': '24'
+}
+
+LOAN_TYPES = {
+    'Conventional': '1', 'ConvInsured': '15', 'FHA': '3', 'FHA 203K': '12',
+    'HARP 2': '7', 'Home Equity': '8', 'Home Ownership Accelerator': '9',
+    'Homestyle Renovation': '13', 'Jumbo': '10', 'List Price Determination': '6',
+    'Non QM': '16', 'Non-Conforming': '18', 'Other (please specify)': '5',
+    'Prime Jumbo': '17', 'Public And Indian Housing': '14',
+    'Reverse Mortgage': '11', 'USDA / Rural Housing Service': '4', 'VA': '2'
+}
+
+PROPERTY_TYPES = {
+    'Condo': '1', 'Co-op': '2', 'Duplex': '3', 'Fourplex': '4',
+    'High Rise': '5', 'Land': '6', 'Manufactured Home': '7',
+    'Mixed Use': '8', 'Mobile Home': '9', 'Multi-Family': '10',
+    'Office': '11', 'Retail': '12', 'Single Family Residential': '13',
+    'Townhouse': '14', 'Triplex': '15'
+}
+
+STATES = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
+    'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
+    'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID',
+    'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS',
+    'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS',
+    'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
+    'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY',
+    'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK',
+    'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
+    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT',
+    'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV',
+    'Wisconsin': 'WI', 'Wyoming': 'WY'
+}
+
+OCCUPANCY_TYPES = {
+    'Owner Occupied': 'Owner',
+    'Non-Owner Occupied': 'Non-Owner',
+    'Vacant': 'Vacant'
+}
+
+CONTACT_TYPES = {
+    'Borrower': 'borrower',
+    'Agent': 'agent',
+    'Other': 'other'
+}
+
+BUILTIN_OPTIONS: Dict[str, Dict[str, str]] = {
+    'drpTransactionType': TRANSACTION_TYPES,
+    'drpLoanType': LOAN_TYPES,
+    'drpPropertyType': PROPERTY_TYPES,
+    'drpPropertyState': STATES,
+    'drpOccupiedBy': OCCUPANCY_TYPES,
+    'drpAppointmentContact': CONTACT_TYPES,
+}
+
+# Placeholder entries such as "-- Select --" are not real choices
+_PLACEHOLDER = re.compile(r"^\W*(select|choose|please select)\b", re.IGNORECASE)
+
+
+def normalize_label(label: Any) -> str:
+    """'Multi-Family ' -> 'multifamily'"""
+    return re.sub(r"[^0-9a-z]+", "", str(label).casefold())
+
+
+class UnknownOption(ValueError):
+    """A request label that matches none of a dropdown's options"""
+
+    def __init__(self, field: str, label: Any, choices: List[str]):
+        self.field = field
+        self.label = label
+        self.choices = choices
+        super().__init__(f"Unknown {field} '{label}', expected one of {choices}")
+
+
+def _builtin_dropdowns() -> Dict[str, List[Dict[str, str]]]:
+    return {
+        control: [{"value": value, "label": label} for label, value in options.items()]
+        for control, options in BUILTIN_OPTIONS.items()
+    }
+
+
+def _build_index(dropdowns: Dict[str, List[Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+    """control -> normalized label or value -> value. Labels win over values."""
+    index = {}
+    for control, options in dropdowns.items():
+        lookup = {}
+        for option in options:
+            lookup.setdefault(normalize_label(option["value"]), option["value"])
+        for option in options:
+            lookup[normalize_label(option["label"])] = option["value"]
+        index[control] = lookup
+    return index
+
+
+class OptionCatalog:
+    """Versioned label -> value lookup for the AddAppraisal.aspx dropdowns"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.version = 0
+        self.source = "builtin"
+        self.updated_at: Optional[str] = None
+        self.dropdowns: Dict[str, List[Dict[str, str]]] = _builtin_dropdowns()
+        self._index = _build_index(self.dropdowns)
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.last_refresh_error: Optional[str] = None
+        if path:
+            self.load()
+
+    @classmethod
+    def from_env(cls) -> "OptionCatalog":
+        return cls(os.environ.get("NADLAN_CATALOG_PATH", "option_catalog.json"))
+
+    def load(self) -> bool:
+        """Load the persisted catalog; keeps the current one if the file is missing or unreadable"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._apply(data["dropdowns"], data.get("version", 0), data.get("source", "file"), data.get("updated_at"))
+            return True
+        except FileNotFoundError:
+            return False
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Ignoring unreadable option catalog {self.path}: {e}")
+            return False
+
+    def save(self):
+        if not self.path:
+            return
+        data = {
+            "version": self.version,
+            "source": self.source,
+            "updated_at": self.updated_at,
+            "dropdowns": self.dropdowns,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _apply(self, dropdowns, version: int, source: str, updated_at: Optional[str]):
+        index = _build_index(dropdowns)
+        with self._lock:
+            self.dropdowns = dropdowns
+            self._index = index
+            self.version = version
+            self.source = source
+            self.updated_at = updated_at
+
+    def update(self, scraped: Dict[str, List[Dict[str, str]]], source: str) -> bool:
+        """Install freshly scraped options; bumps the version only when something changed"""
+        dropdowns = {**self.dropdowns}
+        for control, options in scraped.items():
+            options = [o for o in options if o["value"] and not _PLACEHOLDER.match(o["label"])]
+            if options:
+                dropdowns[control] = options
+        changed = dropdowns != self.dropdowns
+        version = self.version + 1 if changed else self.version
+        self._apply(dropdowns, version, source, datetime.now(timezone.utc).isoformat())
+        self.save()
+        return changed
+
+    def has(self, control: str) -> bool:
+        return control in self._index
+
+    def lookup(self, control: str, label: Any, field: Optional[str] = None) -> str:
+        """Option value for ``label``; raises UnknownOption when nothing matches"""
+        value = self._index.get(control, {}).get(normalize_label(label))
+        if value is None:
+            choices = [option["label"] for option in self.dropdowns.get(control, [])]
+            raise UnknownOption(field or control, label, choices)
+        return value
+
+    async def refresh(self, username: str, password: str, base_url: Optional[str] = None) -> bool:
+        """Scrape the option lists from the live form; returns True if they changed"""
+        from nadlan_http import NadlanHttpEngine
+
+        engine = NadlanHttpEngine({"username": username, "password": password, "base_url": base_url})
+        error = await engine.open_form()
+        if error:
+            raise RuntimeError(error["error"])
+
+        scraped = {}
+        for control in CATALOG_CONTROLS:
+            name = engine.form.name_for(f"ctl00_cphBody_{control}")
+            if name and engine.form.options.get(name):
+                scraped[control] = [{"value": value, "label": label} for value, label in engine.form.options[name]]
+        if not scraped:
+            raise RuntimeError("No catalog dropdowns found on AddAppraisal.aspx")
+
+        self.refreshes += 1
+        changed = self.update(scraped, source=engine.base_url)
+        print(f"📚 Option catalog refreshed: version {self.version}, {len(scraped)} dropdowns"
+              f"{' (changed)' if changed else ''}")
+        return changed
+
+    async def refresh_forever(self, username: str, password: str, interval: float, base_url: Optional[str] = None):
+        """Background task: refresh now and then every ``interval`` seconds"""
+        while True:
+            try:
+                await self.refresh(username, password, base_url)
+                self.last_refresh_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_refresh_error = str(e)
+                print(f"⚠️ Option catalog refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "updated_at": self.updated_at,
+            "dropdowns": {control: len(options) for control, options in self.dropdowns.items()},
+            "refreshes": self.refreshes,
+            "last_refresh_error": self.last_refresh_error,
+        }
+
+
+shared_catalog = OptionCatalog.from_env()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python option_catalog.py <username> <password>")
+        sys.exit(1)
+    asyncio.run(shared_catalog.refresh(sys.argv[1], sys.argv[2]))
+    print(json.dumps(shared_catalog.stats(), indent=2))
@@ -0,0 +1,80 @@
+"""
+In-process runners behind main.py's /run-playwright and /run-nadlan-script.
+
+Both endpoints used to render a whole Python program per request, write it
+to a fixed file, run it in a new interpreter and delete it. These are the
+same flows as ordinary async functions that take the request variables as
+data and run on a context from the shared BrowserPool, so there is nothing
+to generate or clean up and concurrent requests don't clobber each other.
+"""
+
+import uuid
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+from artifacts import FULL_PAGE, shared_artifacts
+from nadlan_engine import NadlanEngine
+
+DEFAULT_NADLAN_URL = "https://nadlanvaluation.spurams.com/login.aspx"
+
+# One round trip instead of three get_attribute calls per input
+_FORM_FIELDS_JS = """els => els.map(e => ({
+    type: e.getAttribute('type'), name: e.getAttribute('name'), id: e.getAttribute('id')
+}))"""
+
+
+async def describe_page(page) -> Dict[str, Any]:
+    """Title and form inputs of the page as it was left"""
+    has_form = await page.query_selector('form') is not None
+    return {
+        "title": await page.title(),
+        "has_login_form": has_form,
+        "form_fields": await page.eval_on_selector_all('input', _FORM_FIELDS_JS) if has_form else [],
+    }
+
+
+async def run_page(context, url: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Open ``url`` and report its title, with an optional full-page screenshot"""
+    page = await context.new_page()
+    try:
+        await page.goto(url)
+        await page.wait_for_load_state("networkidle")
+        result = {
+            "title": await page.title(),
+            "url": url,
+            "screenshot_taken": False,
+            "variables_processed": variables,
+        }
+        if variables.get("take_screenshot", True):
+            raw = await shared_artifacts.capture(page, FULL_PAGE, "body")
+            result["screenshot"] = shared_artifacts.save(uuid.uuid4().hex, FULL_PAGE, raw)
+            result["screenshot_taken"] = True
+        return result
+    except Exception as e:
+        print(f"Error: {e}")
+        return {"error": str(e)}
+    finally:
+        await page.close()
+
+
+def nadlan_variables(url: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """NadlanEngine variables for a /run-nadlan-script request; the site comes from its login URL"""
+    parts = urlsplit(url or DEFAULT_NADLAN_URL)
+    merged = {"base_url": f"{parts.scheme}://{parts.netloc}", **variables}
+    if "city" in merged and "property_city" not in merged:
+        merged["property_city"] = merged["city"]  # name used by the old generated script
+    return merged
+
+
+class NadlanPageRunner(NadlanEngine):
+    """NadlanEngine that also reports the page it ended on, like the old generated script"""
+
+    async def run_on_page(self, page):
+        result = await super().run_on_page(page)
+        if isinstance(result, dict):
+            try:
+                result.update(await describe_page(page))
+            except Exception as e:
+                print(f"⚠️ Could not describe the final page: {e}")
+            result["variables_processed"] = {k: v for k, v in self.variables.items() if k != "password"}
+        return result
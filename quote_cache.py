@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from ttl_cache import TTLCache
+
+# Request fields that determine the quoted fee. Everything else on an
+# AppraisalRequest (loan_number, borrower, agent_name, screenshot_path, ...)
+# only ends up on the order and must not split the cache.
+FEE_KEY_FIELDS = (
+    "transaction_type",
+    "loan_type",
+    "property_type",
+    "property_state",
+    "property_zip",
+    "occupancy_type",
+    "product",
+)
+
+
+# Result fields that describe one particular run (timings, network stats,
+# screenshots, logs) rather than the quote, and so are not served from the cache
+PER_RUN_FIELDS = ("timings", "resources", "fee_wait_ms", "screenshot", "logs", "logs_dropped", "events")
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value)).strip().casefold()
+
+
+def make_quote_key(variables: Dict[str, Any]) -> Tuple[str, ...]:
+    """Normalized cache key for a fee quote"""
+    # Include a password digest, as SessionCache does, so a quote is only
+    # ever served to a caller holding the credentials that produced it
+    digest = hashlib.sha256(str(variables.get("password") or "").encode("utf-8")).hexdigest()[:16]
+    key = [_normalize(variables.get("username", "")), digest]
+    for field in FEE_KEY_FIELDS:
+        value = _normalize(variables.get(field, ""))
+        if field == "property_zip":
+            # 07751 and 07751-1234 quote the same
+            value = value[:5]
+        key.append(value)
+    return tuple(key)
+
+
+class QuoteCache:
+    """Successful fee quotes keyed by the fields that affect the fee"""
+
+    def __init__(self, ttl_seconds: float = 900, max_entries: int = 5000):
+        self._cache = TTLCache(ttl_seconds, max_entries)
+
+    @classmethod
+    def from_env(cls) -> "QuoteCache":
+        return cls(
+            ttl_seconds=float(os.environ.get("NADLAN_QUOTE_CACHE_TTL", "900")),
+            max_entries=int(os.environ.get("NADLAN_QUOTE_CACHE_MAX_ENTRIES", "5000")),
+        )
+
+    @staticmethod
+    def is_cacheable(result: Optional[Dict[str, Any]]) -> bool:
+        """Only results that actually carry a fee are worth caching"""
+        return bool(result) and "error" not in result and bool(result.get("appraisal_fee"))
+
+    def get(self, variables: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        result = self._cache.get(make_quote_key(variables))
+        if result is None:
+            return None
+        return {**result, "cached": True}
+
+    def store(self, variables: Dict[str, Any], result: Dict[str, Any]):
+        if self.is_cacheable(result):
+            entry = {k: v for k, v in result.items() if k not in PER_RUN_FIELDS}
+            self._cache.set(make_quote_key(variables), entry)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
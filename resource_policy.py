@@ -0,0 +1,170 @@
+"""
+Opt-in network policy for Nadlan pages, built on Playwright request routing.
+
+The flows only need the DOM of login.aspx and AddAppraisal.aspx plus the
+scripts that drive ASP.NET postbacks, so images, fonts, stylesheets, media
+and third-party assets can be blocked (or, for static scripts, answered from
+a shared in-memory cache) instead of being downloaded on every navigation
+and postback.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+OFF = "off"
+BLOCK = "block"
+CACHE = "cache"
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media", "texttrack", "manifest"}
+
+# Script URLs that ASP.NET WebForms needs for __doPostBack, validators and
+# the UpdatePanel PageRequestManager. These are never blocked.
+REQUIRED_SCRIPT_PATTERNS = (
+    "ScriptResource.axd",
+    "WebResource.axd",
+    "MicrosoftAjax",
+    "WebForms",
+)
+
+CACHEABLE_RESOURCE_TYPES = {"script"}
+
+# Typical transfer size per resource type. A blocked request is never
+# downloaded, so what it would have cost can only be estimated.
+ESTIMATED_BYTES = {
+    "image": 25_000,
+    "font": 40_000,
+    "stylesheet": 15_000,
+    "media": 250_000,
+    "texttrack": 2_000,
+    "manifest": 1_000,
+    "script": 30_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+class AssetCache:
+    """Process-wide cache of static asset bodies, shared by every job"""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[int, Dict[str, str], bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        with self._lock:
+            if len(body) > self.max_bytes or url in self._entries:
+                return
+            self._entries[url] = (status, headers, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+shared_asset_cache = AssetCache(int(os.environ.get("NADLAN_ASSET_CACHE_BYTES", str(16 * 1024 * 1024))))
+
+
+class ResourcePolicy:
+    """
+    Per-job request filter.
+
+    ``block``: abort images, fonts, stylesheets, media and third-party
+    requests; let documents, XHR postbacks and first-party scripts through.
+    ``cache``: as ``block``, but static scripts are served from the shared
+    AssetCache after their first download.
+    """
+
+    def __init__(self, mode: str = BLOCK, first_party_host: Optional[str] = None,
+                 asset_cache: Optional[AssetCache] = None):
+        if mode not in (OFF, BLOCK, CACHE):
+            raise ValueError(f"Unknown resource policy '{mode}', expected off, block or cache")
+        self.mode = mode
+        self.first_party_host = first_party_host
+        self.asset_cache = asset_cache or shared_asset_cache
+        self.requests_seen = 0
+        self.requests_blocked = 0
+        self.cache_hits = 0
+        self.bytes_saved = 0
+        self.blocked_bytes_estimate = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.bytes_downloaded = 0
+
+    @classmethod
+    def from_variables(cls, variables: Dict[str, Any], base_url: str) -> Optional["ResourcePolicy"]:
+        """Policy requested by a job (``resource_policy``) or NADLAN_RESOURCE_POLICY"""
+        mode = variables.get("resource_policy") or os.environ.get("NADLAN_RESOURCE_POLICY", OFF)
+        if mode == OFF:
+            return None
+        return cls(mode, first_party_host=urlparse(base_url).hostname)
+
+    async def install(self, target):
+        """Attach to a Page or BrowserContext"""
+        await target.route("**/*", self._handle)
+
+    def _is_third_party(self, url: str) -> bool:
+        if not self.first_party_host:
+            return False
+        host = urlparse(url).hostname or ""
+        return not (host == self.first_party_host or host.endswith("." + self.first_party_host))
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if resource_type == "script" and any(pattern in url for pattern in REQUIRED_SCRIPT_PATTERNS):
+            return False
+        if resource_type in BLOCKED_RESOURCE_TYPES:
+            return True
+        # Third-party documents would be navigations we asked for; keep them
+        return resource_type != "document" and self._is_third_party(url)
+
+    async def _handle(self, route, request):
+        self.requests_seen += 1
+        url = request.url
+        resource_type = request.resource_type
+
+        if self.should_block(url, resource_type):
+            self.requests_blocked += 1
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+            self.blocked_bytes_estimate += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+            await route.abort()
+            return
+
+        if self.mode == CACHE and request.method == "GET" and resource_type in CACHEABLE_RESOURCE_TYPES:
+            cached = self.asset_cache.get(url)
+            if cached is not None:
+                status, headers, body = cached
+                self.cache_hits += 1
+                self.bytes_saved += len(body)
+                await route.fulfill(status=status, headers=headers, body=body)
+                return
+
+            response = await route.fetch()
+            body = await response.body()
+            self.bytes_downloaded += len(body)
+            if response.status == 200:
+                self.asset_cache.put(url, response.status, response.headers, body)
+            await route.fulfill(response=response, body=body)
+            return
+
+        await route.continue_()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "requests_seen": self.requests_seen,
+            "requests_blocked": self.requests_blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "blocked_bytes_estimate": self.blocked_bytes_estimate,
+            "cache_hits": self.cache_hits,
+            "bytes_saved_via_cache": self.bytes_saved,
+            "bytes_downloaded_via_cache": self.bytes_downloaded,
+        }
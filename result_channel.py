@@ -0,0 +1,212 @@
+"""
+Structured result channel between a server and the scripts it spawns.
+
+The parent opens a pipe and hands the write end to the child (its number
+is in NADLAN_RESULT_FD). The child sends length-prefixed JSON frames on it:
+its final result and progress events. stdout and stderr are only logs. The
+parent keeps the last few hundred lines of them in a ring buffer instead of
+holding the whole output in memory, and never has to guess which printed
+line is the result.
+
+Frame: 4-byte big-endian payload length, then UTF-8 JSON such as
+``{"type": "result", "result": {...}}`` or ``{"type": "progress", ...}``.
+
+Child side::
+
+    channel = ResultChannel.from_env()
+    channel.progress(stage="login", ms=812.5)
+    channel.send_result(result)   # prints JSON instead when run by hand
+"""
+
+import asyncio
+import json
+import os
+import struct
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+RESULT_FD_ENV = "NADLAN_RESULT_FD"
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+MAX_LOG_LINE_CHARS = 2000
+
+_HEADER = struct.Struct(">I")
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, default=str).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Next message from ``reader``, or None once the other end has closed"""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Result frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    return json.loads((await reader.readexactly(length)).decode("utf-8"))
+
+
+async def open_frame_reader(fd: int):
+    """(StreamReader, transport) over the read end of a pipe; close the transport when done"""
+    reader = asyncio.StreamReader(limit=MAX_FRAME_BYTES)
+    transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", 0)
+    )
+    return reader, transport
+
+
+class ResultChannel:
+    """Child end of the channel; a no-op (result printed to stdout) without NADLAN_RESULT_FD"""
+
+    def __init__(self, fd: Optional[int] = None):
+        self.fd = fd
+
+    @classmethod
+    def from_env(cls) -> "ResultChannel":
+        fd = os.environ.get(RESULT_FD_ENV)
+        return cls(int(fd) if fd else None)
+
+    def send(self, message: Dict[str, Any]):
+        if self.fd is None:
+            return
+        data = encode_frame(message)
+        while data:
+            written = os.write(self.fd, data)
+            data = data[written:]
+
+    def progress(self, **event):
+        self.send({"type": "progress", **event})
+
+    def send_result(self, result: Any):
+        if self.fd is None:
+            print(json.dumps(result))
+            return
+        self.send({"type": "result", "result": result})
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class LogBuffer:
+    """The last ``max_lines`` lines of a child's output"""
+
+    def __init__(self, max_lines: int = 200):
+        self._lines = deque(maxlen=max_lines)
+        self.total_lines = 0
+
+    def append(self, line: str):
+        self.total_lines += 1
+        if len(line) > MAX_LOG_LINE_CHARS:
+            line = line[:MAX_LOG_LINE_CHARS] + "…"
+        self._lines.append(line)
+
+    @property
+    def dropped(self) -> int:
+        return self.total_lines - len(self._lines)
+
+    def lines(self) -> List[str]:
+        return list(self._lines)
+
+
+class ChannelRun:
+    """Outcome of run_with_result_channel"""
+
+    def __init__(self, returncode: int, result: Any, events: List[Dict[str, Any]], logs: LogBuffer):
+        self.returncode = returncode
+        self.result = result
+        self.events = events
+        self.logs = logs
+
+
+async def _read_frames(reader: asyncio.StreamReader, messages: List[Dict[str, Any]],
+                       on_message: Optional[Callable[[Dict[str, Any]], None]]):
+    while True:
+        message = await read_frame(reader)
+        if message is None:
+            return  # child closed its end
+        messages.append(message)
+        if on_message is not None:
+            on_message(message)
+
+
+async def read_logs(stream: asyncio.StreamReader, logs: LogBuffer):
+    """Copy ``stream`` line by line into ``logs`` until EOF; lines over the stream's limit are truncated"""
+    while True:
+        try:
+            line = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            line = e.partial  # last line, no newline
+        except asyncio.LimitOverrunError as e:
+            # readline() would raise ValueError here; keep the start of the line and drop the rest
+            line = await stream.readexactly(e.consumed)
+            await _skip_line(stream)
+        if not line:
+            return
+        logs.append(line.decode("utf-8", errors="replace").rstrip("\n"))
+
+
+async def _skip_line(stream: asyncio.StreamReader):
+    """Discard ``stream`` up to and including the next newline"""
+    while True:
+        try:
+            await stream.readuntil(b"\n")
+            return
+        except asyncio.IncompleteReadError:
+            return
+        except asyncio.LimitOverrunError as e:
+            await stream.readexactly(e.consumed)
+
+
+async def run_with_result_channel(args: List[str], timeout: Optional[float] = None, log_lines: int = 200,
+                                  on_message: Optional[Callable[[Dict[str, Any]], None]] = None) -> ChannelRun:
+    """
+    Run a command with a result channel attached, without blocking the event loop.
+
+    stdout and stderr go to a LogBuffer of ``log_lines`` lines. On timeout the
+    child is killed and asyncio.TimeoutError is raised.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            pass_fds=(write_fd,),
+            env={**os.environ, RESULT_FD_ENV: str(write_fd)},
+        )
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)  # only the child may hold the write end, or EOF never comes
+
+    reader, transport = await open_frame_reader(read_fd)
+    messages: List[Dict[str, Any]] = []
+    logs = LogBuffer(log_lines)
+    try:
+        await asyncio.wait_for(asyncio.gather(
+            _read_frames(reader, messages, on_message),
+            read_logs(process.stdout, logs),
+            process.wait(),
+        ), timeout=timeout)
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    finally:
+        transport.close()
+
+    result = None
+    events = []
+    for message in messages:
+        if message.get("type") == "result":
+            result = message.get("result")
+        else:
+            events.append(message)
+    return ChannelRun(process.returncode, result, events, logs)
@@ -0,0 +1,45 @@
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from ttl_cache import TTLCache
+
+
+class SessionCache:
+    """
+    Logged-in Nadlan sessions (Playwright storage_state) keyed by account.
+
+    A new BrowserContext created with a cached storage_state can go straight
+    to AddAppraisal.aspx. If Nadlan has expired the session it redirects to
+    login.aspx, the flow logs in again and the fresh state replaces this one.
+    """
+
+    def __init__(self, ttl_seconds: float = 1200, max_entries: int = 32):
+        self._cache = TTLCache(ttl_seconds, max_entries)
+
+    @classmethod
+    def from_env(cls) -> "SessionCache":
+        return cls(
+            ttl_seconds=float(os.environ.get("NADLAN_SESSION_TTL", "1200")),
+            max_entries=int(os.environ.get("NADLAN_SESSION_MAX_ENTRIES", "32")),
+        )
+
+    @staticmethod
+    def _key(username: str, password: str) -> str:
+        # Include a password digest so a changed password never reuses
+        # a session that was opened with the old one
+        digest = hashlib.sha256(password.encode("utf-8")).hexdigest()[:16]
+        return f"{username.strip().lower()}:{digest}"
+
+    def get(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """Cached storage_state for this account, if still fresh"""
+        return self._cache.get(self._key(username, password))
+
+    def store(self, username: str, password: str, storage_state: Dict[str, Any]):
+        self._cache.set(self._key(username, password), storage_state)
+
+    def invalidate(self, username: str, password: str):
+        self._cache.pop(self._key(username, password))
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
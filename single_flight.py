@@ -0,0 +1,79 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """One running job and how many callers are waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical jobs into one.
+
+    The first caller for a key starts the job; callers arriving with the
+    same key while it runs wait for that job and get its result (or its
+    exception) instead of starting their own. The job runs as its own task,
+    so one caller going away does not cancel it for the others; it is only
+    cancelled once every caller has gone. Nothing is kept after the job
+    finishes - remembering results is QuoteCache's business.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        return cls(enabled=os.environ.get("NADLAN_SINGLE_FLIGHT", "true").lower() != "false")
+
+    def running(self, key: Optional[Hashable]) -> bool:
+        """Whether a caller with ``key`` would join a job already running"""
+        return key is not None and self.enabled and key in self._flights
+
+    async def run(self, key: Optional[Hashable], job: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``job()``, shared with every concurrent caller for ``key``; a None key never coalesces"""
+        if key is None or not self.enabled:
+            return await job()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(job()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._finished(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller went away: don't keep running for nobody
+                flight.task.cancel()
+                self.cancelled += 1
+
+    def _finished(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.started + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._flights),
+            "waiting": sum(flight.waiters for flight in self._flights.values()),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "coalesce_rate": round(self.coalesced / requests, 4) if requests else 0.0,
+        }
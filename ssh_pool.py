@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from job_scheduler import CommandResult, run_command
+
+
+class SSHConnectError(Exception):
+    """Raised when the master connection to a host cannot be established"""
+
+
+class _Connection:
+    """Bookkeeping for one OpenSSH master connection"""
+
+    def __init__(self, host: str, username: str, key_path: Optional[str], control_path: str, max_sessions: int):
+        self.host = host
+        self.username = username
+        self.key_path = key_path
+        self.control_path = control_path
+        self.lock = asyncio.Lock()
+        self.sessions = asyncio.Semaphore(max_sessions)
+        self.established = False
+        self.last_used = 0.0
+        self.connects = 0
+        self.commands = 0
+
+    @property
+    def target(self) -> str:
+        return f"{self.username}@{self.host}"
+
+
+class SSHConnectionPool:
+    """
+    Reusable, multiplexed SSH connections for /run-ssh.
+
+    One OpenSSH master connection (ControlMaster) is kept per (host,
+    username, key). Commands run as extra channels over it, so only the
+    first command to a host pays for the TCP and key handshake. The master
+    exits by itself after ``idle_timeout`` seconds without a command
+    (ControlPersist) and is re-established on the next one. At most
+    ``max_sessions`` commands share a connection at once, matching sshd's
+    default MaxSessions.
+    """
+
+    def __init__(self, ssh_binary: str = "ssh", idle_timeout: float = 300, connect_timeout: float = 10,
+                 max_sessions: int = 10, control_dir: Optional[str] = None):
+        self.ssh_binary = ssh_binary
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.max_sessions = max_sessions
+        self._control_dir = control_dir
+        self._owns_control_dir = control_dir is None
+        self._connections: Dict[Tuple[str, str, str], _Connection] = {}
+
+    @classmethod
+    def from_env(cls) -> "SSHConnectionPool":
+        return cls(
+            ssh_binary=os.environ.get("NADLAN_SSH_BINARY", "ssh"),
+            idle_timeout=float(os.environ.get("NADLAN_SSH_IDLE_TIMEOUT", "300")),
+            connect_timeout=float(os.environ.get("NADLAN_SSH_CONNECT_TIMEOUT", "10")),
+            max_sessions=int(os.environ.get("NADLAN_SSH_MAX_SESSIONS", "10")),
+            control_dir=os.environ.get("NADLAN_SSH_CONTROL_DIR"),
+        )
+
+    @property
+    def control_dir(self) -> str:
+        # Unix socket paths are limited to ~100 bytes, so keep this short
+        if self._control_dir is None:
+            self._control_dir = tempfile.mkdtemp(prefix="nadlan-ssh-")
+        os.makedirs(self._control_dir, mode=0o700, exist_ok=True)
+        return self._control_dir
+
+    def _connection(self, host: str, username: str, key_path: Optional[str]) -> _Connection:
+        key = (host, username, key_path or "")
+        connection = self._connections.get(key)
+        if connection is None:
+            digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()[:16]
+            connection = _Connection(host, username, key_path, os.path.join(self.control_dir, digest),
+                                     self.max_sessions)
+            self._connections[key] = connection
+        return connection
+
+    def _options(self, connection: _Connection, password: Optional[str]) -> List[str]:
+        args = ["-o", f"ControlPath={connection.control_path}",
+                "-o", f"ConnectTimeout={int(self.connect_timeout)}"]
+        if connection.key_path:
+            args.extend(["-i", connection.key_path])
+        if not password:  # Assume key-based authentication
+            args.extend(["-o", "StrictHostKeyChecking=no", "-o", "BatchMode=yes"])
+        return args
+
+    async def _ensure_master(self, connection: _Connection, password: Optional[str]):
+        async with connection.lock:
+            # A master used within its idle window is still up; otherwise ask it
+            if connection.established and time.monotonic() - connection.last_used < self.idle_timeout - 5:
+                return
+            check = await run_command([self.ssh_binary, "-O", "check", *self._options(connection, password),
+                                       connection.target], timeout=self.connect_timeout)
+            if check.returncode == 0:
+                connection.established = True
+                return
+
+            print(f"🔐 Opening SSH master connection to {connection.target}")
+            # -f backgrounds the master once authenticated; it keeps stderr, so
+            # send that to a file rather than a pipe we would wait on forever
+            with tempfile.TemporaryFile() as stderr:
+                process = await asyncio.create_subprocess_exec(
+                    self.ssh_binary, "-M", "-N", "-f",
+                    "-o", f"ControlPersist={int(self.idle_timeout)}",
+                    *self._options(connection, password), connection.target,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=stderr,
+                )
+                try:
+                    returncode = await asyncio.wait_for(process.wait(), timeout=self.connect_timeout + 5)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    raise SSHConnectError(f"Timed out connecting to {connection.target}")
+                stderr.seek(0)
+                message = stderr.read().decode("utf-8", errors="replace").strip()
+            if returncode != 0:
+                connection.established = False
+                raise SSHConnectError(message or f"ssh exited with {returncode} connecting to {connection.target}")
+            connection.established = True
+            connection.connects += 1
+            connection.last_used = time.monotonic()
+
+    async def run(self, host: str, username: str, command: str, key_path: Optional[str] = None,
+                  password: Optional[str] = None, timeout: float = 300) -> CommandResult:
+        """Run ``command`` on ``host`` over the pooled connection, opening it if needed"""
+        connection = self._connection(host, username, key_path)
+        await self._ensure_master(connection, password)
+        async with connection.sessions:
+            connection.last_used = time.monotonic()
+            result = await run_command([self.ssh_binary, "-o", "ControlMaster=no",
+                                        *self._options(connection, password), connection.target, command],
+                                       timeout=timeout)
+            connection.commands += 1
+            connection.last_used = time.monotonic()
+        if result.returncode == 255:
+            # ssh's own failure code: the master may have gone away under us
+            connection.established = False
+        return result
+
+    async def run_many(self, hosts: List[str], username: str, command: str, key_path: Optional[str] = None,
+                       password: Optional[str] = None, timeout: float = 300) -> Dict[str, Any]:
+        """Run ``command`` on every host concurrently; per host a CommandResult or the exception"""
+        results = await asyncio.gather(
+            *(self.run(host, username, command, key_path, password, timeout) for host in hosts),
+            return_exceptions=True,
+        )
+        return dict(zip(hosts, results))
+
+    async def close(self):
+        """Ask every master connection to exit"""
+        for connection in list(self._connections.values()):
+            if connection.established:
+                try:
+                    await run_command([self.ssh_binary, "-O", "exit", "-o", f"ControlPath={connection.control_path}",
+                                       connection.target], timeout=self.connect_timeout)
+                except Exception as e:
+                    print(f"⚠️ Error closing SSH connection to {connection.target}: {e}")
+                connection.established = False
+        self._connections = {}
+        if self._owns_control_dir and self._control_dir is not None:
+            shutil.rmtree(self._control_dir, ignore_errors=True)
+            self._control_dir = None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "connections": len(self._connections),
+            "established": sum(1 for c in self._connections.values() if c.established),
+            "connects": sum(c.connects for c in self._connections.values()),
+            "commands": sum(c.commands for c in self._connections.values()),
+            "idle_timeout": self.idle_timeout,
+            "hosts": [
+                {
+                    "target": c.target,
+                    "established": c.established,
+                    "connects": c.connects,
+                    "commands": c.commands,
+                    "idle_seconds": round(now - c.last_used, 1) if c.last_used else None,
+                }
+                for c in self._connections.values()
+            ],
+        }
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the background appraisal job queue.
+
+    python -m pytest -q test_appraisal_jobs.py
+"""
+
+import asyncio
+
+from appraisal_jobs import CANCELLED, FAILED, SUCCEEDED, JobManager
+
+
+async def quote(request):
+    await asyncio.sleep(request.get("seconds", 0.01))
+    if request.get("fail"):
+        return {"error": "Login failed"}
+    return {"appraisal_fee": "$525.00"}
+
+
+async def wait_for(job, *statuses):
+    while job.status not in statuses:
+        await asyncio.sleep(0.01)
+
+
+def test_results_with_an_error_fail_the_job():
+    async def scenario():
+        manager = JobManager(quote, workers=1)
+        await manager.start()
+        ok, failed = manager.submit({}), manager.submit({"fail": True})
+        await wait_for(failed, SUCCEEDED, FAILED)
+        await manager.stop()
+        return ok, failed
+
+    ok, failed = asyncio.run(scenario())
+    assert ok.status == SUCCEEDED
+    assert failed.status == FAILED and failed.error == "Login failed"
+
+
+def test_cancelled_job_leaves_the_worker_running():
+    async def scenario():
+        manager = JobManager(quote, workers=1)
+        await manager.start()
+        slow = manager.submit({"seconds": 5})
+        await asyncio.sleep(0.05)
+        manager.cancel(slow.id)
+        after = manager.submit({})
+        await asyncio.wait_for(wait_for(after, SUCCEEDED, FAILED), timeout=2)
+        await manager.stop()
+        return slow, after
+
+    slow, after = asyncio.run(scenario())
+    assert slow.status == CANCELLED
+    assert after.status == SUCCEEDED
+
+
+def test_stop_returns_while_a_job_is_running():
+    async def scenario():
+        manager = JobManager(quote, workers=1)
+        await manager.start()
+        job = manager.submit({"seconds": 30})
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(manager.stop(), timeout=2)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == CANCELLED
+
+
+def test_cancelled_jobs_free_their_queue_place():
+    async def scenario():
+        manager = JobManager(quote, workers=1, max_queued=2)
+        await manager.start()
+        running = manager.submit({"seconds": 5})
+        await asyncio.sleep(0.05)
+        for _ in range(3):
+            manager.cancel(manager.submit({}).id)  # would fill the queue if still counted
+        waiting = [manager.submit({}), manager.submit({})]
+        stats = manager.stats()
+        manager.cancel(running.id)
+        await asyncio.wait_for(wait_for(waiting[-1], SUCCEEDED, FAILED), timeout=2)
+        await manager.stop()
+        return stats, manager.stats()
+
+    during, after = asyncio.run(scenario())
+    assert (during["queue_depth"], during["submitted"], during["cancelled"]) == (2, 6, 3)
+    assert (after["queue_depth"], after["succeeded"], after["cancelled"]) == (0, 2, 4)
+
+
+def test_finished_jobs_are_pruned_on_lookup():
+    async def scenario():
+        manager = JobManager(quote, workers=1, retention_seconds=0)
+        await manager.start()
+        job = manager.submit({})
+        await wait_for(job, SUCCEEDED, FAILED)
+        await asyncio.sleep(0.01)
+        found = manager.get(job.id)
+        await manager.stop()
+        return found
+
+    assert asyncio.run(scenario()) is None
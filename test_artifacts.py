@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the background screenshot store.
+
+    python -m pytest -q test_artifacts.py
+"""
+
+import asyncio
+
+import pytest
+
+from artifacts import ArtifactStore, screenshot_policy
+
+JOB_ID = "0" * 32
+
+
+def test_writes_survive_a_shutdown_and_restart(tmp_path):
+    store = ArtifactStore(root=str(tmp_path))
+
+    async def scenario():
+        first = store.save(JOB_ID, "element", b"first")
+        store.shutdown()  # end of one app lifespan
+        second = store.save(JOB_ID, "full_page", b"second")
+        return await store.find(first["artifact_id"]), await store.find(second["artifact_id"])
+
+    (first_path, media_type), (second_path, _) = asyncio.run(scenario())
+    store.shutdown()
+    assert first_path.endswith(".jpg") and media_type == "image/jpeg"
+    assert open(second_path, "rb").read() == b"second"
+    assert store.stats()["written"] == 2
+
+
+def test_screenshot_policy():
+    assert screenshot_policy({"screenshot": "element"}) == "element"
+    with pytest.raises(ValueError):
+        screenshot_policy({"screenshot": "thumbnail"})
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the Nadlan benchmark runner (HTTP engine only; browser
+targets are skipped without Firefox).
+
+    python -m pytest -q test_benchmark_nadlan.py
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from benchmark_nadlan import Target, compare, main, parse_targets, percentile, run_benchmark
+from nadlan_engine import PROFILES
+
+
+def test_parse_targets():
+    assert parse_targets("http") == [Target("http", "simple_working")]
+    assert len(parse_targets("browser:*,browser:fast")) == len(PROFILES)
+    with pytest.raises(ValueError):
+        parse_targets("browser:warp")
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([10, 20, 30, 40], 50) == 25
+    assert percentile([float(n) for n in range(1, 101)], 95) == pytest.approx(95.0, abs=0.1)
+
+
+def test_benchmark_records_stages_and_fee_correctness():
+    results = asyncio.run(run_benchmark([Target("http", "simple_working")], runs=3, warmup=0,
+                                        server_options={"latency": {"postback:txtPropertyZip": 0.05}}))
+    summary = results["summary"]["http:simple_working"]
+    assert summary["runs"] == 3
+    assert summary["success_rate"] == 1 and summary["correct_rate"] == 1
+    assert summary["p50_ms"] >= 50
+    assert summary["stages"]["property_zip"]["p50"] >= 50
+    assert results["settings"]["latency"] == {"postback:txtPropertyZip": 0.05}
+    assert all(run["expected_fee"] == 525 for run in results["runs"])
+
+
+def test_baseline_diff_flags_regressions(tmp_path):
+    def document(p50, success=1.0, target="http:simple_working"):
+        return {"summary": {target: {"p50_ms": p50, "p95_ms": p50 * 2, "success_rate": success}}}
+
+    assert not compare(document(105), document(100))[0]["regressed"]
+    assert compare(document(120), document(100))[0]["regressed"]
+    assert compare(document(90, success=0.9), document(100))[0]["regressed"]
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(document(0.001)))
+    out = tmp_path / "results.json"
+    args = ["--targets", "http", "--runs", "2", "--out", str(out), "--baseline", str(baseline)]
+    assert main(args) == 0
+    assert main(args + ["--fail-on-regression"]) == 1
+    assert json.loads(out.read_text())["summary"]["http:simple_working"]["runs"] == 2
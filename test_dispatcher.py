@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the multi-droplet dispatcher, routed to in-process
+stand-in nodes instead of real droplets.
+
+    python -m pytest -q test_dispatcher.py
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from dispatcher import Dispatcher, NoHealthyNodes
+
+
+def stand_in_node(name, capacity=2, queue_depth=0, quote_status=200, ready=True):
+    app = FastAPI()
+    app.state.quotes = 0
+
+    @app.get("/health")
+    async def health():
+        return JSONResponse({"ready": ready, "capacity": capacity, "in_flight": 0, "queue_depth": queue_depth},
+                            status_code=200 if ready else 503)
+
+    @app.post("/run-appraisal")
+    async def run_appraisal(body: dict):
+        app.state.quotes += 1
+        await asyncio.sleep(0.05)
+        if quote_status != 200:
+            return JSONResponse({"detail": "node failure"}, status_code=quote_status)
+        return {"node": name, "appraisal_fee": "$450.00", "echo": body.get("loan_number")}
+
+    return app
+
+
+class NodesTransport(httpx.AsyncBaseTransport):
+    """Routes each request to the stand-in node named by its host; unknown hosts are unreachable"""
+
+    def __init__(self, apps):
+        self.transports = {host: httpx.ASGITransport(app=app) for host, app in apps.items()}
+
+    async def handle_async_request(self, request):
+        transport = self.transports.get(request.url.host)
+        if transport is None:
+            raise httpx.ConnectError("Connection refused", request=request)
+        return await transport.handle_async_request(request)
+
+
+def run(apps, scenario, nodes=None):
+    async def main():
+        dispatcher = Dispatcher(nodes or [f"http://{host}" for host in apps],
+                                client=httpx.AsyncClient(transport=NodesTransport(apps)))
+        await dispatcher.check_all()
+        try:
+            return await scenario(dispatcher)
+        finally:
+            await dispatcher.client.aclose()
+
+    return asyncio.run(main())
+
+
+def test_load_spreads_across_nodes():
+    apps = {"node-a": stand_in_node("a"), "node-b": stand_in_node("b"), "node-c": stand_in_node("c")}
+
+    async def scenario(dispatcher):
+        responses = await asyncio.gather(*(dispatcher.dispatch("/run-appraisal", {"loan_number": i})
+                                           for i in range(12)))
+        assert [r.json()["echo"] for r in responses] == list(range(12))
+        return dispatcher.stats()
+
+    stats = run(apps, scenario)
+    assert all(app.state.quotes == 4 for app in apps.values())
+    assert stats["completed"] == 12
+
+
+def test_least_loaded_node_wins():
+    apps = {"busy": stand_in_node("busy", queue_depth=10), "idle": stand_in_node("idle")}
+
+    async def scenario(dispatcher):
+        response = await dispatcher.dispatch("/run-appraisal", {})
+        return response.json()["node"]
+
+    assert run(apps, scenario) == "idle"
+
+
+def test_failed_node_is_retried_elsewhere():
+    apps = {"broken": stand_in_node("broken", quote_status=502), "good": stand_in_node("good", queue_depth=5)}
+
+    async def scenario(dispatcher):
+        response = await dispatcher.dispatch("/run-appraisal", {})
+        assert response.json()["node"] == "good"
+        assert not dispatcher.nodes["http://broken"].healthy
+        return dispatcher.retries
+
+    assert run(apps, scenario) == 1
+
+
+def test_unready_and_unreachable_nodes_get_no_traffic():
+    apps = {"starting": stand_in_node("starting", ready=False)}
+
+    async def scenario(dispatcher):
+        assert dispatcher.stats()["healthy_nodes"] == 0
+        with pytest.raises(NoHealthyNodes):
+            await dispatcher.dispatch("/run-appraisal", {})
+
+    run(apps, scenario, nodes=["http://starting", "http://gone"])
+
+
+def test_client_errors_are_not_retried():
+    apps = {"a": stand_in_node("a", quote_status=422), "b": stand_in_node("b", quote_status=422)}
+
+    async def scenario(dispatcher):
+        response = await dispatcher.dispatch("/run-appraisal", {})
+        assert response.status_code == 422
+        return dispatcher.retries
+
+    assert run(apps, scenario) == 0
+
+
+def test_app_errors_are_relayed_without_marking_nodes_down():
+    apps = {"a": stand_in_node("a", quote_status=500), "b": stand_in_node("b", quote_status=500)}
+
+    async def scenario(dispatcher):
+        response = await dispatcher.dispatch("/run-appraisal", {})
+        assert response.status_code == 500
+        assert all(node.healthy for node in dispatcher.nodes.values())
+        return dispatcher.retries
+
+    assert run(apps, scenario) == 0
+    assert sum(app.state.quotes for app in apps.values()) == 1
+
+
+def test_malformed_body_is_a_400():
+    import dispatcher
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=dispatcher.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://dispatcher") as client:
+            return await client.post("/run-appraisal", content=b"{not json",
+                                     headers={"Content-Type": "application/json"})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 400
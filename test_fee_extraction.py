@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Offline tests for reading the appraisal fee label.
+
+    python -m pytest -q test_fee_extraction.py
+"""
+
+import time
+
+import pytest
+
+from mock_nadlan_server import MOCK_VARIABLES
+from nadlan_engine import NadlanEngine, parse_fee
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$1,250.00", (1250.0, "USD")),
+    ("450", (450.0, "USD")),
+    ("USD 450", (450.0, "USD")),
+    ("€ 300.50", (300.5, "EUR")),
+    ("£99", (99.0, "GBP")),
+    ("Fee: $525.00 (incl. rush)", (525.0, "USD")),
+    ("TBD", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_fee(text, expected):
+    assert parse_fee(text) == expected
+
+
+def test_fee_result_reports_the_amount_and_wait():
+    engine = NadlanEngine(dict(MOCK_VARIABLES))
+    engine.last_field_changed = time.perf_counter() - 0.25
+    result = engine.fee_result("525.00", ["product"])
+    assert result["appraisal_fee"] == "$525.00"
+    assert (result["appraisal_fee_amount"], result["currency"]) == (525.0, "USD")
+    assert result["fee_wait_ms"] >= 250
+
+
+def test_missing_fee_is_not_an_error():
+    engine = NadlanEngine(dict(MOCK_VARIABLES))
+    result = engine.fee_result(None, ["product"])
+    assert "appraisal_fee" not in result and "error" not in result
+    assert result["filled_fields"] == ["product"]
+    assert result["fee_wait_ms"] is None
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the bounded job scheduler and the non-blocking command runner.
+
+    python -m pytest -q test_job_scheduler.py
+"""
+
+import asyncio
+import sys
+import time
+
+import httpx
+import pytest
+
+from job_scheduler import JobScheduler, SchedulerFull, run_command
+
+
+def test_saturated_scheduler_rejects_with_retry_after():
+    scheduler = JobScheduler(max_in_flight=1, max_queued=1)
+
+    async def job():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        return await asyncio.gather(*(scheduler.run(job) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert results[:2] == ["done", "done"]
+    assert isinstance(results[2], SchedulerFull) and results[2].retry_after >= 1
+    stats = scheduler.stats()
+    assert (stats["completed"], stats["rejected"], stats["in_flight"], stats["queued"]) == (2, 1, 0, 0)
+
+
+def test_waiting_jobs_queue_past_the_limit():
+    scheduler = JobScheduler(max_in_flight=1, max_queued=0)
+    running = []
+
+    async def job():
+        running.append(scheduler.in_flight)
+        await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(scheduler.run(job, wait=True) for _ in range(4)))
+
+    asyncio.run(scenario())
+    assert running == [1, 1, 1, 1]
+    assert scheduler.stats()["rejected"] == 0
+
+
+def test_reservations_count_before_the_job_starts():
+    scheduler = JobScheduler(max_in_flight=1, max_queued=1)
+    first, second = scheduler.reserve(), scheduler.reserve()
+    with pytest.raises(SchedulerFull):
+        scheduler.reserve()
+    first.release()
+    first.release()  # a second release is a no-op
+    assert asyncio.run(scheduler.run(lambda: asyncio.sleep(0, "ok"), reservation=second)) == "ok"
+    assert scheduler.stats()["queued"] == 0
+
+
+def test_run_command_does_not_block_the_loop():
+    async def scenario():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run_command([sys.executable, "-c", "import time; time.sleep(0.3); print('ok')"])
+                                         for _ in range(3)))
+        return results, time.perf_counter() - started
+
+    results, seconds = asyncio.run(scenario())
+    assert [r.stdout.strip() for r in results] == ["ok", "ok", "ok"]
+    assert seconds < 0.9
+
+
+def test_run_command_timeout_kills_the_child():
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run_command([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.3))
+
+
+def test_endpoint_answers_429_with_retry_after(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "ssh_scheduler", JobScheduler(max_in_flight=0, max_queued=0))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            return await client.post("/run-ssh", json={"host": "droplet-1", "username": "root", "command": "true"})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
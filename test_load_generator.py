@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the load generator, driven against an in-process stand-in
+API with two quote slots.
+
+    python -m pytest -q test_load_generator.py
+"""
+
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from load_generator import LoadGenerator, app_error, find_knee, load_bodies, parse_prometheus
+
+
+def stand_in_api(slots=2, service_seconds=0.05, max_queue=None):
+    app = FastAPI()
+    app.state.in_flight = 0
+    app.state.queued = 0
+    app.state.bodies = []
+
+    @app.post("/run-appraisal")
+    async def run_appraisal(body: dict):
+        if not hasattr(app.state, "slots"):  # created on the test's event loop
+            app.state.slots = asyncio.Semaphore(slots)
+        if max_queue is not None and app.state.queued >= max_queue:
+            await asyncio.sleep(0.01)  # a real rejection still costs a round trip
+            return JSONResponse({"detail": "Too many queued jobs"}, status_code=429)
+        app.state.bodies.append(body)
+        app.state.queued += 1
+        async with app.state.slots:
+            app.state.queued -= 1
+            app.state.in_flight += 1
+            await asyncio.sleep(service_seconds)
+            app.state.in_flight -= 1
+        if body.get("product") == 0:
+            return {"error": "Failed to fill product"}
+        return {"appraisal_fee": "$525.00", "cached": False}
+
+    @app.get("/health")
+    async def health():
+        return {"ready": True, "capacity": slots, "in_flight": app.state.in_flight,
+                "queue_depth": app.state.queued}
+
+    @app.get("/metrics")
+    async def metrics():
+        return PlainTextResponse(f'# TYPE nadlan_scheduler_queued gauge\nnadlan_scheduler_queued {app.state.queued}\n')
+
+    return app
+
+
+def generator(app, bodies=None, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api")
+    return LoadGenerator("http://api", "/run-appraisal", bodies or [{"product": 59}], interval=0.2,
+                         client=client, **kwargs)
+
+
+def test_closed_loop_replays_bodies_in_order():
+    app = stand_in_api()
+    bodies = [{"product": 59, "loan_number": str(i)} for i in range(3)]
+    results = asyncio.run(generator(app, bodies).run("closed", [2], requests=6))
+    summary = results["stages"][0]["summary"]
+    assert summary["requests"] == summary["ok"] == 6
+    assert summary["p50_ms"] >= 50
+    assert [body["loan_number"] for body in app.state.bodies] == ["0", "1", "2"] * 2
+
+
+def test_error_classes_and_server_samples():
+    app = stand_in_api(slots=1, service_seconds=0.1, max_queue=1)
+    bodies = [{"product": 59}, {"product": 0}]
+    results = asyncio.run(generator(app, bodies, metrics=["nadlan_scheduler_queued"]).run("closed", [4], duration=0.6))
+    stage = results["stages"][0]
+    assert stage["summary"]["errors"]["http_429"] > 0
+    assert stage["summary"]["errors"]["app_error"] > 0
+    samples = [point["server"] for point in stage["timeline"]]
+    assert all(sample["health_status"] == 200 and "nadlan_scheduler_queued" in sample for sample in samples)
+    assert any(sample["in_flight"] == 1 for sample in samples)
+
+
+def test_open_loop_keeps_the_arrival_rate():
+    app = stand_in_api(slots=1, service_seconds=0.2)
+    results = asyncio.run(generator(app).run("open", [20], requests=10, poisson=False))
+    records = results["stages"][0]["records"]
+    # Arrivals do not wait for answers: all 10 sent in ~0.45s though one slot finishes ~2 in that time
+    assert len(records) == 10
+    assert max(record["sent_s"] for record in records) < 0.6
+    assert max(record["latency_ms"] for record in records) > 1000
+
+
+def test_knee_is_where_throughput_flattens():
+    app = stand_in_api(slots=2, service_seconds=0.05)
+    results = asyncio.run(generator(app).run("closed", [1, 2, 4], duration=0.5))
+    throughput = [stage["summary"]["throughput_per_second"] for stage in results["stages"]]
+    assert throughput[1] > throughput[0] * 1.5
+    assert results["knee"]["level"] == 2
+
+
+def test_helpers(tmp_path):
+    path = tmp_path / "bodies.jsonl"
+    path.write_text('# recorded\n{"product": 59}\n\n{"product": 60}\n')
+    assert load_bodies(str(path), {"use_cache": False}) == [{"product": 59, "use_cache": False},
+                                                            {"product": 60, "use_cache": False}]
+    assert app_error({"status": "success", "result": {"parsed_result": {"error": "Login failed"}}}) == "Login failed"
+    assert app_error({"appraisal_fee": "$525.00"}) is None
+    assert parse_prometheus('a{node="x"} 2\na{node="y"} 3\nb 1\n', ["a"]) == {"a": 5.0}
+    stages = [{"mode": "closed", "level": level, "summary": {"throughput_per_second": thr, "errors": {},
+                                                             "requests": 10, "p95_ms": 1}}
+              for level, thr in [(1, 1.0), (2, 2.0), (4, 3.0)]]
+    assert find_knee(stages) is None
@@ -3,7 +3,7 @@
 import asyncio
 import json
 import sys
-from nadlan_playwright_simple import NadlanPlaywright
+from nadlan_playwright_simple import NadlanPlaywrightSimple
 
 async def test_local():
     """Test the script locally with visible browser"""
@@ -36,7 +36,7 @@ async def test_local():
     print(f"📋 Test variables: {json.dumps(test_variables, indent=2)}")
     
     try:
-        nadlan = NadlanPlaywright(test_variables)
+        nadlan = NadlanPlaywrightSimple(test_variables)
         result = await nadlan.run()
         
         print("✅ Script completed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the Prometheus text rendering.
+
+    python -m pytest -q test_metrics.py
+"""
+
+import pytest
+
+from metrics import Registry, record_timings, result_outcome
+
+
+def test_counter_and_gauge_render_with_labels():
+    registry = Registry()
+    requests = registry.counter("api_requests_total", "Requests", ("endpoint", "status"))
+    requests.inc(endpoint="/run-appraisal", status="200")
+    requests.inc(2, endpoint="/run-appraisal", status="200")
+    registry.gauge("pool_size", "Browsers").set(1.5)
+    assert registry.render() == (
+        "# HELP api_requests_total Requests\n"
+        "# TYPE api_requests_total counter\n"
+        'api_requests_total{endpoint="/run-appraisal",status="200"} 3\n'
+        "# HELP pool_size Browsers\n"
+        "# TYPE pool_size gauge\n"
+        "pool_size 1.5\n"
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("wait_seconds", "Waits", ("queue",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, queue="jobs")
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'wait_seconds_bucket{queue="jobs",le="0.1"} 1',
+        'wait_seconds_bucket{queue="jobs",le="1"} 2',
+        'wait_seconds_bucket{queue="jobs",le="+Inf"} 3',
+        'wait_seconds_sum{queue="jobs"} 5.55',
+        'wait_seconds_count{queue="jobs"} 3',
+    ]
+
+
+def test_label_values_are_escaped_and_checked():
+    registry = Registry()
+    errors = registry.counter("errors_total", "Errors", ("message",))
+    errors.inc(message='bad "quote"\nline')
+    assert 'errors_total{message="bad \\"quote\\"\\nline"} 1' in registry.render()
+    with pytest.raises(ValueError):
+        errors.inc(node="a")
+
+
+def test_callbacks_are_read_at_scrape_time_and_skip_failures():
+    registry = Registry()
+    size = {"value": 1}
+    registry.callback("cache_entries", "Entries", lambda: size["value"])
+    registry.callback("node_load", "Load", lambda: {("a",): 0.5, ("b",): 2}, ("node",))
+    registry.callback("broken", "Raises", lambda: 1 / 0)
+    size["value"] = 7
+    text = registry.render()
+    assert "cache_entries 7\n" in text
+    assert 'node_load{node="a"} 0.5\nnode_load{node="b"} 2\n' in text
+    assert "broken" not in text
+
+
+def test_engine_timings_feed_the_histograms():
+    from metrics import STAGE_SECONDS
+
+    report = {"engine": "http", "profile": "unit", "total_ms": 300, "steps": [{"stage": "login", "ms": 300}]}
+    record_timings(report, result_outcome({"appraisal_fee": "$525.00"}))
+    assert 'nadlan_stage_duration_seconds_count{stage="login",engine="http",profile="unit",outcome="success"} 1' \
+        in "\n".join(STAGE_SECONDS.samples())
+    assert result_outcome({"error": "Login failed"}) == "error"
+    assert result_outcome({"status": "success"}) == "no_fee"
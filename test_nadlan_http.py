@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the browserless Nadlan engine, run against mock_nadlan_server.
+
+    python -m pytest -q test_nadlan_http.py
+"""
+
+import asyncio
+import time
+
+from mock_nadlan_server import MockNadlanServer, parse_latency
+from nadlan_engine import parse_fee
+from nadlan_http import NadlanHttpEngine, parse_delta, parse_page_request_manager
+
+
+
+def run_engine(server, storage_state=None, **overrides):
+    engine = NadlanHttpEngine(server.variables(**overrides), storage_state=storage_state)
+    return engine, asyncio.run(engine.run())
+
+
+def test_quote_with_partial_postbacks(mock_nadlan):
+    engine, result = run_engine(mock_nadlan)
+    assert result["appraisal_fee"] == "$525.00"  # 450 + NJ 50 + non-owner 25
+    assert result["appraisal_fee_amount"] == 525.0
+    assert result["currency"] == "USD"
+    assert result["fee_wait_ms"] >= 0
+    assert engine.logged_in
+    assert result["timings"]["engine"] == "http"
+    assert "fee" in [step["stage"] for step in result["timings"]["steps"]]
+    assert engine.client.is_closed
+    assert mock_nadlan.stats()["rejected_postbacks"] == 0
+
+
+def test_quote_with_full_postbacks(mock_nadlan_factory):
+    server = mock_nadlan_factory(partial_postbacks=False)
+    _, result = run_engine(server, property_state="California", occupancy_type="Owner Occupied")
+    assert result["appraisal_fee"] == "$525.00"  # 450 + CA 75
+
+
+def test_session_reuse_skips_login(mock_nadlan):
+    engine, _ = run_engine(mock_nadlan)
+    reused, result = run_engine(mock_nadlan, storage_state=engine.export_storage_state())
+    assert result["appraisal_fee"] == "$525.00"
+    assert not reused.logged_in
+    assert "login" not in [step["stage"] for step in result["timings"]["steps"]]
+
+
+def test_concurrent_quotes_share_a_session(mock_nadlan):
+    engine, _ = run_engine(mock_nadlan)
+    state = engine.export_storage_state()
+
+    async def quote(zip_code, product):
+        engine = NadlanHttpEngine(mock_nadlan.variables(property_zip=zip_code, product=product), storage_state=state)
+        return await engine.run()
+
+    async def scenario():
+        return await asyncio.gather(*(quote(f"0775{i}", 59 + i % 2) for i in range(4)))
+
+    results = asyncio.run(scenario())
+    assert [r["appraisal_fee"] for r in results] == ["$525.00", "$500.00", "$525.00", "$500.00"]
+    assert mock_nadlan.stats()["rejected_postbacks"] == 0
+
+
+def test_bad_credentials(mock_nadlan):
+    _, result = run_engine(mock_nadlan, password="wrong")
+    assert result["error"].startswith("Login failed")
+
+
+def test_per_endpoint_latency(mock_nadlan_factory):
+    server = mock_nadlan_factory(latency={"login": 0.2, "postback:txtPropertyZip": 0.3}, jitter=0)
+    started = time.perf_counter()
+    engine, result = run_engine(server)
+    assert result["appraisal_fee"] == "$525.00"
+    assert time.perf_counter() - started >= 0.5
+    assert server.stats()["delayed_seconds"] == 0.5
+    steps = {step["stage"]: step["ms"] for step in result["timings"]["steps"]}
+    assert steps["login"] >= 200
+
+
+def test_latency_jitter_is_seeded():
+    def draws(seed):
+        server = MockNadlanServer(latency="typical", jitter=0.1, seed=seed)
+        try:
+            return [server.latency_for("postback", "txtPropertyZip") for _ in range(5)]
+        finally:
+            server.stop()
+
+    assert draws(7) == draws(7)
+    assert draws(7) != draws(8)
+    assert all(0.5 <= seconds <= 0.7 for seconds in draws(7))
+
+
+def test_parse_latency():
+    assert parse_latency(None) == {}
+    assert parse_latency(0.25) == {"*": 0.25}
+    assert parse_latency("form=0.5,postback:txtPropertyZip=0.8") == {"form": 0.5, "postback:txtPropertyZip": 0.8}
+    assert parse_latency("typical")["postback:txtPropertyZip"] == 0.6
+
+
+def test_parse_delta_allows_pipes_in_content():
+    text = "5|updatePanel|up1|a|b|c|0|hiddenField|__EVENTTARGET||4|hiddenField|__VIEWSTATE|abc=|"
+    assert parse_delta(text) == [
+        ("updatePanel", "up1", "a|b|c"),
+        ("hiddenField", "__EVENTTARGET", ""),
+        ("hiddenField", "__VIEWSTATE", "abc="),
+    ]
+
+
+def test_parse_page_request_manager():
+    html = ("Sys.WebForms.PageRequestManager._initialize('ctl00$ScriptManager1', 'aspnetForm', "
+            "['tctl00$cphBody$upForm','ctl00_cphBody_upForm'], [], [], 90, 'ctl00');")
+    assert parse_page_request_manager(html) == (
+        "ctl00$ScriptManager1", {"ctl00_cphBody_upForm": "ctl00$cphBody$upForm"}
+    )
+
+
+def test_parse_fee():
+    assert parse_fee("$1,250.00") == (1250.0, "USD")
+    assert parse_fee("450") == (450.0, "USD")
+    assert parse_fee("") is None
+    assert parse_fee("TBD") is None
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Browser tests for the condition-based form waits, run against
+mock_nadlan_server. Skipped when Firefox is not installed.
+
+    python -m pytest -q test_nadlan_waits.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from browser_provisioning import BrowserProvisioning
+from nadlan_engine import NADLAN_FIELDS, NadlanEngine
+
+ZIP = next(spec for spec in NADLAN_FIELDS if spec.name == "property_zip")
+
+
+@pytest.fixture(scope="module")
+def firefox():
+    if not asyncio.run(BrowserProvisioning(["firefox"]).check()):
+        pytest.skip("Firefox is not installed")
+
+
+def test_zip_wait_accepts_an_identical_product_list(firefox, mock_nadlan):
+    from playwright.async_api import async_playwright
+
+    engine = NadlanEngine(mock_nadlan.variables(profile="simple_working"))
+
+    async def scenario():
+        async with async_playwright() as p:
+            browser = await p.firefox.launch(headless=True)
+            try:
+                page = await browser.new_page()
+                await page.goto(f"{engine.base_url}/AddAppraisal.aspx")
+                assert await engine.login(page) is None
+                await engine.fill_field(page, ZIP, "07751")
+                started = time.perf_counter()
+                await engine.fill_field(page, ZIP, "07752")  # same county: same products re-rendered
+                return time.perf_counter() - started
+            finally:
+                await browser.close()
+
+    seconds = asyncio.run(scenario())
+    assert seconds * 1000 < engine.profile.postback_timeout_ms
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the dropdown option catalog.
+
+    python -m pytest -q test_option_catalog.py
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from mock_nadlan_server import MockNadlanServer
+from nadlan_engine import NadlanEngine
+from option_catalog import OptionCatalog, UnknownOption
+
+
+def test_lookup_is_forgiving_about_formatting():
+    catalog = OptionCatalog()
+    assert catalog.lookup('drpPropertyType', 'Single Family Residential') == '13'
+    assert catalog.lookup('drpPropertyType', ' multi family ') == '10'
+    assert catalog.lookup('drpPropertyState', 'New Jersey') == 'NJ'
+    assert catalog.lookup('drpPropertyState', 'nj') == 'NJ'
+
+
+def test_unknown_label_fails_fast():
+    with pytest.raises(UnknownOption) as error:
+        NadlanEngine({"occupancy_type": "Investment"}, catalog=OptionCatalog())
+    assert error.value.field == "occupancy_type"
+    assert "Owner Occupied" in error.value.choices
+
+
+def test_refresh_scrapes_and_persists(tmp_path):
+    path = tmp_path / "catalog.json"
+    catalog = OptionCatalog(str(path))
+    with MockNadlanServer() as server:
+        changed = asyncio.run(catalog.refresh("mockuser", "mockpass", base_url=server.url))
+
+    assert changed  # the mock also offers drpProject
+    assert catalog.version == 1
+    assert catalog.lookup('drpProject', 'rush') == '2'
+    assert all(option["value"] for option in catalog.dropdowns['drpTransactionType'])
+
+    saved = json.loads(path.read_text())
+    assert saved["version"] == 1
+    reloaded = OptionCatalog(str(path))
+    assert reloaded.version == 1
+    assert reloaded.lookup('drpProject', 'Standard') == '1'
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the fee quote cache key.
+
+    python -m pytest -q test_quote_cache.py
+"""
+
+from quote_cache import QuoteCache, make_quote_key
+
+QUOTE = {"username": "MockUser", "password": "mockpass", "transaction_type": "Purchase", "product": 59,
+         "property_state": "New Jersey", "property_zip": "07751"}
+
+
+def test_key_ignores_formatting_and_order_only_fields():
+    assert make_quote_key(QUOTE) == make_quote_key({**QUOTE, "username": " mockuser ", "property_zip": "07751-1234",
+                                                    "loan_number": "other"})
+
+
+def test_wrong_password_is_not_served_a_cached_quote():
+    cache = QuoteCache()
+    cache.store(QUOTE, {"appraisal_fee": "$525.00"})
+    assert cache.get(QUOTE)["appraisal_fee"] == "$525.00"
+    assert cache.get({**QUOTE, "password": "WRONG"}) is None
+    assert make_quote_key(QUOTE) != make_quote_key({**QUOTE, "password": "WRONG"})
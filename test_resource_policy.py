@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the Nadlan network policy, driven with stand-in
+Playwright routes instead of a browser.
+
+    python -m pytest -q test_resource_policy.py
+"""
+
+import asyncio
+
+import pytest
+
+from resource_policy import BLOCK, CACHE, ESTIMATED_BYTES, AssetCache, ResourcePolicy
+
+SITE = "https://nadlanvaluation.spurams.com"
+
+
+class StandInRequest:
+    def __init__(self, url, resource_type, method="GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+
+class StandInResponse:
+    status = 200
+    headers = {"content-type": "application/javascript"}
+
+    async def body(self):
+        return b"x" * 1000
+
+
+class StandInRoute:
+    def __init__(self):
+        self.outcome = None
+        self.fetches = 0
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+    async def fetch(self):
+        self.fetches += 1
+        return StandInResponse()
+
+    async def fulfill(self, **kwargs):
+        self.outcome = "fulfilled"
+
+
+def handle(policy, url, resource_type):
+    route = StandInRoute()
+    asyncio.run(policy._handle(route, StandInRequest(url, resource_type)))
+    return route
+
+
+def test_block_mode_keeps_what_postbacks_need():
+    policy = ResourcePolicy(BLOCK, first_party_host="nadlanvaluation.spurams.com")
+    assert policy.should_block(f"{SITE}/logo.png", "image")
+    assert policy.should_block(f"{SITE}/site.css", "stylesheet")
+    assert policy.should_block("https://cdn.example.com/analytics.js", "script")
+    assert not policy.should_block(f"{SITE}/ScriptResource.axd?d=abc", "script")
+    assert not policy.should_block(f"{SITE}/WebResource.axd?d=abc", "script")
+    assert not policy.should_block(f"{SITE}/AddAppraisal.aspx", "document")
+    assert not policy.should_block(f"{SITE}/AddAppraisal.aspx", "xhr")
+
+
+def test_blocked_requests_are_counted_with_an_estimate():
+    policy = ResourcePolicy(BLOCK, first_party_host="nadlanvaluation.spurams.com")
+    assert handle(policy, f"{SITE}/logo.png", "image").outcome == "aborted"
+    assert handle(policy, f"{SITE}/font.woff2", "font").outcome == "aborted"
+    assert handle(policy, f"{SITE}/AddAppraisal.aspx", "document").outcome == "continued"
+    stats = policy.stats()
+    assert stats["blocked_by_type"] == {"image": 1, "font": 1}
+    assert stats["blocked_bytes_estimate"] == ESTIMATED_BYTES["image"] + ESTIMATED_BYTES["font"]
+    assert (stats["requests_seen"], stats["requests_blocked"]) == (3, 2)
+
+
+def test_cache_mode_serves_scripts_after_the_first_download():
+    policy = ResourcePolicy(CACHE, first_party_host="nadlanvaluation.spurams.com", asset_cache=AssetCache())
+    first = handle(policy, f"{SITE}/ScriptResource.axd?d=abc", "script")
+    second = handle(policy, f"{SITE}/ScriptResource.axd?d=abc", "script")
+    assert (first.fetches, second.fetches) == (1, 0)
+    assert second.outcome == "fulfilled"
+    stats = policy.stats()
+    assert (stats["cache_hits"], stats["bytes_saved_via_cache"], stats["bytes_downloaded_via_cache"]) == (1, 1000, 1000)
+
+
+def test_asset_cache_evicts_beyond_its_budget():
+    cache = AssetCache(max_bytes=1500)
+    cache.put("a", 200, {}, b"x" * 1000)
+    cache.put("b", 200, {}, b"x" * 1000)
+    assert cache.get("a") is None and cache.get("b") is not None
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        ResourcePolicy("strip")
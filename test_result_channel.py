@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the length-prefixed result channel.
+
+    python -m pytest -q test_result_channel.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from result_channel import MAX_LOG_LINE_CHARS, run_with_result_channel
+
+CHILD = """
+from result_channel import ResultChannel
+channel = ResultChannel.from_env()
+for i in range(500):
+    print(f"log line {i} {{not json}}")
+channel.progress(stage="login", ms=12.5)
+channel.send_result({"appraisal_fee": "$525.00", "note": "line\\nbreak | pipes"})
+"""
+
+
+def run(code, **kwargs):
+    return asyncio.run(run_with_result_channel([sys.executable, "-c", code], **kwargs))
+
+
+def test_result_and_progress_arrive_separately_from_logs():
+    result = run(CHILD, timeout=30, log_lines=50)
+    assert result.returncode == 0
+    assert result.result == {"appraisal_fee": "$525.00", "note": "line\nbreak | pipes"}
+    assert result.events == [{"type": "progress", "stage": "login", "ms": 12.5}]
+    assert result.logs.lines()[-1] == "log line 499 {not json}"
+    assert len(result.logs.lines()) == 50
+    assert result.logs.dropped == 450
+
+
+def test_no_result_when_child_never_sends_one():
+    result = run("print('{\"looks\": \"like a result\"}')", timeout=30)
+    assert result.result is None
+    assert result.logs.lines() == ['{"looks": "like a result"}']
+
+
+def test_timeout_kills_child():
+    with pytest.raises(asyncio.TimeoutError):
+        run("import time; time.sleep(30)", timeout=0.5)
+
+
+def test_overlong_log_line_is_truncated():
+    code = "import sys; print('x' * 200000); print('after'); sys.stdout.write('tail')"
+    result = run(code, timeout=30)
+    assert result.returncode == 0
+    first, after, tail = result.logs.lines()
+    assert first.startswith("xxx") and len(first) <= MAX_LOG_LINE_CHARS + 1
+    assert (after, tail) == ("after", "tail")
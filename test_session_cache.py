@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Offline tests for TTLCache and the logged-in session cache built on it.
+
+    python -m pytest -q test_session_cache.py
+"""
+
+import time
+
+from session_cache import SessionCache
+from ttl_cache import TTLCache
+
+STATE = {"cookies": [{"name": ".ASPXAUTH", "value": "abc"}], "origins": []}
+
+
+def test_entries_expire_after_the_ttl():
+    cache = TTLCache(ttl_seconds=0.05, max_entries=4)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_zero_ttl_disables_the_cache():
+    cache = TTLCache(ttl_seconds=0, max_entries=4)
+    cache.set("a", 1)
+    assert not cache.enabled
+    assert cache.get("a") is None
+
+
+def test_sessions_are_keyed_by_account_and_password():
+    sessions = SessionCache(ttl_seconds=60, max_entries=4)
+    sessions.store(" AaronK ", "secret", STATE)
+    assert sessions.get("aaronk", "secret") == STATE
+    assert sessions.get("aaronk", "changed") is None
+    sessions.invalidate("AaronK", "secret")
+    assert sessions.get("aaronk", "secret") is None
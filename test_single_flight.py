@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Offline tests for single-flight quote coalescing, on its own and through
+droplet_server's /run-appraisal with the HTTP engine against the mock site.
+
+    python -m pytest -q test_single_flight.py
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight()
+    runs = []
+
+    async def job(value):
+        runs.append(value)
+        await asyncio.sleep(0.05)
+        return {"fee": value}
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.run("a", lambda: job(1)),
+            flight.run("a", lambda: job(2)),
+            flight.run("b", lambda: job(3)),
+            flight.run(None, lambda: job(4)),
+        )
+
+    results = asyncio.run(scenario())
+    assert results == [{"fee": 1}, {"fee": 1}, {"fee": 3}, {"fee": 4}]
+    assert sorted(runs) == [1, 3, 4]
+    stats = flight.stats()
+    assert (stats["started"], stats["coalesced"], stats["in_flight"]) == (2, 1, 0)
+
+
+def test_errors_are_shared_and_not_remembered():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Nadlan is down")
+
+    async def scenario():
+        results = await asyncio.gather(flight.run("a", failing), flight.run("a", failing), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await flight.run("a", failing)  # a later caller starts over
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_job_survives_until_the_last_caller_leaves():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def job():
+        try:
+            await asyncio.sleep(0.2)
+            return "done"
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        first = asyncio.create_task(flight.run("a", job))
+        second = asyncio.create_task(flight.run("a", job))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        assert await second == "done"
+        assert not cancelled
+
+        lone = asyncio.create_task(flight.run("b", job))
+        await asyncio.sleep(0.05)
+        lone.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled == [True]
+
+    asyncio.run(scenario())
+    assert flight.stats()["cancelled"] == 1
+
+
+def test_identical_quotes_hit_nadlan_once(mock_nadlan_factory, monkeypatch):
+    import droplet_server
+    from mock_nadlan_server import MOCK_VARIABLES
+
+    server = mock_nadlan_factory(latency={"postback:txtPropertyZip": 0.3}, jitter=0)
+    monkeypatch.setenv("NADLAN_BASE_URL", server.url)
+    monkeypatch.setattr(droplet_server, "single_flight", SingleFlight())
+    body = {**MOCK_VARIABLES, "engine": "http", "use_cache": False}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=droplet_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://droplet") as client:
+            return await asyncio.gather(
+                client.post("/run-appraisal", json=body),
+                client.post("/run-appraisal", json={**body, "loan_number": "other", "property_zip": "07751-1234"}),
+                client.post("/run-appraisal", json=body),
+                client.post("/run-appraisal", json={**body, "product": 60}),
+                client.post("/run-appraisal", json={**body, "profile": "fast"}),
+                client.post("/run-appraisal", json={**body, "password": "wrong"}),
+            )
+
+    responses = asyncio.run(scenario())
+    assert [r.json().get("appraisal_fee") for r in responses] == ["$525.00"] * 3 + ["$500.00", "$525.00", None]
+    assert all(r.json()["cached"] is False for r in responses[:5])
+    assert responses[5].json()["error"].startswith("Login failed")  # never shares the right password's run
+    stats = droplet_server.single_flight.stats()
+    assert (stats["started"], stats["coalesced"]) == (4, 2)
+
+
+def test_joiners_get_the_quote_not_a_429(mock_nadlan_factory, monkeypatch):
+    import droplet_server
+    from job_scheduler import JobScheduler
+    from mock_nadlan_server import MOCK_VARIABLES
+
+    server = mock_nadlan_factory(latency={"postback:txtPropertyZip": 0.3}, jitter=0)
+    monkeypatch.setenv("NADLAN_BASE_URL", server.url)
+    monkeypatch.setattr(droplet_server, "single_flight", SingleFlight())
+    monkeypatch.setattr(droplet_server, "scheduler", JobScheduler(max_in_flight=1, max_queued=0))
+    body = {**MOCK_VARIABLES, "engine": "http", "use_cache": False}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=droplet_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://droplet") as client:
+            first = asyncio.create_task(client.post("/run-appraisal", json=body))
+            await asyncio.sleep(0.1)
+            joined = droplet_server.quote_appraisal(droplet_server.AppraisalRequest(**body))
+            other = client.post("/run-appraisal", json={**body, "product": 60})
+            return await asyncio.gather(first, joined, other)
+
+    first, joined, other = asyncio.run(scenario())
+    assert first.json()["appraisal_fee"] == joined["appraisal_fee"] == "$525.00"
+    assert other.status_code == 429  # a new quote still needs a free slot
+
+
+def test_burst_of_distinct_quotes_is_bounded(mock_nadlan_factory, monkeypatch):
+    import droplet_server
+    from job_scheduler import JobScheduler
+    from mock_nadlan_server import MOCK_VARIABLES
+
+    server = mock_nadlan_factory(latency={"postback:txtPropertyZip": 0.2}, jitter=0)
+    monkeypatch.setenv("NADLAN_BASE_URL", server.url)
+    monkeypatch.setattr(droplet_server, "single_flight", SingleFlight())
+    monkeypatch.setattr(droplet_server, "scheduler", JobScheduler(max_in_flight=1, max_queued=2))
+    body = {**MOCK_VARIABLES, "engine": "http", "use_cache": False}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=droplet_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://droplet") as client:
+            return await asyncio.gather(*(
+                client.post("/run-appraisal", json={**body, "property_zip": f"0775{i}"}) for i in range(5)
+            ))
+
+    responses = asyncio.run(scenario())
+    assert sorted(r.status_code for r in responses) == [200, 200, 200, 429, 429]
+    assert droplet_server.scheduler.stats()["queued"] == 0
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Offline tests for SSHConnectionPool and the /run-ssh endpoint built on it.
+
+There is no sshd here, so a stand-in ``ssh`` executable plays OpenSSH's
+ControlMaster protocol: ``-M -N -f`` creates the control socket (a plain
+file) and logs a handshake, ``-O check``/``-O exit`` inspect and remove it,
+and a command runs locally, logging a handshake only when no master exists.
+
+    python -m pytest -q test_ssh_pool.py
+"""
+
+import asyncio
+import os
+import stat
+import sys
+
+from ssh_pool import SSHConnectError, SSHConnectionPool
+
+STAND_IN_SSH = """#!{python}
+import os, subprocess, sys
+
+args = sys.argv[1:]
+options, flags, control = {{}}, set(), None
+while args and args[0].startswith("-"):
+    flag = args.pop(0)
+    if flag in ("-o", "-i", "-O", "-p"):
+        value = args.pop(0)
+        if flag == "-o":
+            name, _, value = value.partition("=")
+            options[name] = value
+        else:
+            options[flag] = value
+    else:
+        flags.add(flag)
+control = options.get("ControlPath")
+target = args.pop(0)
+host = target.split("@")[-1]
+
+def log(event):
+    with open(os.environ["STAND_IN_SSH_LOG"], "a") as f:
+        f.write(f"{{event}} {{host}}\\n")
+
+if options.get("-O") == "check":
+    sys.exit(0 if control and os.path.exists(control) else 255)
+if options.get("-O") == "exit":
+    if control and os.path.exists(control):
+        os.remove(control)
+    sys.exit(0)
+if host.startswith("down"):
+    print(f"ssh: connect to host {{host}} port 22: Connection refused", file=sys.stderr)
+    sys.exit(255)
+if "-M" in flags:
+    open(control, "w").close()
+    log("handshake")
+    sys.exit(0)
+if not (control and os.path.exists(control)):
+    log("handshake")
+log("command")
+sys.exit(subprocess.run(args[0], shell=True).returncode)
+"""
+
+
+def make_pool(tmp_path, **kwargs):
+    ssh = tmp_path / "ssh"
+    ssh.write_text(STAND_IN_SSH.format(python=sys.executable))
+    ssh.chmod(ssh.stat().st_mode | stat.S_IEXEC)
+    os.environ["STAND_IN_SSH_LOG"] = str(tmp_path / "ssh.log")
+    return SSHConnectionPool(ssh_binary=str(ssh), control_dir=str(tmp_path / "control"), **kwargs)
+
+
+def events(tmp_path):
+    log = tmp_path / "ssh.log"
+    return log.read_text().split("\n")[:-1] if log.exists() else []
+
+
+def test_commands_share_one_master_connection(tmp_path):
+    pool = make_pool(tmp_path)
+
+    async def scenario():
+        results = await asyncio.gather(*(pool.run("droplet-1", "root", f"echo {i}") for i in range(5)))
+        assert sorted(r.stdout.strip() for r in results) == ["0", "1", "2", "3", "4"]
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert events(tmp_path).count("handshake droplet-1") == 1
+    assert events(tmp_path).count("command droplet-1") == 5
+
+
+def test_connections_are_keyed_by_host_user_and_key(tmp_path):
+    pool = make_pool(tmp_path)
+
+    async def scenario():
+        await pool.run("droplet-1", "root", "true")
+        await pool.run("droplet-1", "deploy", "true")
+        await pool.run("droplet-1", "root", "true", key_path="/keys/other")
+        await pool.run("droplet-1", "root", "true")
+        assert pool.stats()["connections"] == 3
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert events(tmp_path).count("handshake droplet-1") == 3
+
+
+def test_fan_out_returns_per_host_results(tmp_path):
+    pool = make_pool(tmp_path)
+
+    async def scenario():
+        results = await pool.run_many(["droplet-1", "down-2", "droplet-3"], "root", "echo ok")
+        await pool.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert results["droplet-1"].stdout.strip() == "ok"
+    assert results["droplet-3"].returncode == 0
+    assert isinstance(results["down-2"], SSHConnectError)
+    assert "Connection refused" in str(results["down-2"])
+
+
+def test_master_reopened_after_it_went_away(tmp_path):
+    pool = make_pool(tmp_path, idle_timeout=0)  # always re-check the master
+
+    async def scenario():
+        await pool.run("droplet-1", "root", "true")
+        for name in os.listdir(tmp_path / "control"):
+            os.remove(tmp_path / "control" / name)  # ControlPersist expired
+        result = await pool.run("droplet-1", "root", "exit 3")
+        assert result.returncode == 3
+        await pool.close()
+
+    asyncio.run(scenario())
+    assert events(tmp_path).count("handshake droplet-1") == 2
+
+
+def test_run_ssh_endpoint_fans_out_through_the_pool(tmp_path, monkeypatch):
+    import httpx
+    import main
+
+    pool = make_pool(tmp_path)
+    monkeypatch.setattr(main, "ssh_pool", pool)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            response = await client.post("/run-ssh", json={
+                "hosts": ["droplet-1", "down-2"], "username": "root", "command": "echo ${greeting}",
+                "variables": {"greeting": "hi"},
+            })
+        await pool.close()
+        return response.json()["result"]
+
+    results = asyncio.run(scenario())
+    assert results["droplet-1"] == {"stdout": "hi\n", "stderr": "", "return_code": 0}
+    assert results["down-2"]["return_code"] == 255
+    assert results["down-2"]["error"].startswith("SSH connection to root@down-2 failed")
+
+
+def test_run_ssh_reports_unexpected_errors_per_host(tmp_path, monkeypatch):
+    import httpx
+    import main
+
+    pool = make_pool(tmp_path)
+    run = pool.run
+
+    async def flaky_run(host, *args, **kwargs):
+        if host == "broken-2":
+            raise OSError("Too many open files")
+        return await run(host, *args, **kwargs)
+
+    monkeypatch.setattr(pool, "run", flaky_run)
+    monkeypatch.setattr(main, "ssh_pool", pool)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            response = await client.post("/run-ssh", json={
+                "hosts": ["droplet-1", "broken-2"], "username": "root", "command": "echo ok",
+            })
+        await pool.close()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    results = response.json()["result"]
+    assert results["droplet-1"]["stdout"] == "ok\n"
+    assert results["broken-2"] == {"error": "OSError: Too many open files"}
+    assert main.scheduler.stats()["completed"] == 0  # browser slots untouched
+    assert main.ssh_scheduler.stats()["completed"] >= 1
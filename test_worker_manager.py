@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline tests for WorkerManager, using a stand-in worker that speaks the
+nadlan_worker.py protocol without launching a browser.
+
+    python -m pytest -q test_worker_manager.py
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from worker_manager import WorkerCrashed, WorkerManager
+
+STAND_IN_WORKER = """
+import asyncio, os, sys, time
+from result_channel import ResultChannel, open_frame_reader, read_frame
+
+async def serve():
+    channel = ResultChannel.from_env()
+    reader, _ = await open_frame_reader(sys.stdin.fileno())
+    channel.send({"type": "ready", "pid": os.getpid()})
+    while True:
+        message = await read_frame(reader)
+        if message is None:
+            return
+        variables = message["variables"]
+        if variables.get("crash"):
+            os._exit(3)
+        time.sleep(variables.get("sleep", 0))
+        channel.send({"type": "result", "id": message["id"], "logged_in": True, "storage_state": None,
+                      "result": {"pid": os.getpid(), "echo": variables.get("echo")}})
+
+asyncio.run(serve())
+"""
+
+
+def manager(**kwargs):
+    return WorkerManager(command=[sys.executable, "-c", STAND_IN_WORKER], **kwargs)
+
+
+async def wait_for_respawn(workers):
+    for _ in range(100):
+        if workers.stats()["idle"] == workers.size:
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("worker was not respawned")
+
+
+def test_jobs_reuse_warm_workers():
+    async def scenario():
+        workers = manager(size=2)
+        await workers.start()
+        try:
+            replies = await asyncio.gather(*(workers.run({"echo": i}) for i in range(6)))
+            assert [reply["result"]["echo"] for reply in replies] == list(range(6))
+            assert len({reply["result"]["pid"] for reply in replies}) <= 2
+            assert workers.stats()["spawns"] == 2
+        finally:
+            await workers.stop()
+
+    asyncio.run(scenario())
+
+
+def test_crashed_worker_is_respawned():
+    async def scenario():
+        workers = manager(size=1)
+        await workers.start()
+        try:
+            with pytest.raises(WorkerCrashed):
+                await workers.run({"crash": True})
+            await wait_for_respawn(workers)
+            reply = await workers.run({"echo": "after"})
+            assert reply["result"]["echo"] == "after"
+            assert workers.stats()["crashes"] == 1
+        finally:
+            await workers.stop()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_worker_is_killed_and_replaced():
+    async def scenario():
+        workers = manager(size=1)
+        await workers.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await workers.run({"sleep": 5}, timeout=0.3)
+            await wait_for_respawn(workers)
+            assert (await workers.run({"echo": 1}))["result"]["echo"] == 1
+            assert workers.stats()["timeouts"] == 1
+        finally:
+            await workers.stop()
+
+    asyncio.run(scenario())
+
+
+def test_worker_recycled_after_max_jobs():
+    async def scenario():
+        workers = manager(size=1, max_jobs_per_worker=2)
+        await workers.start()
+        try:
+            first = await workers.run({})
+            second = await workers.run({})
+            assert first["result"]["pid"] == second["result"]["pid"]
+            third = await workers.run({})
+            assert third["result"]["pid"] != first["result"]["pid"]
+            assert workers.stats()["recycled"] == 1
+        finally:
+            await workers.stop()
+
+    asyncio.run(scenario())
+
+
+def test_start_fails_when_worker_cannot_start():
+    async def scenario():
+        workers = WorkerManager(size=2, command=[sys.executable, "-c", "print('no browser')"])
+        with pytest.raises(WorkerCrashed, match="no browser"):
+            await workers.start()
+        assert not workers.started
+
+    asyncio.run(scenario())
@@ -12,13 +12,9 @@ echo "Droplet IP: $DROPLET_IP"
 echo "Username: $DROPLET_USER"
 echo "Remote Directory: $REMOTE_DIR"
 
-# Copy the working script to the droplet
-echo "📁 Copying nadlan_playwright_simple_working.py to droplet..."
-scp nadlan_playwright_simple_working.py $DROPLET_USER@$DROPLET_IP:$REMOTE_DIR/
-
-# Copy the droplet server
-echo "📁 Copying droplet_server.py to droplet..."
-scp droplet_server.py $DROPLET_USER@$DROPLET_IP:$REMOTE_DIR/
+# Copy the server and the modules it imports (engine, pool, caches, ...)
+echo "📁 Copying Python modules to droplet..."
+scp *.py $DROPLET_USER@$DROPLET_IP:$REMOTE_DIR/
 
 # Copy requirements file if it exists
 if [ -f "requirements.txt" ]; then
@@ -0,0 +1,297 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from result_channel import RESULT_FD_ENV, LogBuffer, encode_frame, open_frame_reader, read_frame, read_logs
+
+WORKER_COMMAND = [sys.executable, "nadlan_worker.py"]
+
+
+class WorkerCrashed(RuntimeError):
+    """A worker process died (or failed to start) instead of answering"""
+
+
+def available_memory_mb() -> Optional[int]:
+    """Memory available for new processes, or None if it cannot be read"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def auto_worker_count(memory_per_worker_mb: int) -> int:
+    """One worker per usable CPU, fewer if memory can't hold that many Firefoxes"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    memory = available_memory_mb()
+    if memory is not None and memory_per_worker_mb > 0:
+        count = min(count, memory // memory_per_worker_mb)
+    return max(1, count)
+
+
+class _Worker:
+    """A running nadlan_worker.py process plus its pipes"""
+
+    def __init__(self, process, reader, transport, logs: LogBuffer, log_task):
+        self.process = process
+        self.reader = reader
+        self.transport = transport
+        self.logs = logs
+        self.log_task = log_task
+        self.jobs = 0
+        self.started = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+
+class WorkerManager:
+    """
+    Pre-forked, warm worker processes for quote jobs.
+
+    Each worker (nadlan_worker.py) has Playwright imported and Firefox
+    running before its first job, so a quote keeps process isolation without
+    paying interpreter start-up and browser launch. Jobs go to an idle worker
+    over its stdin; the result comes back on its result channel. Workers that
+    crash or time out are killed and respawned, and a worker is recycled
+    after ``max_jobs_per_worker`` jobs to keep memory growth in check.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_jobs_per_worker: int = 50,
+                 memory_per_worker_mb: int = 400, start_timeout: float = 60, log_lines: int = 200,
+                 command: Optional[List[str]] = None):
+        self.size = size or auto_worker_count(memory_per_worker_mb)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.memory_per_worker_mb = memory_per_worker_mb
+        self.start_timeout = start_timeout
+        self.log_lines = log_lines
+        self.command = command or WORKER_COMMAND
+        self.spawns = 0
+        self.crashes = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.jobs_completed = 0
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._respawning = 0
+        self._tasks = set()
+        self._next_id = 0
+        self._stopping = False
+
+    @classmethod
+    def from_env(cls) -> "WorkerManager":
+        """Build a manager from NADLAN_WORKER* environment variables"""
+        size = os.environ.get("NADLAN_WORKERS", "auto")
+        return cls(
+            size=None if size == "auto" else int(size),
+            max_jobs_per_worker=int(os.environ.get("NADLAN_WORKER_MAX_JOBS", "50")),
+            memory_per_worker_mb=int(os.environ.get("NADLAN_WORKER_MEMORY_MB", "400")),
+            start_timeout=float(os.environ.get("NADLAN_WORKER_START_TIMEOUT", "60")),
+            log_lines=int(os.environ.get("NADLAN_LOG_LINES", "200")),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.size
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self):
+        """Spawn every worker and wait until each has its browser up"""
+        if self.started:
+            return
+        self._stopping = False
+        self._idle = asyncio.Queue()
+        workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)), return_exceptions=True)
+        failed = [worker for worker in workers if isinstance(worker, BaseException)]
+        if failed:
+            await asyncio.gather(*(self._kill(worker) for worker in list(self._workers)))
+            self._idle = None
+            raise failed[0]
+        for worker in workers:
+            self._idle.put_nowait(worker)
+        print(f"🚀 Started {self.size} warm worker process(es)")
+
+    async def stop(self):
+        """Retire every worker"""
+        self._stopping = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*(self._retire(worker) for worker in list(self._workers)), return_exceptions=True)
+        self._idle = None
+        print("🛑 Worker processes stopped")
+
+    async def _spawn(self) -> _Worker:
+        read_fd, write_fd = os.pipe()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                pass_fds=(write_fd,),
+                env={**os.environ, RESULT_FD_ENV: str(write_fd)},
+            )
+        except BaseException:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+
+        reader, transport = await open_frame_reader(read_fd)
+        logs = LogBuffer(self.log_lines)
+        worker = _Worker(process, reader, transport, logs, asyncio.create_task(read_logs(process.stdout, logs)))
+        self.spawns += 1
+        try:
+            ready = await asyncio.wait_for(read_frame(reader), timeout=self.start_timeout)
+        except BaseException:
+            await self._kill(worker)
+            raise
+        if not ready or ready.get("type") != "ready":
+            await self._kill(worker)
+            last_logs = " | ".join(logs.lines()[-5:])
+            raise WorkerCrashed(f"Worker exited during start-up: {last_logs}")
+        self._workers.append(worker)
+        return worker
+
+    async def _kill(self, worker: _Worker):
+        if worker.alive:
+            worker.process.kill()
+        await worker.process.wait()
+        worker.transport.close()
+        await asyncio.gather(worker.log_task, return_exceptions=True)
+        if worker in self._workers:
+            self._workers.remove(worker)
+
+    async def _retire(self, worker: _Worker, grace: float = 10):
+        """Close the worker's stdin so it shuts its browser down, then make sure it is gone"""
+        try:
+            if worker.alive:
+                worker.process.stdin.close()
+                await asyncio.wait_for(worker.process.wait(), timeout=grace)
+        except (asyncio.TimeoutError, OSError):
+            pass
+        await self._kill(worker)
+
+    def _replace(self, worker: _Worker, retire: bool = False):
+        """Get rid of ``worker`` and put a fresh one in the idle queue, in the background"""
+        async def replace():
+            await (self._retire(worker) if retire else self._kill(worker))
+            delay = 1
+            while not self._stopping:
+                try:
+                    self._idle.put_nowait(await self._spawn())
+                    return
+                except Exception as e:
+                    print(f"⚠️ Worker respawn failed, retrying in {delay}s: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30)
+
+        async def tracked():
+            self._respawning += 1
+            try:
+                await replace()
+            finally:
+                self._respawning -= 1
+
+        task = asyncio.create_task(tracked())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _checkout(self) -> _Worker:
+        while True:
+            worker = await self._idle.get()
+            if worker.alive:
+                return worker
+            # Died while idle
+            self.crashes += 1
+            print(f"⚠️ Worker {worker.process.pid} exited with {worker.process.returncode}, respawning")
+            self._replace(worker)
+
+    async def run(self, variables: Dict[str, Any], storage_state: Optional[Dict[str, Any]] = None,
+                  timeout: float = 300) -> Dict[str, Any]:
+        """
+        Run one quote on a warm worker.
+
+        Returns the worker's reply: ``result``, ``logged_in`` and the
+        ``storage_state`` to cache. Raises asyncio.TimeoutError or
+        WorkerCrashed; the worker is replaced either way.
+        """
+        if not self.started:
+            raise RuntimeError("Worker manager has not been started")
+        worker = await self._checkout()
+        self._next_id += 1
+        job_id = self._next_id
+        try:
+            worker.process.stdin.write(encode_frame({
+                "type": "job", "id": job_id, "variables": variables, "storage_state": storage_state,
+            }))
+            await worker.process.stdin.drain()
+            reply = await asyncio.wait_for(read_frame(worker.reader), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"⏰ Worker {worker.process.pid} timed out, killing it")
+            self._replace(worker)
+            raise
+        except (ConnectionError, OSError) as e:
+            self.crashes += 1
+            self._replace(worker)
+            raise WorkerCrashed(f"Worker {worker.process.pid} went away: {e}")
+        except BaseException:
+            self._replace(worker)  # cancelled mid-job; its state is unknown
+            raise
+
+        if reply is None or reply.get("id") != job_id:
+            self.crashes += 1
+            last_logs = " | ".join(worker.logs.lines()[-5:])
+            print(f"💥 Worker {worker.process.pid} crashed during a job, respawning")
+            self._replace(worker)
+            raise WorkerCrashed(f"Worker crashed during the quote: {last_logs}")
+
+        worker.jobs += 1
+        self.jobs_completed += 1
+        if worker.jobs >= self.max_jobs_per_worker:
+            self.recycled += 1
+            print(f"♻️ Recycling worker {worker.process.pid} after {worker.jobs} jobs")
+            self._replace(worker, retire=True)
+        else:
+            self._idle.put_nowait(worker)
+        return reply
+
+    def stats(self) -> Dict[str, Any]:
+        idle = self._idle.qsize() if self._idle is not None else 0
+        alive = sum(1 for worker in self._workers if worker.alive)
+        now = time.monotonic()
+        return {
+            "started": self.started,
+            "size": self.size,
+            "alive": alive,
+            "idle": idle,
+            "busy": max(0, self.size - idle - self._respawning) if self.started else 0,
+            "respawning": self._respawning,
+            "spawns": self.spawns,
+            "crashes": self.crashes,
+            "timeouts": self.timeouts,
+            "recycled": self.recycled,
+            "jobs_completed": self.jobs_completed,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "memory_per_worker_mb": self.memory_per_worker_mb,
+            "workers": [
+                {"pid": worker.process.pid, "jobs": worker.jobs, "uptime_seconds": round(now - worker.started, 1)}
+                for worker in self._workers if worker.alive
+            ],
+        }